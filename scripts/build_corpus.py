@@ -14,7 +14,9 @@ if SRC_DIR not in sys.path:
 from finder_rag.config import load_config, save_config  # noqa: E402
 from finder_rag.logging_utils import setup_logging  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
+from calculator.fact_index import load_or_build_fact_index  # noqa: E402
 from indexing.chunking import chunk_text  # noqa: E402
+from retrieval.retriever import build_retriever_from_config  # noqa: E402
 
 
 def parse_args() -> argparse.Namespace:
@@ -22,6 +24,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--config", required=True, help="Path to YAML config")
     parser.add_argument("--input-dir", default=None, help="Override processed data dir")
     parser.add_argument("--output-file", default=None, help="Override corpus output file")
+    parser.add_argument(
+        "--artifact-dir",
+        default=None,
+        help="Also build the retriever index and save it here (retriever.index.artifact_dir)",
+    )
+    parser.add_argument(
+        "--fact-index-dir",
+        default=None,
+        help="Also extract chunk facts for the calculator and save them here (calculator.fact_index.dir)",
+    )
     return parser.parse_args()
 
 
@@ -30,6 +42,10 @@ def apply_overrides(config: Dict[str, Any], args: argparse.Namespace) -> Dict[st
         config["processed_dir"] = args.input_dir
     if args.output_file is not None:
         config["corpus_file"] = args.output_file
+    if args.artifact_dir is not None:
+        config["artifact_dir"] = args.artifact_dir
+    if args.fact_index_dir is not None:
+        config["fact_index_dir"] = args.fact_index_dir
     return config
 
 
@@ -97,6 +113,19 @@ def main() -> int:
                         out_f.write(json.dumps({"text": chunk, "meta": meta}) + "\n")
                         total_chunks += 1
 
+    artifact_dir = config.get("artifact_dir")
+    if artifact_dir:
+        # Uses the optional `retriever` section of this config (defaults otherwise).
+        retriever = build_retriever_from_config(config)
+        retriever.build_index(load_jsonl(corpus_file))
+        retriever.save(artifact_dir, corpus_file)
+        logger.info("artifact_dir=%s model=%s", artifact_dir, retriever.loaded_model_name)
+
+    fact_index_dir = config.get("fact_index_dir")
+    if fact_index_dir:
+        fact_index = load_or_build_fact_index(fact_index_dir, corpus_file)
+        logger.info("fact_index_dir=%s indexed_chunks=%d", fact_index_dir, len(fact_index))
+
     config_out = os.path.join(run_dir, "config.yaml")
     save_config(config, config_out)
 
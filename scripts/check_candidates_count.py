@@ -8,6 +8,13 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from finder_rag.metrics import percentile  # noqa: E402
+
 
 def load_jsonl(path: Path) -> List[Dict[str, Any]]:
     records: List[Dict[str, Any]] = []
@@ -20,20 +27,6 @@ def load_jsonl(path: Path) -> List[Dict[str, Any]]:
     return records
 
 
-def percentile(values: List[int], p: float) -> float:
-    if not values:
-        return 0.0
-    values_sorted = sorted(values)
-    k = (len(values_sorted) - 1) * p
-    f = int(k)
-    c = min(f + 1, len(values_sorted) - 1)
-    if f == c:
-        return float(values_sorted[f])
-    d0 = values_sorted[f] * (c - k)
-    d1 = values_sorted[c] * (k - f)
-    return float(d0 + d1)
-
-
 def candidate_count(row: Dict[str, Any]) -> int:
     if "final_top_chunks" in row and isinstance(row.get("final_top_chunks"), list):
         return len(row.get("final_top_chunks"))
@@ -109,12 +109,14 @@ def main() -> int:
         use_faiss=bool(eval_cfg.get("retriever", {}).get("use_faiss", False)),
         device=eval_cfg.get("retriever", {}).get("device"),
         batch_size=int(eval_cfg.get("retriever", {}).get("batch_size", 32)),
+        embedding_cache_dir=eval_cfg.get("retriever", {}).get("embedding_cache_dir"),
     )
     retriever_post = HybridRetriever(
         model_name=post_model,
         use_faiss=bool(eval_cfg.get("retriever", {}).get("use_faiss", False)),
         device=eval_cfg.get("retriever", {}).get("device"),
         batch_size=int(eval_cfg.get("retriever", {}).get("batch_size", 32)),
+        embedding_cache_dir=eval_cfg.get("retriever", {}).get("embedding_cache_dir"),
     )
     retriever_pre.build_index(corpus_chunks)
     retriever_post.build_index(corpus_chunks)
@@ -125,13 +127,13 @@ def main() -> int:
 
     def collect(qids):
         rows = []
-        for qid, delta_val, pre_rank, post_rank in qids:
-            record = eval_records.get(qid)
-            if not record:
-                continue
-            query = record.get("query", "")
-            pre_results = retriever_pre.retrieve(query, top_k=top_k, mode=mode, alpha=alpha)
-            post_results = retriever_post.retrieve(query, top_k=top_k, mode=mode, alpha=alpha)
+        selected = [row for row in qids if eval_records.get(row[0])]
+        queries = [eval_records[row[0]].get("query", "") for row in selected]
+        pre_batch = retriever_pre.retrieve_batch(queries, top_k=top_k, mode=mode, alpha=alpha)
+        post_batch = retriever_post.retrieve_batch(queries, top_k=top_k, mode=mode, alpha=alpha)
+        for (qid, delta_val, pre_rank, post_rank), query, pre_results, post_results in zip(
+            selected, queries, pre_batch, post_batch
+        ):
             rows.append(
                 {
                     "qid": qid,
@@ -18,7 +18,7 @@ from finder_rag.logging_utils import setup_logging  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
 import numpy as np  # noqa: E402
 from retrieval.eval_utils import compute_retrieval_metrics  # noqa: E402
-from retrieval.retriever import HybridRetriever  # noqa: E402
+from retrieval.retriever import load_or_build_retriever  # noqa: E402
 from config.schema import (  # noqa: E402
     get_path,
     resolve_config,
@@ -118,16 +118,8 @@ def main() -> int:
     subset_qids = load_subset(raw_config.get("subset_qids_path"))
     if subset_qids:
         eval_records = [r for r in eval_records if r.get("qid") in subset_qids]
-    corpus_chunks = load_jsonl(corpus_path)
-
-    retriever_cfg = resolved.get("retriever", {})
-    retriever = HybridRetriever(
-        model_name=get_path(resolved, "retriever.dense.model_name_or_path"),
-        use_faiss=bool(get_path(resolved, "retriever.index.use_faiss", True)),
-        device=retriever_cfg.get("device"),
-        batch_size=int(retriever_cfg.get("batch_size", 32)),
-    )
-    retriever.build_index(corpus_chunks)
+
+    retriever = load_or_build_retriever(resolved, corpus_path)
 
     k_values = [int(k) for k in get_path(resolved, "eval.k_list", [1, 5, 10])]
     mode = get_path(resolved, "retriever.mode", "hybrid")
@@ -150,6 +142,14 @@ def main() -> int:
         alpha=alpha,
     )
 
+    if retriever.score_cache is not None:
+        logger.info("score_cache=%s", retriever.score_cache.stats())
+
+    if retriever.dense_index_type() not in {"none", "flatip"}:
+        queries = [r.get("query", "") for r in eval_records if r.get("evidences")]
+        metrics["ann_vs_exact"] = retriever.ann_recall(queries, k_values)
+        logger.info("ann_vs_exact=%s", metrics["ann_vs_exact"])
+
     metrics_path = os.path.join(run_dir, "metrics.json")
     with open(metrics_path, "w", encoding="utf-8") as f:
         json.dump(metrics, f, indent=2)
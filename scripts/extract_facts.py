@@ -15,6 +15,7 @@ if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
 from calculator.extract import extract_facts_from_text  # noqa: E402
+from calculator.fact_index import load_or_build_fact_index  # noqa: E402
 from finder_rag.config import load_config, save_config  # noqa: E402
 from finder_rag.logging_utils import setup_logging  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
@@ -88,6 +89,12 @@ def main() -> int:
     if subset_qids:
         records = [r for r in records if r.get("qid") in subset_qids]
 
+    fact_index = None
+    fact_index_dir = config.get("fact_index_dir")
+    if fact_index_dir:
+        fact_index = load_or_build_fact_index(fact_index_dir, config.get("corpus_path"))
+        logger.info("fact_index_dir=%s indexed_chunks=%d", fact_index_dir, len(fact_index))
+
     facts_path = os.path.join(run_dir, "facts.jsonl")
     total_facts = 0
     inferred_year = 0
@@ -111,7 +118,10 @@ def main() -> int:
                 text = ch.get("text", "")
                 if not text:
                     continue
-                facts = extract_facts_from_text(qid, chunk_id, text, query, year_candidates)
+                if fact_index is not None:
+                    facts = fact_index.facts_for(qid, chunk_id, text, query, year_candidates)
+                else:
+                    facts = extract_facts_from_text(qid, chunk_id, text, query, year_candidates)
                 qid_facts.extend(facts)
 
             for fact in qid_facts:
@@ -147,6 +157,8 @@ def main() -> int:
     save_config(config, config_out)
 
     logger.info("extract_stats=%s", extract_stats)
+    if fact_index is not None:
+        logger.info("fact_index_stats=%s", fact_index.stats())
     return 0
 
 
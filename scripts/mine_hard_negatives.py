@@ -17,7 +17,7 @@ if SRC_DIR not in sys.path:
 from finder_rag.config import load_config, save_config  # noqa: E402
 from finder_rag.logging_utils import setup_logging  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
-from retrieval.retriever import HybridRetriever  # noqa: E402
+from retrieval.retriever import HybridRetriever, build_retriever_from_config  # noqa: E402
 from training.mining import build_bm25, mine_bm25, select_hard_negs  # noqa: E402
 from training.pairs import build_corpus_index, build_training_pairs, load_jsonl  # noqa: E402
 
@@ -107,18 +107,14 @@ def main() -> int:
                 }
             )
     elif strategy == "dense":
-        retriever_cfg = config.get("retriever", {})
-        retriever = HybridRetriever(
-            model_name=retriever_cfg.get("model_name", "sentence-transformers/all-MiniLM-L6-v2"),
-            use_faiss=bool(retriever_cfg.get("use_faiss", False)),
-            device=retriever_cfg.get("device"),
-            batch_size=int(retriever_cfg.get("batch_size", 32)),
-        )
+        retriever = build_retriever_from_config(config)
         retriever.build_index(corpus_chunks)
         chunk_by_id = {c.get("meta", {}).get("chunk_id"): c for c in corpus_chunks}
-        for pair in pairs:
+        batch_candidates = retriever.retrieve_batch(
+            [pair["query"] for pair in pairs], top_k=top_n, mode="dense", alpha=0.0
+        )
+        for pair, candidates in zip(pairs, batch_candidates):
             pos_chunk_id = pair["pos_chunk_id"]
-            candidates = retriever.retrieve(pair["query"], top_k=top_n, mode="dense", alpha=0.0)
             negs = []
             for res in candidates:
                 chunk_id = res.get("meta", {}).get("chunk_id")
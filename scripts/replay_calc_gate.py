@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from calculator.gate import load_candidates, replay_gate, replay_mismatch  # noqa: E402
+from finder_rag.config import load_config, save_config  # noqa: E402
+from finder_rag.logging_utils import setup_logging  # noqa: E402
+from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
+from config.schema import get_path, resolve_config, write_resolved_config  # noqa: E402
+
+# Query-side artifacts of the producing run that a replay does not change.
+COPIED_ARTIFACTS = ("retrieval_results.jsonl", "facts.jsonl", "extract_stats.json")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-apply calculator.gate to saved calculator candidates")
+    parser.add_argument("--config", required=True, help="Path to YAML config")
+    parser.add_argument("--candidates", default=None, help="Override calculator.replay_from")
+    return parser.parse_args()
+
+
+def apply_overrides(config: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    if args.candidates is not None:
+        config.setdefault("calculator", {})["replay_from"] = args.candidates
+    return config
+
+
+def main() -> int:
+    args = parse_args()
+    raw_config = load_config(args.config)
+    raw_config = apply_overrides(raw_config, args)
+
+    run_id = raw_config.get("run_id") or generate_run_id()
+    raw_config["run_id"] = run_id
+    output_dir = raw_config.get("output_dir", "outputs")
+    run_dir = os.path.join(output_dir, run_id)
+    ensure_dir(run_dir)
+
+    logger = setup_logging(os.path.join(run_dir, "logs.txt"))
+    logger.info("command_line=%s", " ".join(sys.argv))
+    logger.info("config_path=%s", args.config)
+
+    git_hash = get_git_hash()
+    raw_config["git_hash"] = git_hash
+    resolved = resolve_config(raw_config)
+    write_resolved_config(resolved, run_dir)
+
+    candidates_path = get_path(resolved, "calculator.replay_from", "")
+    if not candidates_path or not os.path.exists(candidates_path):
+        logger.error("missing calculator.replay_from: %s", candidates_path)
+        return 2
+    mismatch = replay_mismatch(candidates_path, resolved)
+    if mismatch:
+        logger.error("cannot replay %s: %s", candidates_path, mismatch)
+        return 2
+    gate_cfg = get_path(resolved, "calculator.gate", {}) or {}
+    logger.info("candidates_path=%s gate=%s", candidates_path, gate_cfg)
+
+    start = time.perf_counter()
+    candidates = load_candidates(candidates_path)
+    predictions, fallback_counts = replay_gate(candidates, gate_cfg)
+    replay_ms = (time.perf_counter() - start) * 1000.0
+
+    results_path = os.path.join(run_dir, "results_R.jsonl")
+    traces_path = os.path.join(run_dir, "calc_traces.jsonl")
+    predictions_path = os.path.join(run_dir, "predictions_calc.jsonl")
+    status_counts: Counter[str] = Counter()
+    task_counts: Counter[str] = Counter()
+    with open(results_path, "w", encoding="utf-8") as results_f, \
+        open(traces_path, "w", encoding="utf-8") as traces_f, \
+        open(predictions_path, "w", encoding="utf-8") as preds_f:
+        for candidate, pred in zip(candidates, predictions):
+            result = candidate["R"]
+            status_counts[result.get("status")] += 1
+            task_counts[result.get("task_type")] += 1
+            results_f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            traces_f.write(json.dumps(candidate.get("trace") or {}, ensure_ascii=False) + "\n")
+            preds_f.write(json.dumps(pred, ensure_ascii=False) + "\n")
+
+    source_dir = os.path.dirname(candidates_path)
+    for name in COPIED_ARTIFACTS:
+        if os.path.exists(os.path.join(source_dir, name)):
+            shutil.copyfile(os.path.join(source_dir, name), os.path.join(run_dir, name))
+
+    total = len(candidates)
+    calc_stats = {
+        "total_queries": total,
+        "ok_ratio": status_counts.get("ok", 0) / total if total else 0.0,
+        "status_counts": dict(status_counts),
+        "task_counts": dict(task_counts),
+        "fallback_counts": dict(fallback_counts),
+        "results_path": results_path,
+        "traces_path": traces_path,
+        "candidates_path": candidates_path,
+        "replay_ms": replay_ms,
+    }
+    with open(os.path.join(run_dir, "calc_stats.json"), "w", encoding="utf-8") as f:
+        json.dump(calc_stats, f, indent=2)
+    with open(os.path.join(run_dir, "git_commit.txt"), "w", encoding="utf-8") as f:
+        f.write(f"{git_hash}\n")
+    save_config(resolved, os.path.join(run_dir, "config.yaml"))
+
+    logger.info("calc_stats=%s", calc_stats)
+    logger.info("predictions_path=%s", predictions_path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,7 +15,7 @@ if SRC_DIR not in sys.path:
 from finder_rag.config import load_config, save_config  # noqa: E402
 from finder_rag.logging_utils import setup_logging  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
-from retrieval.retriever import HybridRetriever  # noqa: E402
+from retrieval.retriever import load_or_build_retriever  # noqa: E402
 import numpy as np  # noqa: E402
 from config.schema import get_path, resolve_config, validate_config, validate_paths, write_resolved_config  # noqa: E402
 
@@ -99,16 +99,8 @@ def main() -> int:
         return 3
 
     eval_records = load_jsonl(eval_path)
-    corpus_chunks = load_jsonl(corpus_path)
-
-    retriever_cfg = resolved.get("retriever", {})
-    retriever = HybridRetriever(
-        model_name=get_path(resolved, "retriever.dense.model_name_or_path"),
-        use_faiss=bool(get_path(resolved, "retriever.index.use_faiss", True)),
-        device=retriever_cfg.get("device"),
-        batch_size=int(retriever_cfg.get("batch_size", 32)),
-    )
-    retriever.build_index(corpus_chunks)
+
+    retriever = load_or_build_retriever(resolved, corpus_path)
 
     k = int(get_path(resolved, "retriever.top_k", 5))
     mode = get_path(resolved, "retriever.mode", "hybrid")
@@ -126,11 +118,11 @@ def main() -> int:
     )
 
     predictions_path = os.path.join(run_dir, "predictions.jsonl")
+    queries = [rec.get("query", "") for rec in eval_records]
+    batch_results = retriever.retrieve_batch(queries, top_k=k, alpha=alpha, mode=mode)
     with open(predictions_path, "w", encoding="utf-8") as f:
-        for rec in eval_records:
-            query = rec.get("query", "")
+        for rec, query, chunks in zip(eval_records, queries, batch_results):
             qid = rec.get("qid")
-            chunks = retriever.retrieve(query, top_k=k, alpha=alpha, mode=mode)
             used_chunks = [c.get("meta", {}).get("chunk_id") for c in chunks]
             pred = placeholder_generate(query, chunks)
             f.write(
@@ -122,12 +122,14 @@ def main() -> int:
     multistep_enabled = bool(get_path(resolved, "multistep.enabled", False))
     calc_enabled = bool(get_path(resolved, "calculator.enabled", False))
     skip_retrieval = bool(get_path(resolved, "eval.skip_retrieval", False))
+    calc_replay_from = str(get_path(resolved, "calculator.replay_from", "") or "")
+    calc_needs_retrieval = calc_enabled and not calc_replay_from
 
     def run_artifact_path(run_name: str, filename: str) -> str:
         return os.path.join(run_output_dir, run_name, filename)
 
     # Multi-step retrieval (for eval or calculator inputs)
-    if multistep_enabled and (not skip_retrieval or calc_enabled):
+    if multistep_enabled and (not skip_retrieval or calc_needs_retrieval):
         ms_run_id = f"{run_id}_ms"
         ms_cfg = stage_config(resolved, ms_run_id, {})
         ms_cfg_path = os.path.join(run_dir, "config.ms.yaml")
@@ -293,7 +295,7 @@ def main() -> int:
     if calc_enabled:
         calc_run_id = f"{run_id}_calc"
         calc_cfg = stage_config(resolved, calc_run_id, {})
-        if multistep_enabled:
+        if multistep_enabled and calc_needs_retrieval:
             calc_cfg["use_multistep_results"] = True
             calc_cfg["multistep_results_path"] = run_artifact_path(
                 summary["runs"]["multistep"],
@@ -301,12 +303,12 @@ def main() -> int:
             )
         calc_cfg_path = os.path.join(run_dir, "config.calc.yaml")
         save_config(calc_cfg, calc_cfg_path)
-        rc = run_script(
-            [sys.executable, "scripts/run_with_calculator.py", "--config", calc_cfg_path],
-            log_path,
-        )
+        # Gate-only sweeps re-gate the candidates of an earlier calculator run.
+        calc_script = "scripts/replay_calc_gate.py" if calc_replay_from else "scripts/run_with_calculator.py"
+        logger.info("calc_script=%s replay_from=%s", calc_script, calc_replay_from)
+        rc = run_script([sys.executable, calc_script, "--config", calc_cfg_path], log_path)
         if rc != 0:
-            logger.error("run_with_calculator failed rc=%d", rc)
+            logger.error("%s failed rc=%d", os.path.basename(calc_script), rc)
             return rc
         summary["runs"]["calculator"] = calc_run_id
 
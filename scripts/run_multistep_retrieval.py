@@ -5,7 +5,9 @@ import json
 import os
 import random
 import sys
+import time
 from collections import Counter
+from dataclasses import replace
 from typing import Any, Dict, List, Optional
 
 import numpy as np
@@ -17,10 +19,12 @@ if SRC_DIR not in sys.path:
 
 from finder_rag.config import load_config, save_config  # noqa: E402
 from finder_rag.logging_utils import setup_logging  # noqa: E402
+from finder_rag.metrics import percentile  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
 from multistep.engine import MultiStepConfig, MultiStepRetriever  # noqa: E402
+from retrieval.eval_utils import match_chunk  # noqa: E402
 from training.pairs import load_jsonl  # noqa: E402
-from retrieval.retriever import HybridRetriever  # noqa: E402
+from retrieval.retriever import load_or_build_retriever  # noqa: E402
 from config.schema import (  # noqa: E402
     get_path,
     resolve_config,
@@ -70,6 +74,43 @@ def load_subset(path: Optional[str]) -> Optional[set[str]]:
     return qids
 
 
+def run_engine(engine: MultiStepRetriever, records: List[Dict[str, Any]], batch_size: int):
+    """Run ``engine`` over ``records`` in batches.
+
+    Returns the outputs, total wall-clock seconds and each query's latency in ms
+    (``MultiStepRetriever.last_latencies_ms``).
+    """
+    outputs = []
+    latencies: List[float] = []
+    start_time = time.perf_counter()
+    for start in range(0, len(records), batch_size):
+        batch = records[start : start + batch_size]
+        outputs.extend(engine.run_batch([rec.get("query", "") for rec in batch]))
+        latencies.extend(engine.last_latencies_ms)
+    return outputs, time.perf_counter() - start_time, latencies
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    summary = {"count": len(latencies), "mean": sum(latencies) / len(latencies) if latencies else 0.0}
+    for name, p in (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        summary[name] = percentile(latencies, p)
+    return summary
+
+
+def mean_recall(records: List[Dict[str, Any]], outputs, k_values: List[int]) -> Dict[str, float]:
+    """Mean evidence recall@k of the final chunks, matched as in eval_multistep_retrieval.py."""
+    scores = {k: [] for k in k_values}
+    for rec, (_, _, _, final_top) in zip(records, outputs):
+        gold = rec.get("evidences", [])
+        if not gold:
+            continue
+        matched_by_rank = [match_chunk(c, rec.get("qid"), gold)[2] for c in final_top]
+        for k in k_values:
+            matched = {ev_id for ev_id in matched_by_rank[:k] if ev_id is not None}
+            scores[k].append(len(matched) / len(gold))
+    return {f"recall@{k}": (sum(v) / len(v) if v else 0.0) for k, v in scores.items()}
+
+
 def main() -> int:
     args = parse_args()
     raw_config = load_config(args.config)
@@ -112,16 +153,8 @@ def main() -> int:
     if subset_qids:
         records = [r for r in records if r.get("qid") in subset_qids]
 
-    corpus_chunks = load_jsonl(corpus_path)
 
-    retriever_cfg = resolved.get("retriever", {})
-    retriever = HybridRetriever(
-        model_name=get_path(resolved, "retriever.dense.model_name_or_path"),
-        use_faiss=bool(get_path(resolved, "retriever.index.use_faiss", False)),
-        device=retriever_cfg.get("device"),
-        batch_size=int(retriever_cfg.get("batch_size", 32)),
-    )
-    retriever.build_index(corpus_chunks)
+    retriever = load_or_build_retriever(resolved, corpus_path)
     logger.info("dense_model_loaded=%s", retriever.loaded_model_name)
 
     k_list = [int(k) for k in get_path(resolved, "eval.k_list", [1, 5, 10])]
@@ -136,6 +169,8 @@ def main() -> int:
         alpha=float(get_path(resolved, "retriever.hybrid.alpha", 0.5)),
         mode=get_path(resolved, "retriever.mode", "dense"),
         novelty_threshold=float(get_path(resolved, "multistep.novelty_threshold", 0.3)),
+        novelty_mode=str(get_path(resolved, "multistep.novelty_mode", "exact")),
+        novelty_num_perm=int(get_path(resolved, "multistep.novelty_num_perm", 64)),
         stop_no_new_steps=int(get_path(resolved, "multistep.stop_no_new_steps", 2)),
         merge_strategy=str(get_path(resolved, "multistep.merge_strategy", "maxscore")),
         gate_enabled=bool(get_path(resolved, "multistep.gate.enabled", True)),
@@ -145,6 +180,13 @@ def main() -> int:
         ),
         gap_enabled=bool(get_path(resolved, "multistep.gate.enabled", True)),
         refiner_enabled=bool(raw_config.get("refiner_enabled", True)),
+        pool_depth=int(get_path(resolved, "multistep.pool.depth", 0)),
+        pool_escalate=str(get_path(resolved, "multistep.pool.escalate", "gap")),
+        speculate_max=int(get_path(resolved, "multistep.speculate.max_queries", 0)),
+        speculate_workers=int(get_path(resolved, "multistep.speculate.workers", 2)),
+        budget_ms=float(get_path(resolved, "multistep.budget.ms", 0.0)),
+        budget_calls=int(get_path(resolved, "multistep.budget.calls", 0)),
+        min_marginal_gain=float(get_path(resolved, "multistep.budget.min_marginal_gain", 0.0)),
     )
 
     chunk_size = int(get_path(resolved, "chunking.chunk_size", 0))
@@ -162,6 +204,12 @@ def main() -> int:
     )
 
     engine = MultiStepRetriever(retriever, ms_config)
+    batch_size = max(1, int(get_path(resolved, "multistep.batch_size", 64)))
+
+    try:
+        outputs, elapsed, latencies = run_engine(engine, records, batch_size)
+    finally:
+        engine.close()
 
     traces_path = os.path.join(run_dir, "multistep_traces.jsonl")
     results_path = os.path.join(run_dir, "retrieval_results.jsonl")
@@ -177,10 +225,8 @@ def main() -> int:
     with open(traces_path, "w", encoding="utf-8") as traces_f, open(
         results_path, "w", encoding="utf-8"
     ) as results_f:
-        for rec in records:
+        for rec, (collected, trace, stop_reason, final_top) in zip(records, outputs):
             qid = rec.get("qid")
-            query = rec.get("query", "")
-            collected, trace, stop_reason, final_top = engine.run(query)
 
             stop_counts[stop_reason] += 1
             total_steps += len(trace)
@@ -229,6 +275,44 @@ def main() -> int:
         avg_topk_per_step,
     )
     logger.info("stop_reasons=%s", dict(stop_counts))
+    logger.info("query_cache=%s", retriever.query_cache_stats())
+    ms_per_query = 1000.0 * elapsed / len(records) if records else 0.0
+    logger.info("latency_ms_per_query=%.2f retrieval_counts=%s", ms_per_query, engine.stats)
+    latency = latency_summary(latencies)
+    logger.info(
+        "query_latency_ms(mean/p50/p90/p95/p99/max)=%.1f/%.1f/%.1f/%.1f/%.1f/%.1f batch_size=%d",
+        latency["mean"],
+        latency["p50"],
+        latency["p90"],
+        latency["p95"],
+        latency["p99"],
+        latency["max"],
+        batch_size,
+    )
+    with open(os.path.join(run_dir, "latency.json"), "w", encoding="utf-8") as f:
+        json.dump({"batch_size": batch_size, "query_latency_ms": latency}, f, indent=2)
+    if ms_config.pool_depth > 0 and bool(get_path(resolved, "multistep.pool.compare_full", False)):
+        full_engine = MultiStepRetriever(retriever, replace(ms_config, pool_depth=0))
+        try:
+            full_outputs, full_elapsed, _ = run_engine(full_engine, records, batch_size)
+        finally:
+            full_engine.close()
+        pool_recall = mean_recall(records, outputs, k_list)
+        full_recall = mean_recall(records, full_outputs, k_list)
+        report = {
+            "pool_depth": ms_config.pool_depth,
+            "pool_escalate": ms_config.pool_escalate,
+            "pool": {"ms_per_query": ms_per_query, "counts": engine.stats, **pool_recall},
+            "full": {
+                "ms_per_query": 1000.0 * full_elapsed / len(records) if records else 0.0,
+                "counts": full_engine.stats,
+                **full_recall,
+            },
+            "recall_delta": {key: pool_recall[key] - full_recall[key] for key in pool_recall},
+        }
+        with open(os.path.join(run_dir, "pool_report.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info("pool_vs_full=%s", report)
     if per_qid_counts:
         rng = random.Random(seed)
         sample = rng.sample(per_qid_counts, k=min(20, len(per_qid_counts)))
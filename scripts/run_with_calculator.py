@@ -17,10 +17,13 @@ if SRC_DIR not in sys.path:
 
 from calculator.compute import compute_for_query  # noqa: E402
 from calculator.extract import extract_facts_from_text  # noqa: E402
+from calculator.fact_index import load_or_build_fact_index  # noqa: E402
+from calculator.gate import CANDIDATES_FILE, apply_gate, candidate_row, write_candidates_manifest  # noqa: E402
+from calculator.lazy import compute_lazily, iter_chunk_facts  # noqa: E402
 from finder_rag.config import load_config, save_config  # noqa: E402
 from finder_rag.logging_utils import setup_logging  # noqa: E402
 from finder_rag.utils import ensure_dir, generate_run_id, get_git_hash  # noqa: E402
-from retrieval.retriever import HybridRetriever  # noqa: E402
+from retrieval.retriever import HybridRetriever, load_or_build_retriever  # noqa: E402
 from training.pairs import load_jsonl  # noqa: E402
 from config.schema import (  # noqa: E402
     get_path,
@@ -69,20 +72,14 @@ def placeholder_generate(query: str, chunks: List[Dict[str, Any]]) -> str:
     return f"Q: {query}\nAnswer (template): {snippet[:200]}"
 
 
-def build_retriever(config: Dict[str, Any]) -> HybridRetriever:
-    retriever_cfg = config.get("retriever", {})
-    retriever = HybridRetriever(
-        model_name=get_path(config, "retriever.dense.model_name_or_path"),
-        use_faiss=bool(get_path(config, "retriever.index.use_faiss", False)),
-        device=retriever_cfg.get("device"),
-        batch_size=int(retriever_cfg.get("batch_size", 32)),
-    )
+def corpus_path_of(config: Dict[str, Any]) -> str:
     corpus_dir = get_path(config, "data.corpus_dir", "data/corpus")
     corpus_file = get_path(config, "data.corpus_file", "chunks.jsonl")
-    corpus_path = os.path.join(corpus_dir, corpus_file)
-    corpus_chunks = load_jsonl(corpus_path)
-    retriever.build_index(corpus_chunks)
-    return retriever
+    return os.path.join(corpus_dir, corpus_file)
+
+
+def build_retriever(config: Dict[str, Any]) -> HybridRetriever:
+    return load_or_build_retriever(config, corpus_path_of(config))
 
 
 def main() -> int:
@@ -144,11 +141,22 @@ def main() -> int:
             if qid:
                 retrieval_results[qid] = row
 
+    fact_index = None
+    fact_index_dir = get_path(resolved, "calculator.fact_index.dir", "")
+    if fact_index_dir:
+        fact_index = load_or_build_fact_index(fact_index_dir, corpus_path_of(resolved))
+        logger.info("fact_index_dir=%s indexed_chunks=%d", fact_index_dir, len(fact_index))
+
     retrieval_results_path = os.path.join(run_dir, "retrieval_results.jsonl")
     facts_path = os.path.join(run_dir, "facts.jsonl")
     results_path = os.path.join(run_dir, "results_R.jsonl")
     traces_path = os.path.join(run_dir, "calc_traces.jsonl")
     predictions_path = os.path.join(run_dir, "predictions_calc.jsonl")
+    candidates_path = os.path.join(run_dir, CANDIDATES_FILE)
+    gate_cfg = get_path(resolved, "calculator.gate", {}) or {}
+    facts_for = fact_index.facts_for if fact_index is not None else extract_facts_from_text
+    lazy_enabled = bool(get_path(resolved, "calculator.lazy.enabled", False))
+    lazy_min_conf = float(get_path(resolved, "calculator.lazy.min_conf", 0.4))
 
     output_percent = bool(get_path(resolved, "calculator.parsing.output_percent", True))
     top_k = int(get_path(resolved, "retriever.top_k", 5))
@@ -157,6 +165,7 @@ def main() -> int:
     chunk_size = int(get_path(resolved, "chunking.chunk_size", 0))
     overlap = int(get_path(resolved, "chunking.overlap", 0))
     logger.info("use_multistep=%s multistep_results_path=%s", use_multistep, multistep_path)
+    logger.info("lazy_extraction=%s lazy_min_conf=%.3f", lazy_enabled, lazy_min_conf)
     logger.info(
         "retriever_mode=%s top_k=%d alpha=%.3f output_percent=%s",
         mode,
@@ -171,11 +180,19 @@ def main() -> int:
         overlap,
     )
 
+    batch_results: List[List[Dict[str, Any]]] = []
+    if retriever is not None:
+        queries = [rec.get("query", "") for rec in records]
+        batch_results = retriever.retrieve_batch(queries, top_k=top_k, alpha=alpha, mode=mode)
+
     extract_total = 0
     inferred_year = 0
     missing_year = 0
     missing_unit = 0
     queries_with_facts = 0
+    chunks_total = 0
+    chunks_scanned = 0
+    early_exits = 0
 
     status_counts: Counter[str] = Counter()
     task_counts: Counter[str] = Counter()
@@ -185,8 +202,9 @@ def main() -> int:
         open(facts_path, "w", encoding="utf-8") as facts_f, \
         open(results_path, "w", encoding="utf-8") as results_f, \
         open(traces_path, "w", encoding="utf-8") as traces_f, \
-        open(predictions_path, "w", encoding="utf-8") as preds_f:
-        for rec in records:
+        open(predictions_path, "w", encoding="utf-8") as preds_f, \
+        open(candidates_path, "w", encoding="utf-8") as cand_f:
+        for rec_idx, rec in enumerate(records):
             qid = rec.get("qid")
             query = rec.get("query", "")
 
@@ -197,7 +215,7 @@ def main() -> int:
                 else:
                     chunks = res.get("all_collected_chunks") or res.get("final_top_chunks") or []
             else:
-                chunks = retriever.retrieve(query, top_k=top_k, alpha=alpha, mode=mode)
+                chunks = batch_results[rec_idx]
                 chunks = [
                     {
                         "chunk_id": c.get("meta", {}).get("chunk_id"),
@@ -210,14 +228,20 @@ def main() -> int:
 
             retr_f.write(json.dumps({"qid": qid, "all_collected_chunks": chunks}) + "\n")
 
-            qid_facts: List[Fact] = []
-            for ch in chunks:
-                chunk_id = ch.get("chunk_id") or ch.get("meta", {}).get("chunk_id")
-                text = ch.get("text", "")
-                if not text:
-                    continue
-                facts = extract_facts_from_text(qid, chunk_id, text, query, None)
-                qid_facts.extend(facts)
+            scan = None
+            if lazy_enabled:
+                qid_facts, result, trace, scan = compute_lazily(
+                    qid, query, chunks, facts_for, output_percent, lazy_min_conf
+                )
+                chunks_scanned += scan.chunks_scanned
+                early_exits += int(scan.early_exit)
+            else:
+                qid_facts = []
+                for chunk_facts in iter_chunk_facts(qid, query, chunks, facts_for):
+                    qid_facts.extend(chunk_facts)
+                result, trace = compute_for_query(query, qid_facts, output_percent)
+                chunks_scanned += len(chunks)
+            chunks_total += len(chunks)
 
             if qid_facts:
                 queries_with_facts += 1
@@ -232,67 +256,33 @@ def main() -> int:
                     missing_unit += 1
                 facts_f.write(json.dumps(fact.__dict__, ensure_ascii=False) + "\n")
 
-            result, trace = compute_for_query(query, qid_facts, output_percent)
             result.qid = qid
             trace.qid = qid
             status_counts[result.status] += 1
             task_counts[result.task_type] += 1
 
             results_f.write(json.dumps(result.__dict__, ensure_ascii=False) + "\n")
-            traces_f.write(json.dumps(trace.__dict__, ensure_ascii=False) + "\n")
-
-            gate_cfg = get_path(resolved, "calculator.gate", {}) or {}
-            allow_tasks = gate_cfg.get("allow_task_types", ["yoy", "diff"])
-            min_conf = float(gate_cfg.get("min_conf", 0.0))
-            require_unit = bool(gate_cfg.get("require_unit_consistency", True))
-            require_year = bool(gate_cfg.get("require_year_match", True))
-            allow_inferred = bool(gate_cfg.get("allow_inferred", False))
-
-            gate_reason = None
-            if gate_cfg.get("enabled", True):
-                if result.task_type not in allow_tasks:
-                    gate_reason = "gate_task"
-                elif result.status != "ok":
-                    gate_reason = f"status_{result.status}"
-                elif result.confidence < min_conf:
-                    gate_reason = "gate_conf"
-                else:
-                    units = [i.get("unit") for i in result.inputs]
-                    if require_unit and units and len({u for u in units if u}) > 1:
-                        gate_reason = "gate_unit"
-                    if require_year and result.task_type == "yoy":
-                        years = [i.get("year") for i in result.inputs]
-                        inferred = [bool(i.get("inferred_year")) for i in result.inputs]
-                        if any(y is None for y in years):
-                            gate_reason = "gate_year"
-                        if any(inferred) and not allow_inferred:
-                            gate_reason = "gate_inferred"
-
-            if result.status == "ok" and gate_reason is None:
-                used_chunks = [i.get("chunk_id") for i in result.inputs if i.get("chunk_id")]
-                used_chunks = [u for u in used_chunks if u]
-                unit = result.result_unit or ""
-                pred_answer = f"Result: {result.result_value} {unit}. {result.explanation}"
-                fallback_reason = None
-            else:
-                used_chunks = [c.get("chunk_id") for c in chunks if c.get("chunk_id")]
-                pred_answer = placeholder_generate(query, chunks)
-                fallback_reason = gate_reason or result.status
-                fallback_counts[fallback_reason] += 1
-
-            preds_f.write(
-                json.dumps(
-                    {
-                        "qid": qid,
-                        "pred_answer": pred_answer,
-                        "used_chunks": used_chunks,
-                        "R": result.__dict__,
-                        "fallback_reason": fallback_reason,
-                    },
-                    ensure_ascii=False,
-                )
-                + "\n"
+            trace_row = dict(trace.__dict__)
+            if scan is not None:
+                trace_row["scan"] = scan.__dict__
+            traces_f.write(json.dumps(trace_row, ensure_ascii=False) + "\n")
+
+            fallback_chunks = [c.get("chunk_id") for c in chunks if c.get("chunk_id")]
+            candidate = candidate_row(
+                qid,
+                result.__dict__,
+                trace_row,
+                placeholder_generate(query, chunks),
+                fallback_chunks,
             )
+            cand_f.write(json.dumps(candidate, ensure_ascii=False) + "\n")
+
+            pred = apply_gate(candidate, gate_cfg)
+            if pred["fallback_reason"] is not None:
+                fallback_counts[pred["fallback_reason"]] += 1
+            preds_f.write(json.dumps(pred, ensure_ascii=False) + "\n")
+
+    write_candidates_manifest(run_dir, resolved, len(records))
 
     extract_stats = {
         "total_queries": len(records),
@@ -303,6 +293,10 @@ def main() -> int:
         "inferred_year_ratio": inferred_year / extract_total if extract_total else 0.0,
         "missing_year_ratio": missing_year / extract_total if extract_total else 0.0,
         "missing_unit_ratio": missing_unit / extract_total if extract_total else 0.0,
+        "chunks_total": chunks_total,
+        "chunks_scanned": chunks_scanned,
+        "chunks_scanned_ratio": chunks_scanned / chunks_total if chunks_total else 0.0,
+        "early_exit_queries": early_exits,
     }
 
     calc_stats = {
@@ -313,6 +307,7 @@ def main() -> int:
         "fallback_counts": dict(fallback_counts),
         "results_path": results_path,
         "traces_path": traces_path,
+        "candidates_path": candidates_path,
     }
 
     extract_stats_path = os.path.join(run_dir, "extract_stats.json")
@@ -330,6 +325,8 @@ def main() -> int:
     save_config(resolved, config_out)
 
     logger.info("extract_stats=%s", extract_stats)
+    if fact_index is not None:
+        logger.info("fact_index_stats=%s", fact_index.stats())
     logger.info("calc_stats=%s", calc_stats)
     logger.info("predictions_path=%s", predictions_path)
     return 0
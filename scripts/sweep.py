@@ -7,7 +7,7 @@ import json
 import os
 import subprocess
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import yaml
 
@@ -16,8 +16,11 @@ SRC_DIR = os.path.join(ROOT_DIR, "src")
 if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
+from calculator.gate import CANDIDATES_FILE
 from finder_rag.utils import ensure_dir, generate_run_id
 
+GATE_PREFIX = "calculator.gate."
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Grid sweep runner")
@@ -82,6 +85,10 @@ def main() -> int:
     keys = list(parameters.keys())
     values = [parameters[k] for k in keys]
     combos = list(itertools.product(*values))
+    # With replay_gate, grid points that differ only in calculator.gate.* re-gate the candidates
+    # of the first run with the same other settings instead of rerunning the pipeline.
+    gate_keys = {k for k in keys if k.startswith(GATE_PREFIX)} if search_space.get("replay_gate") else set()
+    candidates_by_base: Dict[Tuple[str, ...], str] = {}
 
     leaderboard_path = os.path.join(sweep_dir, "leaderboard.csv")
     best_config_path = os.path.join(sweep_dir, "best_config.yaml")
@@ -102,6 +109,10 @@ def main() -> int:
             overrides.append(f"{k}={json.dumps(v)}")
         run_id = f"{sweep_id}_t{idx:02d}"
         overrides.append(f"run_id={run_id}")
+        base = tuple(f"{k}={json.dumps(v)}" for k, v in zip(keys, combo) if k not in gate_keys)
+        replay_from = candidates_by_base.get(base) if gate_keys else None
+        if replay_from:
+            overrides.append(f"calculator.replay_from={json.dumps(replay_from)}")
 
         cmd = [sys.executable, "scripts/run_experiment.py", "--config", args.base_config]
         if args.tag:
@@ -120,6 +131,9 @@ def main() -> int:
             continue
         with open(summary_path, "r", encoding="utf-8") as f:
             summary = json.load(f)
+        candidates_path = os.path.join("outputs", f"{run_id}_calc", CANDIDATES_FILE)
+        if gate_keys and not replay_from and os.path.exists(candidates_path):
+            candidates_by_base[base] = candidates_path
 
         metric_path = objective.get("metric")
         score = get_metric(summary, metric_path) if metric_path else None
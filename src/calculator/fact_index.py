@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from calculator.extract import ChunkFact, Fact, bind_facts, extract_chunk_facts
+from retrieval.artifact import corpus_matches, corpus_source, read_manifest, write_manifest
+
+FACT_INDEX_VERSION = 1
+FACTS_FILE = "chunk_facts.jsonl"
+
+
+def text_sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id_of(chunk: Dict[str, Any]) -> Optional[str]:
+    return chunk.get("chunk_id") or (chunk.get("meta") or {}).get("chunk_id")
+
+
+class FactIndex:
+    """Chunk-intrinsic facts of a corpus, keyed by chunk_id.
+
+    Each entry keeps the sha1 of the text it was extracted from; a chunk whose
+    text differs (or that is not indexed) is extracted on the fly instead.
+    """
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, Tuple[str, List[ChunkFact]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, chunk_id: str, text: str) -> None:
+        self.entries[chunk_id] = (text_sha1(text), extract_chunk_facts(text))
+
+    @classmethod
+    def build(cls, chunks: Iterable[Dict[str, Any]]) -> "FactIndex":
+        index = cls()
+        for chunk in chunks:
+            chunk_id = chunk_id_of(chunk)
+            text = chunk.get("text") or ""
+            if chunk_id and text:
+                index.add(chunk_id, text)
+        return index
+
+    def chunk_facts(self, chunk_id: Optional[str], text: str) -> List[ChunkFact]:
+        entry = self.entries.get(chunk_id) if chunk_id else None
+        if entry is not None and entry[0] == text_sha1(text):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return extract_chunk_facts(text)
+
+    def facts_for(
+        self,
+        qid: str,
+        chunk_id: Optional[str],
+        text: str,
+        query: str,
+        year_candidates: Optional[List[int]] = None,
+    ) -> List[Fact]:
+        """Same facts as ``extract_facts_from_text`` without re-parsing indexed chunks."""
+        return bind_facts(qid, chunk_id, self.chunk_facts(chunk_id, text), query, year_candidates)
+
+    def save(self, path: str, source: Optional[Dict[str, Any]] = None) -> None:
+        """Write the entries and a manifest; ``source`` is the ``corpus_source`` they came from."""
+        os.makedirs(path, exist_ok=True)
+        num_facts = 0
+        tmp_path = os.path.join(path, FACTS_FILE + f".tmp{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk_id, (digest, facts) in self.entries.items():
+                num_facts += len(facts)
+                row = {"chunk_id": chunk_id, "text_sha1": digest, "facts": [fact.__dict__ for fact in facts]}
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, os.path.join(path, FACTS_FILE))
+        write_manifest(
+            path,
+            {
+                "version": FACT_INDEX_VERSION,
+                "corpus_source": source,
+                "num_chunks": len(self.entries),
+                "num_facts": num_facts,
+            },
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "FactIndex":
+        index = cls()
+        with open(os.path.join(path, FACTS_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                index.entries[row["chunk_id"]] = (row["text_sha1"], [ChunkFact(**fact) for fact in row["facts"]])
+        return index
+
+    def stats(self) -> Dict[str, int]:
+        return {"chunks": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+def fact_index_matches(path: str, corpus_path: str) -> bool:
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("version") != FACT_INDEX_VERSION:
+        return False
+    return corpus_matches(manifest, corpus_path)
+
+
+def build_fact_index(corpus_path: str) -> FactIndex:
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        return FactIndex.build(json.loads(line) for line in f if line.strip())
+
+
+def load_or_build_fact_index(path: str, corpus_path: Optional[str] = None) -> FactIndex:
+    """Open the index at ``path`` when it was built from ``corpus_path``, else build and save it.
+
+    Without a corpus path an existing index is opened as is; its per-chunk text
+    hashes still keep stale entries from being used.
+    """
+    if corpus_path and os.path.exists(corpus_path):
+        if fact_index_matches(path, corpus_path):
+            return FactIndex.load(path)
+        # Recorded before reading, so a corpus rewritten during the build is never matched.
+        source = corpus_source(corpus_path)
+        index = build_fact_index(corpus_path)
+        index.save(path, source=source)
+        return index
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("version") != FACT_INDEX_VERSION:
+        raise FileNotFoundError(f"no usable fact index at {path} and no corpus to build it from")
+    return FactIndex.load(path)
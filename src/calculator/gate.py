@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from retrieval.artifact import file_sha1
+
+CANDIDATES_FILE = "calc_candidates.jsonl"
+CANDIDATES_MANIFEST = "calc_candidates.manifest.json"
+CANDIDATES_VERSION = 1
+# Settings that only name, place or gate a run; every other setting can change the candidates.
+# The multistep results path embeds the producing run's id; multistep.* covers how it was made.
+REPLAY_IGNORED_KEYS = (
+    "run_id",
+    "output_dir",
+    "git_hash",
+    "predictions_path",
+    "use_multistep_results",
+    "multistep_results_path",
+    "eval",
+    "calculator.gate",
+    "calculator.replay_from",
+)
+
+
+def gate_reason(result: Dict[str, Any], gate_cfg: Dict[str, Any]) -> Optional[str]:
+    """Why ``calculator.gate`` rejects a calculator result (``None`` when it passes)."""
+    if not gate_cfg.get("enabled", True):
+        return None
+    allow_tasks = gate_cfg.get("allow_task_types", ["yoy", "diff"])
+    min_conf = float(gate_cfg.get("min_conf", 0.0))
+    require_unit = bool(gate_cfg.get("require_unit_consistency", True))
+    require_year = bool(gate_cfg.get("require_year_match", True))
+    allow_inferred = bool(gate_cfg.get("allow_inferred", False))
+
+    task_type = result.get("task_type")
+    status = result.get("status")
+    if task_type not in allow_tasks:
+        return "gate_task"
+    if status != "ok":
+        return f"status_{status}"
+    if result.get("confidence", 0.0) < min_conf:
+        return "gate_conf"
+
+    reason = None
+    inputs = result.get("inputs") or []
+    units = [i.get("unit") for i in inputs]
+    if require_unit and units and len({u for u in units if u}) > 1:
+        reason = "gate_unit"
+    if require_year and task_type == "yoy":
+        if any(i.get("year") is None for i in inputs):
+            reason = "gate_year"
+        if any(bool(i.get("inferred_year")) for i in inputs) and not allow_inferred:
+            reason = "gate_inferred"
+    return reason
+
+
+def candidate_row(
+    qid: Optional[str],
+    result: Dict[str, Any],
+    trace: Dict[str, Any],
+    fallback_answer: str,
+    fallback_chunks: List[Any],
+) -> Dict[str, Any]:
+    """Ungated calculator output for one query, enough to re-apply any gate later."""
+    return {
+        "qid": qid,
+        "R": result,
+        "trace": trace,
+        "fallback_answer": fallback_answer,
+        "fallback_chunks": fallback_chunks,
+    }
+
+
+def apply_gate(candidate: Dict[str, Any], gate_cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Prediction row (as in ``predictions_calc.jsonl``) for a candidate under ``gate_cfg``."""
+    result = candidate["R"]
+    reason = gate_reason(result, gate_cfg)
+    if result.get("status") == "ok" and reason is None:
+        used_chunks = [i.get("chunk_id") for i in result.get("inputs") or [] if i.get("chunk_id")]
+        unit = result.get("result_unit") or ""
+        pred_answer = f"Result: {result.get('result_value')} {unit}. {result.get('explanation')}"
+        fallback_reason = None
+    else:
+        used_chunks = list(candidate.get("fallback_chunks") or [])
+        pred_answer = candidate.get("fallback_answer", "")
+        fallback_reason = reason or result.get("status")
+    return {
+        "qid": candidate.get("qid"),
+        "pred_answer": pred_answer,
+        "used_chunks": used_chunks,
+        "R": result,
+        "fallback_reason": fallback_reason,
+    }
+
+
+def replay_gate(
+    candidates: Iterable[Dict[str, Any]],
+    gate_cfg: Dict[str, Any],
+) -> Tuple[List[Dict[str, Any]], Counter[str]]:
+    """Gate saved candidates without re-running retrieval, extraction or compute."""
+    predictions = []
+    fallback_counts: Counter[str] = Counter()
+    for candidate in candidates:
+        pred = apply_gate(candidate, gate_cfg)
+        if pred["fallback_reason"] is not None:
+            fallback_counts[pred["fallback_reason"]] += 1
+        predictions.append(pred)
+    return predictions, fallback_counts
+
+
+def load_candidates(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def candidates_fingerprint(config: Dict[str, Any]) -> str:
+    """sha1 of the resolved config without ``REPLAY_IGNORED_KEYS``."""
+    cfg = copy.deepcopy(config)
+    for key in REPLAY_IGNORED_KEYS:
+        parts = key.split(".")
+        parent: Any = cfg
+        for part in parts[:-1]:
+            parent = parent.get(part) if isinstance(parent, dict) else None
+        if isinstance(parent, dict):
+            parent.pop(parts[-1], None)
+    payload = json.dumps(cfg, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def write_candidates_manifest(run_dir: str, config: Dict[str, Any], num_candidates: int) -> str:
+    path = os.path.join(run_dir, CANDIDATES_MANIFEST)
+    manifest = {
+        "version": CANDIDATES_VERSION,
+        "config_fingerprint": candidates_fingerprint(config),
+        "candidates_sha1": file_sha1(os.path.join(run_dir, CANDIDATES_FILE)),
+        "num_candidates": num_candidates,
+        "git_hash": config.get("git_hash"),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def replay_mismatch(candidates_path: str, config: Dict[str, Any]) -> Optional[str]:
+    """Why the candidates at ``candidates_path`` cannot be replayed under ``config`` (``None`` if they can)."""
+    manifest_path = os.path.join(os.path.dirname(candidates_path), CANDIDATES_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return f"missing {manifest_path}"
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != CANDIDATES_VERSION:
+        return f"candidates version {manifest.get('version')} != {CANDIDATES_VERSION}"
+    if manifest.get("candidates_sha1") != file_sha1(candidates_path):
+        return "candidates file changed since its manifest was written"
+    if manifest.get("config_fingerprint") != candidates_fingerprint(config):
+        return "candidates were built under a different retriever/calculator config"
+    return None
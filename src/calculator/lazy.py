@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from calculator.compute import CalcResult, CalcTrace, compute_for_query, detect_task
+from calculator.extract import Fact, extract_facts_from_text, query_year_candidates
+
+FactsFor = Callable[[str, Optional[str], str, str, Optional[List[int]]], List[Fact]]
+
+
+@dataclass
+class ScanStats:
+    chunks_total: int = 0
+    chunks_scanned: int = 0
+    facts_scanned: int = 0
+    early_exit: bool = False
+
+
+def iter_chunk_facts(
+    qid: str,
+    query: str,
+    chunks: Sequence[Dict[str, Any]],
+    facts_for: FactsFor = extract_facts_from_text,
+) -> Iterator[List[Fact]]:
+    """Facts of each retrieved chunk, extracted only when pulled (rank order)."""
+    year_candidates = query_year_candidates(query)
+    for ch in chunks:
+        text = ch.get("text", "")
+        if not text:
+            yield []
+            continue
+        chunk_id = ch.get("chunk_id") or (ch.get("meta") or {}).get("chunk_id")
+        yield facts_for(qid, chunk_id, text, query, year_candidates)
+
+
+def compute_lazily(
+    qid: str,
+    query: str,
+    chunks: Sequence[Dict[str, Any]],
+    facts_for: FactsFor = extract_facts_from_text,
+    output_percent: bool = True,
+    min_conf: float = 0.0,
+) -> Tuple[List[Fact], CalcResult, CalcTrace, ScanStats]:
+    """Extract chunks in rank order until ``compute_for_query`` succeeds with ``min_conf``.
+
+    Queries without a detected task read no chunk at all. Stopping early trades
+    exactness for speed: facts in later chunks could have formed a larger
+    group, so the answer may differ from extracting everything.
+    """
+    stats = ScanStats(chunks_total=len(chunks))
+    facts: List[Fact] = []
+    computed: Optional[Tuple[CalcResult, CalcTrace]] = None
+    if detect_task(query) is not None:
+        for chunk_facts in iter_chunk_facts(qid, query, chunks, facts_for):
+            stats.chunks_scanned += 1
+            if not chunk_facts:
+                continue
+            facts.extend(chunk_facts)
+            computed = compute_for_query(query, facts, output_percent)
+            result = computed[0]
+            if result.status == "ok" and result.confidence >= min_conf:
+                stats.early_exit = stats.chunks_scanned < stats.chunks_total
+                break
+    if computed is None:
+        computed = compute_for_query(query, facts, output_percent)
+    stats.facts_scanned = len(facts)
+    result, trace = computed
+    return facts, result, trace, stats
@@ -20,10 +20,33 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "mode": "hybrid",
         "top_k": 5,
         "top_k_each_step": 5,
+        "query_cache_size": 1024,
+        "bm25_cache_size": 16,
         "sparse": {"enabled": True, "type": "bm25"},
         "dense": {"enabled": True, "model_name_or_path": "sentence-transformers/all-MiniLM-L6-v2"},
         "hybrid": {"enabled": True, "alpha": 0.5},
-        "index": {"use_faiss": False, "faiss_type": "flatip", "brute_force_fallback": True},
+        "index": {
+            "use_faiss": False,
+            "faiss_type": "flatip",
+            "brute_force_fallback": True,
+            "embedding_cache_dir": None,
+            "candidate_k": 0,
+            "embedding_dtype": "float32",
+            "dense_coarse": "none",
+            "rescore_oversample": 4,
+            "score_cache_dir": None,
+            "score_cache_depth": 100,
+            "nlist": 256,
+            "nprobe": 16,
+            "pq_m": 16,
+            "pq_nbits": 8,
+            "hnsw_m": 32,
+            "ef_construction": 80,
+            "ef_search": 64,
+            "train_size": 50000,
+            "index_path": None,
+            "artifact_dir": None,
+        },
     },
     "multistep": {
         "enabled": False,
@@ -31,8 +54,14 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "top_k_each_step": 5,
         "top_k_final": 10,
         "novelty_threshold": 0.3,
+        "novelty_mode": "exact",
+        "novelty_num_perm": 64,
         "stop_no_new_steps": 2,
         "merge_strategy": "maxscore",
+        "batch_size": 64,
+        "pool": {"depth": 0, "escalate": "gap", "compare_full": False},
+        "speculate": {"max_queries": 0, "workers": 2},
+        "budget": {"ms": 0.0, "calls": 0, "min_marginal_gain": 0.0},
         "gate": {"enabled": True, "min_gap_conf": 0.3, "allow_types": ["YEAR", "COMPARE"]},
     },
     "calculator": {
@@ -58,6 +87,9 @@ DEFAULT_CONFIG: Dict[str, Any] = {
             },
             "output_percent": True,
         },
+        "fact_index": {"dir": ""},
+        "replay_from": "",
+        "lazy": {"enabled": False, "min_conf": 0.4},
     },
     "eval": {
         "k_list": [1, 5, 10],
@@ -90,6 +122,8 @@ SCHEMA_TYPES: Dict[str, Tuple[type, ...]] = {
     "retriever.mode": (str,),
     "retriever.top_k": (int,),
     "retriever.top_k_each_step": (int,),
+    "retriever.query_cache_size": (int,),
+    "retriever.bm25_cache_size": (int,),
     "retriever.sparse.enabled": (bool,),
     "retriever.sparse.type": (str,),
     "retriever.dense.enabled": (bool,),
@@ -99,13 +133,41 @@ SCHEMA_TYPES: Dict[str, Tuple[type, ...]] = {
     "retriever.index.use_faiss": (bool,),
     "retriever.index.faiss_type": (str,),
     "retriever.index.brute_force_fallback": (bool,),
+    "retriever.index.embedding_cache_dir": (str, type(None)),
+    "retriever.index.candidate_k": (int,),
+    "retriever.index.embedding_dtype": (str,),
+    "retriever.index.dense_coarse": (str,),
+    "retriever.index.rescore_oversample": (int,),
+    "retriever.index.score_cache_dir": (str, type(None)),
+    "retriever.index.score_cache_depth": (int,),
+    "retriever.index.nlist": (int,),
+    "retriever.index.nprobe": (int,),
+    "retriever.index.pq_m": (int,),
+    "retriever.index.pq_nbits": (int,),
+    "retriever.index.hnsw_m": (int,),
+    "retriever.index.ef_construction": (int,),
+    "retriever.index.ef_search": (int,),
+    "retriever.index.train_size": (int,),
+    "retriever.index.index_path": (str, type(None)),
+    "retriever.index.artifact_dir": (str, type(None)),
     "multistep.enabled": (bool,),
     "multistep.max_steps": (int,),
     "multistep.top_k_each_step": (int,),
     "multistep.top_k_final": (int,),
     "multistep.novelty_threshold": (float, int),
+    "multistep.novelty_mode": (str,),
+    "multistep.novelty_num_perm": (int,),
     "multistep.stop_no_new_steps": (int,),
     "multistep.merge_strategy": (str,),
+    "multistep.batch_size": (int,),
+    "multistep.pool.depth": (int,),
+    "multistep.pool.escalate": (str,),
+    "multistep.pool.compare_full": (bool,),
+    "multistep.speculate.max_queries": (int,),
+    "multistep.speculate.workers": (int,),
+    "multistep.budget.ms": (float, int),
+    "multistep.budget.calls": (int,),
+    "multistep.budget.min_marginal_gain": (float, int),
     "multistep.gate.enabled": (bool,),
     "multistep.gate.min_gap_conf": (float, int),
     "multistep.gate.allow_types": (list,),
@@ -120,6 +182,10 @@ SCHEMA_TYPES: Dict[str, Tuple[type, ...]] = {
     "calculator.parsing.thousand_sep": (str,),
     "calculator.parsing.unit_map": (dict,),
     "calculator.parsing.output_percent": (bool,),
+    "calculator.fact_index.dir": (str,),
+    "calculator.replay_from": (str,),
+    "calculator.lazy.enabled": (bool,),
+    "calculator.lazy.min_conf": (float, int),
     "eval.k_list": (list,),
     "eval.skip_retrieval": (bool,),
     "eval.subsets.complex_path": (str,),
@@ -199,6 +265,8 @@ def _apply_legacy_mappings(raw: Dict[str, Any], resolved: Dict[str, Any]) -> Non
         set_path(resolved, "retriever.dense.model_name_or_path", retr_cfg.get("model_name"))
     if "use_faiss" in retr_cfg:
         set_path(resolved, "retriever.index.use_faiss", bool(retr_cfg.get("use_faiss")))
+    if "embedding_cache_dir" in retr_cfg:
+        set_path(resolved, "retriever.index.embedding_cache_dir", retr_cfg.get("embedding_cache_dir"))
     if "alpha" in retr_cfg:
         set_path(resolved, "retriever.hybrid.alpha", float(retr_cfg.get("alpha")))
     if "mode" in retr_cfg:
@@ -228,6 +296,8 @@ def _apply_legacy_mappings(raw: Dict[str, Any], resolved: Dict[str, Any]) -> Non
         set_path(resolved, "multistep.top_k_final", int(raw.get("top_k_final")))
     if "novelty_threshold" in raw:
         set_path(resolved, "multistep.novelty_threshold", float(raw.get("novelty_threshold")))
+    if "novelty_mode" in raw:
+        set_path(resolved, "multistep.novelty_mode", str(raw.get("novelty_mode")))
     if "stop_no_new_steps" in raw:
         set_path(resolved, "multistep.stop_no_new_steps", int(raw.get("stop_no_new_steps")))
     if "gap_enabled" in raw:
@@ -237,6 +307,8 @@ def _apply_legacy_mappings(raw: Dict[str, Any], resolved: Dict[str, Any]) -> Non
 
     if "output_percent" in raw:
         set_path(resolved, "calculator.parsing.output_percent", bool(raw.get("output_percent")))
+    if "fact_index_dir" in raw:
+        set_path(resolved, "calculator.fact_index.dir", str(raw.get("fact_index_dir")))
 
 
 def resolve_config(raw: Dict[str, Any]) -> Dict[str, Any]:
@@ -29,6 +29,21 @@ def mean(values: List[float]) -> float:
     return sum(values) / float(len(values))
 
 
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile, ``p`` in [0, 1]."""
+    if not values:
+        return 0.0
+    values_sorted = sorted(values)
+    k = (len(values_sorted) - 1) * p
+    f = int(k)
+    c = min(f + 1, len(values_sorted) - 1)
+    if f == c:
+        return float(values_sorted[f])
+    d0 = values_sorted[f] * (c - k)
+    d1 = values_sorted[c] * (k - f)
+    return float(d0 + d1)
+
+
 def reciprocal_rank(hits: Iterable[bool]) -> float:
     for idx, hit in enumerate(hits, start=1):
         if hit:
@@ -5,6 +5,8 @@ from typing import List, Tuple
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import linear_kernel
 
+from retrieval.topk import top_k_indices
+
 
 class TfidfRetriever:
     def __init__(self, max_features: int = 20000, ngram_range: Tuple[int, int] = (1, 2)):
@@ -21,5 +23,5 @@ class TfidfRetriever:
             raise RuntimeError("Retriever is not fitted.")
         query_vec = self.vectorizer.transform([query])
         scores = linear_kernel(query_vec, self.matrix).ravel()
-        top_idx = scores.argsort()[::-1][:k]
+        top_idx = top_k_indices(scores, k)
         return top_idx.tolist()
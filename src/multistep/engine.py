@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
-from multistep.gap import detect_gap
+from multistep.gap import EvidenceState, GapResult
 from multistep.planner import StepPlanner
 from multistep.refiner import refine_query
+from multistep.novelty import NoveltyIndex
 from multistep.stop import StopCriteria, StopState
+from retrieval.eval_utils import retrieve_many
 
 
 @dataclass
@@ -24,6 +28,56 @@ class MultiStepConfig:
     gate_allow_types: List[str] = None
     gap_enabled: bool = True
     refiner_enabled: bool = True
+    novelty_mode: str = "exact"
+    novelty_num_perm: int = 64
+    pool_depth: int = 0
+    pool_escalate: str = "gap"
+    speculate_max: int = 0
+    speculate_workers: int = 2
+    budget_ms: float = 0.0
+    budget_calls: int = 0
+    min_marginal_gain: float = 0.0
+
+
+POOL_ESCALATION = ("gap", "no_new", "never")
+
+
+@dataclass
+class _StepResults:
+    """What one step retrieved and added, before its gap/gate/stop decisions."""
+
+    topk_chunks: List[dict]
+    new_candidates: List[dict]
+    empty_results: bool
+    retrieval: Optional[str] = None
+
+
+@dataclass
+class _QueryRun:
+    """Per-query state carried between steps of ``MultiStepRetriever.run_batch``."""
+
+    query: str
+    used_query: str
+    collected: List[dict] = field(default_factory=list)
+    collected_by_id: Dict[str, dict] = field(default_factory=dict)
+    collected_ids: set = field(default_factory=set)
+    step1_ids: List[str] = field(default_factory=list)
+    trace: List[dict] = field(default_factory=list)
+    evidence: Optional[EvidenceState] = None
+    novelty: Optional[NoveltyIndex] = None
+    state: StopState = field(default_factory=StopState)
+    stop_reason: str = "MAX_STEPS"
+    step_idx: int = 0
+    done: bool = False
+    final_topk: List[dict] = field(default_factory=list)
+    fallback_added: int = 0
+    first_results: Optional[List[dict]] = None
+    pool: Optional[List[str]] = None
+    pending: Optional[_StepResults] = None
+    # Refined query -> (future of a batched retrieve, position in that batch).
+    speculative: Dict[str, Tuple[Future, int]] = field(default_factory=dict)
+    # Milliseconds spent on this query: its own work plus an even share of each batched call it was in.
+    cost_ms: float = 0.0
 
 
 class MultiStepRetriever:
@@ -35,166 +89,402 @@ class MultiStepRetriever:
             max_steps=config.max_steps,
             no_new_steps_limit=config.stop_no_new_steps,
             novelty_threshold=config.novelty_threshold,
+            novelty_mode=config.novelty_mode,
+            novelty_num_perm=config.novelty_num_perm,
+            budget_ms=config.budget_ms,
+            budget_calls=config.budget_calls,
+            min_marginal_gain=config.min_marginal_gain,
         )
+        if config.pool_escalate not in POOL_ESCALATION:
+            raise ValueError(
+                f"unsupported pool_escalate: {config.pool_escalate} (expected one of {POOL_ESCALATION})"
+            )
+        self.stats = {
+            "full_retrieves": 0,
+            "pool_rescores": 0,
+            "escalations": 0,
+            "speculated": 0,
+            "speculation_hits": 0,
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Per-query cost (``_QueryRun.cost_ms``) of each query in the last run_batch call.
+        self.last_latencies_ms: List[float] = []
+
+    def close(self) -> None:
+        """Shut down the speculation thread pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
 
     def run(self, query: str) -> Tuple[List[dict], List[dict], str, List[dict]]:
-        collected: List[dict] = []
-        collected_by_id: Dict[str, dict] = {}
-        step1_ids: List[str] = []
-        trace: List[dict] = []
-        state = StopState()
-        used_query = query
-        stop_reason = "MAX_STEPS"
-        gate_allow = self.config.gate_allow_types or ["YEAR", "COMPARE"]
+        return self.run_batch([query])[0]
+
+    def run_batch(self, queries: List[str]) -> List[Tuple[List[dict], List[dict], str, List[dict]]]:
+        """Run every query step-synchronously: one batched retrieve per step for all active queries.
 
-        for step_idx in range(self.config.max_steps):
-            plan = self.planner.plan(query)
-            results = self.retriever.retrieve(
-                used_query,
-                top_k=self.config.top_k_each_step,
+        Gap detection, gating and stopping stay per query, so each output matches ``run``.
+        With ``pool_depth > 0`` step 0 retrieves a deep pool for the original query and later
+        steps rescore that pool, escalating to a full retrieve per ``pool_escalate``.
+        A millisecond budget is per query, so with ``budget_ms > 0`` queries run one at a time.
+        """
+        if self.config.budget_ms > 0 and len(queries) > 1:
+            outputs = []
+            latencies: List[float] = []
+            for query in queries:
+                outputs.extend(self._run_group([query]))
+                latencies.extend(self.last_latencies_ms)
+            self.last_latencies_ms = latencies
+            return outputs
+        return self._run_group(queries)
+
+    def _run_group(self, queries: List[str]) -> List[Tuple[List[dict], List[dict], str, List[dict]]]:
+        runs = [_QueryRun(query=q, used_query=q) for q in queries]
+        use_pool = self.config.pool_depth > 0
+        active = runs if self.config.max_steps > 0 else []
+        if active and not use_pool:
+            self._speculate(runs)
+        while active:
+            # Steps advance in lockstep, so either every active run is at step 0 or none is.
+            first_step = active[0].step_idx == 0
+            full = [r for r in active if r.pool is None]
+            pooled = [r for r in active if r.pool is not None]
+            # Step 0 also covers the final top-up and the pool: top-k lists are prefixes of deeper ones.
+            depth = self._first_step_depth() if first_step else None
+            step_results = self._retrieve_full(full, depth) if first_step else self._retrieve_step(full)
+            for run, results in zip(full, step_results):
+                if first_step:
+                    run.first_results = results
+                    if use_pool:
+                        run.pool = [res.get("meta", {}).get("chunk_id") for res in results]
+                    results = results[: self.config.top_k_each_step]
+                run.pending = self._collect(run, results, "full" if use_pool else None)
+            for run, results in zip(pooled, self._rescore_pool(pooled)):
+                run.pending = self._collect(run, results, "pool")
+
+            escalate = [r for r in pooled if self._should_escalate(r)]
+            self.stats["escalations"] += len(escalate)
+            for run, results in zip(escalate, self._retrieve_full(escalate)):
+                run.pool.extend(res.get("meta", {}).get("chunk_id") for res in results)
+                run.pending = self._merge_pending(run.pending, self._collect(run, results, "pool+full"))
+
+            for run in active:
+                self._finish_step(run)
+            active = [r for r in active if not r.done]
+
+        for run in runs:
+            run.final_topk = self._merge_and_rank(run.collected_by_id, run.step1_ids)
+        short = [r for r in runs if len(r.final_topk) < self.config.final_top_k]
+        unretrieved = [r for r in short if r.first_results is None]
+        if unretrieved:
+            started = time.perf_counter()
+            baseline = retrieve_many(
+                self.retriever,
+                [r.query for r in unretrieved],
+                top_k=self.config.final_top_k,
                 alpha=self.config.alpha,
                 mode=self.config.mode,
             )
-            topk_chunks = []
-            for res in results:
-                topk_chunks.append(
-                    {
-                        "chunk_id": res.get("meta", {}).get("chunk_id"),
-                        "score": res.get("score"),
-                        "meta": res.get("meta"),
-                        "text": res.get("text"),
-                    }
-                )
-
-            empty_results = len(results) == 0
-
-            new_candidates = []
-            existing_ids = {c.get("meta", {}).get("chunk_id") for c in collected}
-            for res in results:
-                chunk_id = res.get("meta", {}).get("chunk_id")
-                if chunk_id in existing_ids:
-                    continue
-                new_candidates.append(
-                    {
-                        "chunk_id": chunk_id,
-                        "text": res.get("text"),
-                        "score": res.get("score"),
-                        "meta": res.get("meta"),
-                    }
-                )
-
-            new_candidates = self.stopper.novelty_filter(new_candidates, collected)
-            collected.extend(new_candidates)
-            for res in results:
-                chunk_id = res.get("meta", {}).get("chunk_id")
-                if not chunk_id:
-                    continue
-                prev = collected_by_id.get(chunk_id)
-                if not prev or res.get("score", 0.0) > prev.get("score", -1.0):
-                    collected_by_id[chunk_id] = {
-                        "chunk_id": chunk_id,
-                        "score": res.get("score"),
-                        "meta": res.get("meta"),
-                        "text": res.get("text"),
-                    }
-            if step_idx == 0:
-                step1_ids = [c.get("chunk_id") for c in topk_chunks if c.get("chunk_id")]
-
-            if self.config.gap_enabled:
-                gap = detect_gap(query, collected, plan.query_type)
-            else:
-                gap = detect_gap(query, collected, "OTHER")
-                gap = gap.__class__(
-                    gap_type="NO_GAP",
-                    missing_years=[],
-                    missing_entity=None,
-                    gap_conf=0.0,
-                )
-
-            gate_decision = True
-            if self.config.gate_enabled:
-                gap_tag = gap.gap_type
-                if gap_tag == "MISSING_YEAR":
-                    gap_tag = "YEAR"
-                elif gap_tag == "MISSING_ENTITY":
-                    gap_tag = "COMPARE"
-                gate_decision = (
-                    gap.gap_conf >= self.config.gate_min_gap_conf and gap_tag in gate_allow
-                )
-
-            stop = self.stopper.check(
-                step_idx=step_idx,
-                new_chunk_ids=[c.get("chunk_id") for c in new_candidates],
-                gap_type=gap.gap_type,
-                empty_results=empty_results,
-                state=state,
+            self._charge(unretrieved, started)
+            self.stats["full_retrieves"] += len(unretrieved)
+            for run, baseline_results in zip(unretrieved, baseline):
+                run.first_results = baseline_results
+        for run in short:
+            started = time.perf_counter()
+            self._top_up(run, run.first_results[: self.config.final_top_k])
+            self._charge([run], started)
+
+        for run in runs:
+            for future, _ in run.speculative.values():
+                future.cancel()
+
+        self.last_latencies_ms = [run.cost_ms for run in runs]
+
+        outputs = []
+        for run in runs:
+            if run.trace:
+                run.trace[-1]["final_pool_size"] = len(run.collected_by_id)
+                run.trace[-1]["final_topk_size"] = len(run.final_topk)
+                run.trace[-1]["final_fallback_added"] = run.fallback_added
+            outputs.append((run.collected, run.trace, run.stop_reason, run.final_topk))
+        return outputs
+
+    @staticmethod
+    def _charge(runs: List["_QueryRun"], started: float) -> None:
+        """Split the wall time since ``started`` evenly over ``runs``."""
+        if runs:
+            share = 1000.0 * (time.perf_counter() - started) / len(runs)
+            for run in runs:
+                run.cost_ms += share
+
+    def _first_step_depth(self) -> int:
+        return max(self.config.top_k_each_step, self.config.final_top_k, self.config.pool_depth)
+
+    def _retrieve_full(self, runs: List["_QueryRun"], top_k: Optional[int] = None) -> List[List[dict]]:
+        if not runs:
+            return []
+        self.stats["full_retrieves"] += len(runs)
+        started = time.perf_counter()
+        results = retrieve_many(
+            self.retriever,
+            [r.used_query for r in runs],
+            top_k=top_k or self.config.top_k_each_step,
+            alpha=self.config.alpha,
+            mode=self.config.mode,
+        )
+        self._charge(runs, started)
+        return results
+
+    def _speculation_candidates(self, run: "_QueryRun") -> List[str]:
+        """Queries ``refine_query`` can produce for this run: the original plus one query year or compare entity."""
+        evidence = run.evidence
+        extras = list(evidence.query_years) if len(evidence.query_years) >= 2 else []
+        extras.extend(evidence.entities)
+        candidates = []
+        for extra in extras:
+            refined = f"{run.query} {extra}"
+            if refined != run.query and refined not in candidates:
+                candidates.append(refined)
+        return candidates[: self.config.speculate_max]
+
+    def _speculate(self, runs: List["_QueryRun"]) -> None:
+        """Start retrieving likely refinements in the background while step 0 runs."""
+        config = self.config
+        if config.speculate_max <= 0 or config.max_steps < 2 or not (config.gap_enabled and config.refiner_enabled):
+            return
+        started = time.perf_counter()
+        pairs = []
+        for run in runs:
+            run.evidence = EvidenceState(run.query, self.planner.plan(run.query).query_type)
+            pairs.extend((run, refined) for refined in self._speculation_candidates(run))
+        if not pairs:
+            return
+        # Workers must not race to instantiate a lazily loaded encoder.
+        load_model = getattr(self.retriever, "load_model", None)
+        if load_model is not None:
+            load_model()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, config.speculate_workers))
+        # One batched retrieve per worker.
+        step = -(-len(pairs) // max(1, config.speculate_workers))
+        for start in range(0, len(pairs), step):
+            chunk = pairs[start : start + step]
+            future = self._executor.submit(
+                retrieve_many,
+                self.retriever,
+                [refined for _, refined in chunk],
+                config.top_k_each_step,
+                config.alpha,
+                config.mode,
             )
+            for pos, (run, refined) in enumerate(chunk):
+                run.speculative[refined] = (future, pos)
+        self.stats["speculated"] += len(pairs)
+        self._charge(runs, started)
 
-            trace.append(
-                {
-                    "step_idx": step_idx,
-                    "used_query": used_query,
-                    "topk_chunks": [
-                        {"chunk_id": c["chunk_id"], "score": c["score"]} for c in topk_chunks
-                    ],
-                    "newly_added_chunk_ids": [c.get("chunk_id") for c in new_candidates],
-                    "gap": gap.gap_type,
-                    "gap_conf": gap.gap_conf,
-                    "gate_decision": gate_decision,
-                    "stop_reason": stop.reason,
-                }
+    def _retrieve_step(self, runs: List["_QueryRun"]) -> List[List[dict]]:
+        """Retrieve ``used_query`` for each run, taking prefetched results where they exist."""
+        results: List[Optional[List[dict]]] = [None] * len(runs)
+        missing = []
+        for pos, run in enumerate(runs):
+            hit = run.speculative.get(run.used_query)
+            if hit is None:
+                missing.append(pos)
+                continue
+            future, index = hit
+            started = time.perf_counter()
+            results[pos] = future.result()[index]
+            self._charge([run], started)
+            self.stats["speculation_hits"] += 1
+        for pos, fetched in zip(missing, self._retrieve_full([runs[pos] for pos in missing])):
+            results[pos] = fetched
+        return results
+
+    def _rescore_pool(self, runs: List["_QueryRun"]) -> List[List[dict]]:
+        if not runs:
+            return []
+        rescore_batch = getattr(self.retriever, "rescore_batch", None)
+        if rescore_batch is None:
+            return self._retrieve_full(runs)
+        self.stats["pool_rescores"] += len(runs)
+        started = time.perf_counter()
+        results = rescore_batch(
+            [r.used_query for r in runs],
+            [r.pool for r in runs],
+            top_k=self.config.top_k_each_step,
+            alpha=self.config.alpha,
+            mode=self.config.mode,
+        )
+        self._charge(runs, started)
+        return results
+
+    def _should_escalate(self, run: "_QueryRun") -> bool:
+        """Whether a rescored step needs a full retrieve: ``gap`` while a gap persists, ``no_new``
+        when the pool yielded no new chunks, ``never`` stays on the pool."""
+        policy = self.config.pool_escalate
+        if policy == "no_new":
+            return not run.pending.new_candidates
+        if policy == "gap" and self.config.gap_enabled:
+            return run.evidence.gap().gap_type != "NO_GAP"
+        return False
+
+    @staticmethod
+    def _merge_pending(first: "_StepResults", second: "_StepResults") -> "_StepResults":
+        # The full retrieve is authoritative for what the step "retrieved".
+        return _StepResults(
+            topk_chunks=second.topk_chunks,
+            new_candidates=first.new_candidates + second.new_candidates,
+            empty_results=second.empty_results,
+            retrieval=second.retrieval,
+        )
+
+    def _collect(self, run: "_QueryRun", results: List[dict], retrieval: Optional[str]) -> "_StepResults":
+        """Add one retrieve's results to the run's pool, novelty index and evidence."""
+        started = time.perf_counter()
+        query = run.query
+        collected_by_id = run.collected_by_id
+
+        # One dict per result, shared by topk_chunks, new_candidates and collected_by_id.
+        topk_chunks = []
+        new_candidates = []
+        for res in results:
+            chunk_id = res.get("meta", {}).get("chunk_id")
+            chunk = {
+                "chunk_id": chunk_id,
+                "score": res.get("score"),
+                "meta": res.get("meta"),
+                "text": res.get("text"),
+            }
+            topk_chunks.append(chunk)
+            if chunk_id not in run.collected_ids:
+                new_candidates.append(chunk)
+
+        empty_results = len(results) == 0
+
+        run.state.retrieve_calls += 1
+        if run.novelty is None:
+            run.novelty = self.stopper.novelty_index()
+        new_candidates = run.novelty.filter(new_candidates)
+        run.collected.extend(new_candidates)
+        run.collected_ids.update(c["chunk_id"] for c in new_candidates)
+        run.novelty.add(new_candidates)
+        for res, chunk in zip(results, topk_chunks):
+            chunk_id = chunk["chunk_id"]
+            if not chunk_id:
+                continue
+            prev = collected_by_id.get(chunk_id)
+            if not prev or res.get("score", 0.0) > prev.get("score", -1.0):
+                collected_by_id[chunk_id] = chunk
+        if run.step_idx == 0:
+            run.step1_ids = [c.get("chunk_id") for c in topk_chunks if c.get("chunk_id")]
+
+        if self.config.gap_enabled:
+            if run.evidence is None:
+                run.evidence = EvidenceState(query, self.planner.plan(query).query_type)
+            run.evidence.add(new_candidates)
+        self._charge([run], started)
+        return _StepResults(topk_chunks, new_candidates, empty_results, retrieval)
+
+    def _finish_step(self, run: "_QueryRun") -> None:
+        """Gap, gate and stop decisions for the current step, then the trace entry and refinement."""
+        started = time.perf_counter()
+        step_idx = run.step_idx
+        query = run.query
+        pending = run.pending
+        gate_allow = self.config.gate_allow_types or ["YEAR", "COMPARE"]
+
+        if self.config.gap_enabled:
+            gap = run.evidence.gap()
+        else:
+            gap = GapResult(
+                gap_type="NO_GAP",
+                missing_years=[],
+                missing_entity=None,
+                gap_conf=0.0,
             )
 
-            if not gate_decision:
-                stop_reason = "GATE_BLOCKED"
-                break
+        gate_decision = True
+        if self.config.gate_enabled:
+            gap_tag = gap.gap_type
+            if gap_tag == "MISSING_YEAR":
+                gap_tag = "YEAR"
+            elif gap_tag == "MISSING_ENTITY":
+                gap_tag = "COMPARE"
+            gate_decision = (
+                gap.gap_conf >= self.config.gate_min_gap_conf and gap_tag in gate_allow
+            )
 
-            if stop.should_stop:
-                stop_reason = stop.reason
-                break
+        stop = self.stopper.check(
+            step_idx=step_idx,
+            new_chunk_ids=[c.get("chunk_id") for c in pending.new_candidates],
+            gap_type=gap.gap_type,
+            empty_results=pending.empty_results,
+            state=run.state,
+            gap_conf=gap.gap_conf,
+            elapsed_ms=run.cost_ms + 1000.0 * (time.perf_counter() - started),
+        )
 
-            if self.config.refiner_enabled:
-                refinement = refine_query(
-                    query,
-                    gap.gap_type,
-                    gap.missing_years,
-                    gap.missing_entity,
-                )
-                used_query = refinement.refined_query
-            else:
-                used_query = query
-
-        final_topk = self._merge_and_rank(collected_by_id, step1_ids)
-        fallback_added = 0
-        if len(final_topk) < self.config.final_top_k:
-            baseline_results = self.retriever.retrieve(
+        entry = {
+            "step_idx": step_idx,
+            "used_query": run.used_query,
+            "topk_chunks": [
+                {"chunk_id": c["chunk_id"], "score": c["score"]} for c in pending.topk_chunks
+            ],
+            "newly_added_chunk_ids": [c.get("chunk_id") for c in pending.new_candidates],
+            "gap": gap.gap_type,
+            "gap_conf": gap.gap_conf,
+            "gate_decision": gate_decision,
+            "stop_reason": stop.reason,
+        }
+        if pending.retrieval is not None:
+            entry["retrieval"] = pending.retrieval
+        if self._tracks_budget() and step_idx > 0:
+            entry["marginal_gain"] = run.state.gains[-1]
+        run.trace.append(entry)
+        run.pending = None
+
+        if not gate_decision or stop.should_stop:
+            run.stop_reason = "GATE_BLOCKED" if not gate_decision else stop.reason
+            run.done = True
+            self._charge([run], started)
+            return
+
+        if self.config.refiner_enabled:
+            refinement = refine_query(
                 query,
-                top_k=self.config.final_top_k,
-                alpha=self.config.alpha,
-                mode=self.config.mode,
+                gap.gap_type,
+                gap.missing_years,
+                gap.missing_entity,
             )
-            for res in baseline_results:
-                chunk_id = res.get("meta", {}).get("chunk_id")
-                if not chunk_id or chunk_id in collected_by_id:
-                    continue
-                entry = {
-                    "chunk_id": chunk_id,
-                    "score": res.get("score"),
-                    "meta": res.get("meta"),
-                    "text": res.get("text"),
-                }
-                collected_by_id[chunk_id] = entry
-                collected.append(entry)
-                fallback_added += 1
-                if len(collected_by_id) >= self.config.final_top_k:
-                    break
-            final_topk = self._merge_and_rank(collected_by_id, step1_ids)
-
-        if trace:
-            trace[-1]["final_pool_size"] = len(collected_by_id)
-            trace[-1]["final_topk_size"] = len(final_topk)
-            trace[-1]["final_fallback_added"] = fallback_added
-        return collected, trace, stop_reason, final_topk
+            run.used_query = refinement.refined_query
+        else:
+            run.used_query = query
+        run.step_idx += 1
+        run.done = run.step_idx >= self.config.max_steps
+        self._charge([run], started)
+
+    def _tracks_budget(self) -> bool:
+        config = self.config
+        return config.budget_ms > 0 or config.budget_calls > 0 or config.min_marginal_gain > 0
+
+    def _top_up(self, run: "_QueryRun", baseline_results: List[dict]) -> None:
+        """Fill a short final list from a plain retrieve of the original query."""
+        for res in baseline_results:
+            chunk_id = res.get("meta", {}).get("chunk_id")
+            if not chunk_id or chunk_id in run.collected_by_id:
+                continue
+            entry = {
+                "chunk_id": chunk_id,
+                "score": res.get("score"),
+                "meta": res.get("meta"),
+                "text": res.get("text"),
+            }
+            run.collected_by_id[chunk_id] = entry
+            run.collected.append(entry)
+            run.collected_ids.add(chunk_id)
+            run.fallback_added += 1
+            if len(run.collected_by_id) >= self.config.final_top_k:
+                break
+        run.final_topk = self._merge_and_rank(run.collected_by_id, run.step1_ids)
 
     def _merge_and_rank(self, collected_by_id: Dict[str, dict], step1_ids: List[str]) -> List[dict]:
         all_chunks = list(collected_by_id.values())
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
 
@@ -48,37 +48,60 @@ def extract_entities_from_query(query: str) -> List[str]:
     return ordered
 
 
+class EvidenceState:
+    """Years and entity mentions seen so far in a growing chunk pool.
+
+    ``add`` scans only the chunks it is given, so a multistep run that feeds
+    each step's new chunks pays for every chunk once instead of once per step.
+    """
+
+    def __init__(self, query: str, query_type: str) -> None:
+        self.query_years = extract_years(query)
+        self.chunk_years: set = set()
+        self.entities: List[str] = []
+        if query_type == "COMPARE":
+            entities = extract_entities_from_query(query)
+            if len(entities) >= 2:
+                self.entities = entities[:2]
+        self._entity_keys = [e.lower() for e in self.entities]
+        self.entity_found = [False] * len(self.entities)
+
+    def add(self, chunks: Iterable[dict]) -> "EvidenceState":
+        track_entities = not all(self.entity_found)
+        for ch in chunks:
+            text = ch.get("text", "")
+            self.chunk_years.update(m.group(0) for m in YEAR_RE.finditer(text))
+            if track_entities:
+                lowered = text.lower()
+                for idx, key in enumerate(self._entity_keys):
+                    if not self.entity_found[idx] and key in lowered:
+                        self.entity_found[idx] = True
+                track_entities = not all(self.entity_found)
+        return self
+
+    def gap(self) -> GapResult:
+        query_years = self.query_years
+        missing_years = [y for y in query_years if y not in self.chunk_years]
+        if len(query_years) >= 2 and missing_years:
+            return GapResult(
+                gap_type="MISSING_YEAR",
+                missing_years=missing_years,
+                missing_entity=None,
+                gap_conf=len(missing_years) / len(query_years),
+            )
+
+        if self.entities and sum(self.entity_found) == 1:
+            missing_entity = self.entities[1] if self.entity_found[0] else self.entities[0]
+            return GapResult(
+                gap_type="MISSING_ENTITY",
+                missing_years=[],
+                missing_entity=missing_entity,
+                gap_conf=1.0,
+            )
+
+        return GapResult(gap_type="NO_GAP", missing_years=[], missing_entity=None, gap_conf=0.0)
+
+
 def detect_gap(query: str, chunks: List[dict], query_type: str) -> GapResult:
     """Detect missing years/entities to decide whether another retrieval step is needed."""
-    query_years = extract_years(query)
-    chunk_years = set()
-    for ch in chunks:
-        chunk_years.update(extract_years(ch.get("text", "")))
-
-    missing_years = [y for y in query_years if y not in chunk_years]
-    if len(query_years) >= 2 and missing_years:
-        gap_conf = len(missing_years) / len(query_years) if query_years else 0.0
-        return GapResult(
-            gap_type="MISSING_YEAR",
-            missing_years=missing_years,
-            missing_entity=None,
-            gap_conf=gap_conf,
-        )
-
-    if query_type == "COMPARE":
-        entities = extract_entities_from_query(query)
-        if len(entities) >= 2:
-            found = []
-            for e in entities[:2]:
-                if any(e.lower() in (ch.get("text", "").lower()) for ch in chunks):
-                    found.append(e)
-            if len(found) == 1:
-                missing_entity = entities[1] if entities[0] in found else entities[0]
-                return GapResult(
-                    gap_type="MISSING_ENTITY",
-                    missing_years=[],
-                    missing_entity=missing_entity,
-                    gap_conf=1.0,
-                )
-
-    return GapResult(gap_type="NO_GAP", missing_years=[], missing_entity=None, gap_conf=0.0)
+    return EvidenceState(query, query_type).add(chunks).gap()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import zlib
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+import numpy as np
+
+NOVELTY_MODES = ("exact", "minhash")
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def token_set(text: str) -> FrozenSet[str]:
+    """Same tokens ``stop.jaccard`` compares: lowercased whitespace splits."""
+    return frozenset(text.lower().split())
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with ``bands * rows <= num_perm`` whose S-curve midpoint is closest to ``threshold``."""
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class NoveltyIndex:
+    """Token sets of the chunks collected so far, for near-duplicate checks.
+
+    ``exact`` finds overlapping chunks through an inverted index and computes the
+    same Jaccard values as ``stop.jaccard``. ``minhash`` only verifies chunks that
+    share an LSH bucket with the new chunk; a near-duplicate whose signature
+    collides in no band is missed and the chunk is kept.
+    """
+
+    def __init__(self, threshold: float, mode: str = "exact", num_perm: int = 64, seed: int = 0) -> None:
+        if mode not in NOVELTY_MODES:
+            raise ValueError(f"unsupported novelty mode: {mode} (expected one of {NOVELTY_MODES})")
+        self.threshold = threshold
+        self.mode = mode
+        self.token_sets: List[FrozenSet[str]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        if mode == "minhash":
+            rng = np.random.RandomState(seed)
+            self.perm_a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+            self.perm_b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+            self.bands, self.rows = lsh_bands(num_perm, threshold)
+            self.buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self.token_sets)
+
+    def _signature(self, tokens: FrozenSet[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+        values = (np.outer(hashes, self.perm_a) + self.perm_b) % _MERSENNE_PRIME
+        return values.min(axis=0)
+
+    def _band_keys(self, tokens: FrozenSet[str]) -> List[bytes]:
+        signature = self._signature(tokens)
+        return [signature[b * self.rows : (b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def add(self, chunks: Iterable[dict]) -> None:
+        if self.threshold <= 0:
+            # filter() keeps everything; nothing to index.
+            return
+        for ch in chunks:
+            tokens = token_set(ch.get("text") or "")
+            idx = len(self.token_sets)
+            self.token_sets.append(tokens)
+            if not tokens:
+                continue
+            if self.mode == "exact":
+                for token in tokens:
+                    self.postings[token].append(idx)
+            else:
+                for band, key in zip(self.buckets, self._band_keys(tokens)):
+                    band[key].append(idx)
+
+    def _overlaps(self, tokens: FrozenSet[str]) -> Dict[int, int]:
+        """Intersection size with every indexed chunk sharing at least one token."""
+        counts: Dict[int, int] = defaultdict(int)
+        for token in tokens:
+            for idx in self.postings.get(token, ()):
+                counts[idx] += 1
+        return counts
+
+    def _candidates(self, tokens: FrozenSet[str]) -> Dict[int, int]:
+        ids = set()
+        for band, key in zip(self.buckets, self._band_keys(tokens)):
+            ids.update(band.get(key, ()))
+        return {idx: len(tokens & self.token_sets[idx]) for idx in ids}
+
+    def is_novel(self, text: str) -> bool:
+        tokens = token_set(text)
+        if not tokens:
+            return True
+        overlaps = self._overlaps(tokens) if self.mode == "exact" else self._candidates(tokens)
+        for idx, inter in overlaps.items():
+            union = len(tokens) + len(self.token_sets[idx]) - inter
+            if inter / union >= self.threshold:
+                return False
+        return True
+
+    def filter(self, new_chunks: List[dict]) -> List[dict]:
+        """Chunks below ``threshold`` similarity to every indexed chunk (not to each other)."""
+        if self.threshold <= 0:
+            return new_chunks
+        return [ch for ch in new_chunks if not ch.get("text") or self.is_novel(ch["text"])]
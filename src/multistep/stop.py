@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Set
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from multistep.novelty import NOVELTY_MODES, NoveltyIndex
+
+# Gap types whose gap_conf moves as evidence accumulates. MISSING_ENTITY is always 1.0 until
+# the entity turns up (then NO_GAP), so a step's gain says nothing about its progress.
+GRADED_GAPS = ("MISSING_YEAR",)
 
 
 def jaccard(a: str, b: str) -> float:
@@ -15,6 +21,10 @@ def jaccard(a: str, b: str) -> float:
 @dataclass
 class StopState:
     no_new_steps: int = 0
+    retrieve_calls: int = 0
+    # Drop in gap confidence per step (positive means the gap is closing).
+    gains: List[float] = field(default_factory=list)
+    last_gap_conf: Optional[float] = None
 
 
 @dataclass
@@ -24,10 +34,27 @@ class StopResult:
 
 
 class StopCriteria:
-    def __init__(self, max_steps: int, no_new_steps_limit: int, novelty_threshold: float) -> None:
+    def __init__(
+        self,
+        max_steps: int,
+        no_new_steps_limit: int,
+        novelty_threshold: float,
+        novelty_mode: str = "exact",
+        novelty_num_perm: int = 64,
+        budget_ms: float = 0.0,
+        budget_calls: int = 0,
+        min_marginal_gain: float = 0.0,
+    ) -> None:
+        if novelty_mode not in NOVELTY_MODES:
+            raise ValueError(f"unsupported novelty mode: {novelty_mode} (expected one of {NOVELTY_MODES})")
         self.max_steps = max_steps
         self.no_new_steps_limit = no_new_steps_limit
         self.novelty_threshold = novelty_threshold
+        self.novelty_mode = novelty_mode
+        self.novelty_num_perm = novelty_num_perm
+        self.budget_ms = budget_ms
+        self.budget_calls = budget_calls
+        self.min_marginal_gain = min_marginal_gain
 
     def check(
         self,
@@ -36,8 +63,17 @@ class StopCriteria:
         gap_type: str,
         empty_results: bool,
         state: StopState,
+        gap_conf: float = 0.0,
+        elapsed_ms: float = 0.0,
     ) -> StopResult:
-        """Return whether to stop multi-step retrieval based on gap and novelty signals."""
+        """Return whether to stop multi-step retrieval based on gap, novelty and budget signals.
+
+        ``elapsed_ms`` and ``state.retrieve_calls`` are what the query has spent so far; a
+        millisecond budget also stops when one more step of average cost would overrun it.
+        """
+        if state.last_gap_conf is not None:
+            state.gains.append(state.last_gap_conf - gap_conf)
+        state.last_gap_conf = gap_conf
         if empty_results:
             return StopResult(True, "EMPTY_RESULTS")
         if gap_type == "NO_GAP":
@@ -50,18 +86,27 @@ class StopCriteria:
             state.no_new_steps = 0
         if state.no_new_steps >= self.no_new_steps_limit:
             return StopResult(True, "NO_NEW_EVIDENCE")
+        if (
+            self.min_marginal_gain > 0
+            and gap_type in GRADED_GAPS
+            and state.gains
+            and state.gains[-1] < self.min_marginal_gain
+        ):
+            return StopResult(True, "LOW_GAIN")
+        if self.budget_calls > 0 and state.retrieve_calls >= self.budget_calls:
+            return StopResult(True, "BUDGET_EXHAUSTED")
+        if self.budget_ms > 0 and elapsed_ms * (step_idx + 2) / (step_idx + 1) > self.budget_ms:
+            return StopResult(True, "BUDGET_EXHAUSTED")
         return StopResult(False, "CONTINUE")
 
+    def novelty_index(self) -> NoveltyIndex:
+        """Empty index to grow alongside one query's collected pool."""
+        return NoveltyIndex(self.novelty_threshold, mode=self.novelty_mode, num_perm=self.novelty_num_perm)
+
     def novelty_filter(self, new_chunks: List[dict], existing_chunks: List[dict]) -> List[dict]:
         """Filter near-duplicate chunks using Jaccard similarity threshold."""
         if self.novelty_threshold <= 0:
             return new_chunks
-        filtered = []
-        for ch in new_chunks:
-            text = ch.get("text", "")
-            if not text:
-                filtered.append(ch)
-                continue
-            if all(jaccard(text, ex.get("text", "")) < self.novelty_threshold for ex in existing_chunks):
-                filtered.append(ch)
-        return filtered
+        index = self.novelty_index()
+        index.add(existing_chunks)
+        return index.filter(new_chunks)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from retrieval.coarse import COARSE_TYPES
+from retrieval.dense_store import DenseStore
+from retrieval.hnsw import NumpyHNSW
+
+logger = logging.getLogger(__name__)
+
+FAISS_TYPES = ("flatip", "ivfflat", "ivfpq", "hnsw")
+
+
+@dataclass
+class IndexConfig:
+    faiss_type: str = "flatip"
+    nlist: int = 256
+    nprobe: int = 16
+    pq_m: int = 16
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 80
+    ef_search: int = 64
+    train_size: int = 50000
+    index_path: Optional[str] = None
+    seed: int = 42
+    brute_force_fallback: bool = True
+    dense_coarse: str = "none"
+    rescore_oversample: int = 4
+
+
+def index_config_from_dict(index_cfg: Dict[str, Any]) -> IndexConfig:
+    cfg = IndexConfig()
+    for key in asdict(cfg):
+        val = index_cfg.get(key)
+        if val is not None:
+            setattr(cfg, key, val)
+    cfg.faiss_type = str(cfg.faiss_type).lower()
+    if cfg.faiss_type not in FAISS_TYPES:
+        raise ValueError(f"unsupported faiss_type: {cfg.faiss_type} (expected one of {FAISS_TYPES})")
+    cfg.dense_coarse = str(cfg.dense_coarse).lower()
+    if cfg.dense_coarse not in COARSE_TYPES:
+        raise ValueError(f"unsupported dense_coarse: {cfg.dense_coarse} (expected one of {COARSE_TYPES})")
+    return cfg
+
+
+def embeddings_fingerprint(store: DenseStore) -> str:
+    """sha1 of the stored (possibly quantized) rows and scales, read block by block."""
+    digest = hashlib.sha1()
+    for start in range(0, len(store), store.block_size):
+        digest.update(np.ascontiguousarray(store.matrix[start : start + store.block_size]).view(np.uint8))
+    if store.scales is not None:
+        digest.update(np.ascontiguousarray(store.scales).view(np.uint8))
+    digest.update(f"{store.dtype}{tuple(store.shape)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _train_sample(store: DenseStore, cfg: IndexConfig) -> np.ndarray:
+    num = len(store)
+    if num <= cfg.train_size:
+        return store.vectors(np.arange(num))
+    rng = np.random.default_rng(cfg.seed)
+    rows = np.sort(rng.choice(num, size=cfg.train_size, replace=False))
+    return store.vectors(rows)
+
+
+def build_faiss_index(faiss_mod, store: DenseStore, cfg: IndexConfig):
+    """Build an inner-product FAISS index of type ``cfg.faiss_type`` over normalized embeddings.
+
+    Rows are added in ``store.block_size`` float32 blocks, so a quantized store is
+    never dequantized whole; only the training sample is materialized at once.
+    """
+    dim = store.shape[1]
+    metric = faiss_mod.METRIC_INNER_PRODUCT
+    if cfg.faiss_type == "flatip":
+        index = faiss_mod.IndexFlatIP(dim)
+    elif cfg.faiss_type == "hnsw":
+        index = faiss_mod.IndexHNSWFlat(dim, int(cfg.hnsw_m), metric)
+        index.hnsw.efConstruction = int(cfg.ef_construction)
+    else:
+        sample = _train_sample(store, cfg)
+        # IVF needs at least one training point per list, PQ one per centroid (2**pq_nbits).
+        nlist = max(1, min(int(cfg.nlist), len(sample)))
+        quantizer = faiss_mod.IndexFlatIP(dim)
+        pq_nbits = min(int(cfg.pq_nbits), len(sample).bit_length() - 1)
+        if cfg.faiss_type == "ivfpq" and dim % int(cfg.pq_m) != 0:
+            raise ValueError(f"pq_m={cfg.pq_m} must divide embedding dim {dim}")
+        if cfg.faiss_type == "ivfpq" and pq_nbits < int(cfg.pq_nbits):
+            logger.warning(
+                "ivfpq pq_nbits=%s needs %d training vectors, got %d; using %s",
+                cfg.pq_nbits,
+                2 ** int(cfg.pq_nbits),
+                len(sample),
+                f"pq_nbits={pq_nbits}" if pq_nbits >= 1 else "ivfflat",
+            )
+        if cfg.faiss_type == "ivfpq" and pq_nbits >= 1:
+            index = faiss_mod.IndexIVFPQ(quantizer, dim, nlist, int(cfg.pq_m), pq_nbits, metric)
+        else:
+            index = faiss_mod.IndexIVFFlat(quantizer, dim, nlist, metric)
+        index.train(sample)
+    for _, block in store.blocks():
+        index.add(block)
+    return index
+
+
+def index_build_params(cfg: IndexConfig) -> Dict[str, Any]:
+    """Settings that change the built index (search-time nprobe/ef_search excluded)."""
+    return {
+        "faiss_type": cfg.faiss_type,
+        "nlist": cfg.nlist,
+        "pq_m": cfg.pq_m,
+        "pq_nbits": cfg.pq_nbits,
+        "hnsw_m": cfg.hnsw_m,
+        "ef_construction": cfg.ef_construction,
+        "train_size": cfg.train_size,
+        "seed": cfg.seed,
+    }
+
+
+def apply_search_params(index, cfg: IndexConfig) -> None:
+    if cfg.faiss_type in {"ivfflat", "ivfpq"}:
+        index.nprobe = int(cfg.nprobe)
+    elif cfg.faiss_type == "hnsw":
+        index.hnsw.efSearch = int(cfg.ef_search)
+
+
+def load_or_build_faiss_index(faiss_mod, store: DenseStore, cfg: IndexConfig):
+    """Reuse ``cfg.index_path`` when it was built from the same embeddings and settings."""
+    fingerprint = embeddings_fingerprint(store) if cfg.index_path else None
+    build_params = dict(index_build_params(cfg), fingerprint=fingerprint)
+    meta_path = f"{cfg.index_path}.json" if cfg.index_path else None
+    index = None
+    if cfg.index_path and os.path.exists(cfg.index_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved == build_params:
+            index = faiss_mod.read_index(cfg.index_path)
+            logger.info("faiss_index loaded path=%s type=%s", cfg.index_path, cfg.faiss_type)
+        else:
+            logger.info("faiss_index stale, rebuilding path=%s", cfg.index_path)
+    if index is None:
+        index = build_faiss_index(faiss_mod, store, cfg)
+        if cfg.index_path:
+            parent = os.path.dirname(cfg.index_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            faiss_mod.write_index(index, cfg.index_path)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(build_params, f, indent=2)
+    apply_search_params(index, cfg)
+    return index
+
+
+def load_or_build_numpy_hnsw(store: DenseStore, cfg: IndexConfig) -> NumpyHNSW:
+    """NumPy HNSW used when FAISS is missing; persisted next to ``cfg.index_path`` when set.
+
+    The graph searches float32 vectors: a float32 store's rows are used in place,
+    other stores are dequantized block by block into the graph's buffer.
+    """
+    float32 = store.dtype == "float32"
+    path = f"{cfg.index_path}.hnsw" if cfg.index_path else None
+    build_params = {
+        "hnsw_m": cfg.hnsw_m,
+        "ef_construction": cfg.ef_construction,
+        "seed": cfg.seed,
+        "fingerprint": embeddings_fingerprint(store) if path else None,
+    }
+    meta_path = f"{path}.json" if path else None
+    if path and os.path.isdir(path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved == build_params:
+            index = NumpyHNSW.load(path, vectors=store.matrix if float32 else None)
+            index.ef_search = int(cfg.ef_search)
+            logger.info("numpy_hnsw loaded path=%s", path)
+            return index
+        logger.info("numpy_hnsw stale, rebuilding path=%s", path)
+    index = NumpyHNSW(
+        dim=store.shape[1],
+        m=int(cfg.hnsw_m),
+        ef_construction=int(cfg.ef_construction),
+        ef_search=int(cfg.ef_search),
+        seed=int(cfg.seed),
+    )
+    if float32:
+        index.add(store.matrix)
+    else:
+        index.reserve(len(store))
+        for _, block in store.blocks():
+            index.add(block)
+    if path:
+        # The fingerprint ties a float32 graph to ``store``, which the caller supplies on load.
+        index.save(path, with_vectors=not float32)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(build_params, f, indent=2)
+    return index
+
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray, k: int) -> float:
+    """Mean overlap between approximate and exact top-k id lists."""
+    if len(exact_ids) == 0 or k <= 0:
+        return 0.0
+    total = 0.0
+    for approx_row, exact_row in zip(approx_ids, exact_ids):
+        exact_set = set(int(i) for i in exact_row[:k])
+        if not exact_set:
+            continue
+        hits = sum(1 for i in approx_row[:k] if int(i) in exact_set)
+        total += hits / len(exact_set)
+    return total / len(exact_ids)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+from collections.abc import Sequence as SequenceABC
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+from retrieval.embedding_cache import model_fingerprint
+
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CHUNKS_FILE = "chunks.jsonl"
+OFFSETS_FILE = "chunk_offsets.npy"
+BM25_DIR = "bm25"
+FAISS_FILE = "faiss.index"
+HNSW_DIR = "hnsw"
+
+
+def file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def corpus_source(corpus_path: str) -> Dict[str, Any]:
+    """Size, mtime and sha1 of the corpus file an artifact was built from."""
+    stat = os.stat(corpus_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": file_sha1(corpus_path)}
+
+
+def corpus_matches(manifest: Dict[str, Any], corpus_path: str) -> bool:
+    """True when ``corpus_path`` is the corpus ``manifest`` records under ``corpus_source``.
+
+    An unchanged size and mtime accept the corpus without reading it; otherwise its
+    sha1 is compared with the recorded one. Manifests without a corpus source fall
+    back to their ``corpus_hash``.
+    """
+    if not os.path.exists(corpus_path):
+        return False
+    source = manifest.get("corpus_source")
+    if source is None:
+        return manifest.get("corpus_hash") == file_sha1(corpus_path)
+    stat = os.stat(corpus_path)
+    if stat.st_size != source.get("size"):
+        return False
+    return stat.st_mtime_ns == source.get("mtime_ns") or file_sha1(corpus_path) == source.get("sha1")
+
+
+def chunk_line(text: str, meta: Dict[str, Any]) -> str:
+    # Same serialization as scripts/build_corpus.py, so the artifact's corpus hash
+    # equals the hash of the chunks.jsonl it was built from.
+    return json.dumps({"text": text, "meta": meta}) + "\n"
+
+
+def write_chunks(path: str, texts: Sequence[str], metas: Sequence[Dict[str, Any]]) -> str:
+    """Write the chunk table plus byte offsets; returns the sha1 of the written file."""
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    digest = hashlib.sha1()
+    with open(os.path.join(path, CHUNKS_FILE), "wb") as f:
+        for idx, (text, meta) in enumerate(zip(texts, metas)):
+            line = chunk_line(text, meta).encode("utf-8")
+            f.write(line)
+            digest.update(line)
+            offsets[idx + 1] = offsets[idx] + len(line)
+    np.save(os.path.join(path, OFFSETS_FILE), offsets)
+    return digest.hexdigest()
+
+
+def read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    # Written last: a directory without a manifest is never treated as an artifact.
+    tmp_path = os.path.join(path, MANIFEST_FILE + f".tmp{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+
+def artifact_matches(
+    path: str,
+    model_name: str,
+    corpus_path: str,
+    embedding_dtype: str = "float32",
+) -> bool:
+    """True when ``path`` holds an artifact for this model and storage dtype built from ``corpus_path``.
+
+    Models are compared by ``model_fingerprint``, so a local checkpoint retrained in
+    place no longer matches embeddings encoded by its previous weights.
+
+    The corpus is checked by ``corpus_matches``; artifacts saved without a corpus
+    source fall back to the hash of their re-serialized chunk table.
+    """
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get("version") != ARTIFACT_VERSION:
+        return False
+    saved_model = manifest.get("model_fingerprint", manifest.get("model_name"))
+    if saved_model != model_fingerprint(model_name):
+        return False
+    if manifest.get("embedding_dtype", "float32") != embedding_dtype:
+        return False
+    return corpus_matches(manifest, corpus_path)
+
+
+class ChunkStore:
+    """Read-only chunk table backed by an mmap'd JSONL file and a byte-offset array."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+        self._data: Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        if self._data is None:
+            with open(os.path.join(self.path, CHUNKS_FILE), "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        return json.loads(self._data[start:end])
+
+    def column(self, field: str) -> "ChunkColumn":
+        return ChunkColumn(self, field)
+
+
+class ChunkColumn(SequenceABC):
+    """Lazy list-like view of one field (``text`` or ``meta``) of a ChunkStore."""
+
+    def __init__(self, store: ChunkStore, field: str) -> None:
+        self.store = store
+        self.field = field
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.store.row(i)[self.field] for i in range(*idx.indices(len(self)))]
+        return self.store.row(idx)[self.field]
+
+    def __iter__(self) -> Iterator[Any]:
+        for idx in range(len(self)):
+            yield self.store.row(idx)[self.field]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+PARAMS_FILE = "bm25_params.json"
+VOCAB_FILE = "bm25_vocab.json"
+ARRAY_FILES = ("indptr", "doc_ids", "weights", "doc_len")
+
+
+class SparseBM25:
+    """Okapi BM25 over a CSR inverted index.
+
+    Scores are identical to ``rank_bm25.BM25Okapi``: the per-posting term weight
+    ``idf * tf * (k1 + 1) / (tf + k1 * norm)`` is query independent, so it is
+    precomputed once and scoring only scatters the postings of each query token.
+    """
+
+    def __init__(
+        self,
+        corpus: Optional[Sequence[List[str]]] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.corpus_size = 0
+        self.avgdl = 0.0
+        self.average_idf = 0.0
+        self.vocab: Dict[str, int] = {}
+        self.idf: Dict[str, float] = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float64)
+        self.doc_len = np.zeros(0, dtype=np.int64)
+        if corpus is not None:
+            self._build(corpus)
+
+    def _build(self, corpus: Sequence[List[str]]) -> None:
+        nd: Dict[str, int] = {}
+        doc_len: List[int] = []
+        term_ids: List[int] = []
+        post_docs: List[int] = []
+        post_tfs: List[int] = []
+        total_len = 0
+        for doc_idx, document in enumerate(corpus):
+            doc_len.append(len(document))
+            total_len += len(document)
+            frequencies = Counter(document)
+            for word, freq in frequencies.items():
+                term_id = self.vocab.setdefault(word, len(self.vocab))
+                nd[word] = nd.get(word, 0) + 1
+                term_ids.append(term_id)
+                post_docs.append(doc_idx)
+                post_tfs.append(freq)
+
+        self.corpus_size = len(doc_len)
+        self.avgdl = total_len / self.corpus_size
+        self.doc_len = np.array(doc_len, dtype=np.int64)
+        self._calc_idf(nd)
+
+        terms = np.array(term_ids, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+        self.doc_ids = np.array(post_docs, dtype=np.int32)[order]
+        tfs = np.array(post_tfs, dtype=np.int64)[order]
+        counts = np.bincount(terms, minlength=len(self.vocab))
+        self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        # Same operation order as BM25Okapi.get_scores so the float64 results match bit for bit.
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl)
+        idf_by_term = np.zeros(len(self.vocab), dtype=np.float64)
+        for word, term_id in self.vocab.items():
+            idf_by_term[term_id] = self.idf[word]
+        idf_per_posting = np.repeat(idf_by_term, counts)
+        self.weights = idf_per_posting * (tfs * (self.k1 + 1) / (tfs + norm[self.doc_ids]))
+
+    def _calc_idf(self, nd: Dict[str, int]) -> None:
+        idf_sum = 0.0
+        negative_idfs = []
+        for word, freq in nd.items():
+            idf = math.log(self.corpus_size - freq + 0.5) - math.log(freq + 0.5)
+            self.idf[word] = idf
+            idf_sum += idf
+            if idf < 0:
+                negative_idfs.append(word)
+        self.average_idf = idf_sum / len(self.idf) if self.idf else 0.0
+        eps = self.epsilon * self.average_idf
+        for word in negative_idfs:
+            self.idf[word] = eps
+
+    def get_scores(self, query: List[str]) -> np.ndarray:
+        return self.add_scores(np.zeros(self.corpus_size), query)
+
+    def add_scores(self, scores: np.ndarray, query: List[str]) -> np.ndarray:
+        """Add the contributions of ``query`` tokens to ``scores`` in place.
+
+        BM25 is a sum over query tokens, so ``add_scores(get_scores(a), b)``
+        equals ``get_scores(a + b)`` bit for bit.
+        """
+        for token in query:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            # Posting lists hold each document once, so fancy-index += is safe.
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        return scores
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAY_FILES:
+            np.save(os.path.join(path, f"bm25_{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump(sorted(self.vocab, key=self.vocab.get), f, ensure_ascii=False)
+        params = {
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "corpus_size": self.corpus_size,
+            "avgdl": self.avgdl,
+            "average_idf": self.average_idf,
+        }
+        with open(os.path.join(path, PARAMS_FILE), "w", encoding="utf-8") as f:
+            json.dump(params, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "SparseBM25":
+        with open(os.path.join(path, PARAMS_FILE), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        bm25 = cls(k1=params["k1"], b=params["b"], epsilon=params["epsilon"])
+        bm25.corpus_size = int(params["corpus_size"])
+        bm25.avgdl = float(params["avgdl"])
+        bm25.average_idf = float(params["average_idf"])
+        mmap_mode = "r" if mmap else None
+        for name in ARRAY_FILES:
+            setattr(bm25, name, np.load(os.path.join(path, f"bm25_{name}.npy"), mmap_mode=mmap_mode))
+        with open(os.path.join(path, VOCAB_FILE), "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        bm25.vocab = {term: idx for idx, term in enumerate(terms)}
+        return bm25
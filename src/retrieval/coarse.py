@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Union
+
+import numpy as np
+
+from retrieval.dense_store import DenseStore
+from retrieval.topk import top_k_indices
+
+COARSE_TYPES = ("none", "binary", "int8")
+
+# Set bits per byte value; numpy < 2.0 has no bitwise_count.
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class CoarseIndex:
+    """First-stage dense scorer over compressed codes.
+
+    ``binary`` keeps one sign bit per dimension and ranks by Hamming distance;
+    ``int8`` uses scalar-quantized inner products. Callers rescore the returned
+    candidates with full-precision vectors. Built from a ``DenseStore`` the codes
+    are computed block by block, without a full float32 copy.
+    """
+
+    def __init__(
+        self,
+        embeddings: Union[np.ndarray, DenseStore],
+        kind: str = "binary",
+        block_size: int = 16384,
+    ) -> None:
+        if kind not in COARSE_TYPES or kind == "none":
+            raise ValueError(f"unsupported coarse type: {kind}")
+        store = embeddings if isinstance(embeddings, DenseStore) else DenseStore.from_float32(embeddings)
+        self.kind = kind
+        self.block_size = block_size
+        self.num = len(store)
+        if kind == "binary":
+            self.codes = np.empty((self.num, -(-store.shape[1] // 8)), dtype=np.uint8)
+            for start, block in store.blocks():
+                self.codes[start : start + block.shape[0]] = np.packbits(block > 0, axis=1)
+            self.store = None
+        else:
+            self.codes = None
+            self.store = store.to_int8()
+
+    def scores(self, query_vecs: np.ndarray) -> np.ndarray:
+        """Coarse similarity (higher is better) of each query against every vector."""
+        if self.store is not None:
+            return self.store.scores(query_vecs)
+        query_codes = np.packbits(np.asarray(query_vecs) > 0, axis=1)
+        out = np.empty((query_codes.shape[0], self.num), dtype=np.int32)
+        for start in range(0, self.num, self.block_size):
+            block = self.codes[start : start + self.block_size]
+            for row, code in enumerate(query_codes):
+                distance = _POPCOUNT[np.bitwise_xor(block, code)].sum(axis=1, dtype=np.int32)
+                out[row, start : start + block.shape[0]] = -distance
+        return out
+
+    def search(self, query_vecs: np.ndarray, m: int) -> np.ndarray:
+        """Top-m ids per query by coarse score."""
+        return top_k_indices(self.scores(query_vecs), min(m, self.num))
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+VECTORS_FILE = "embeddings.npy"
+SCALES_FILE = "embedding_scales.npy"
+
+
+class DenseStore:
+    """Chunk embeddings stored as float32, float16 or per-dimension scaled int8.
+
+    Opened from disk the arrays stay memory-mapped, so processes scoring the
+    same artifact share one copy through the OS page cache. Scores are computed
+    block by block, dequantizing only ``block_size`` rows at a time.
+    """
+
+    def __init__(self, matrix: np.ndarray, scales: Optional[np.ndarray] = None, block_size: int = 16384):
+        self.matrix = matrix
+        self.scales = scales
+        self.block_size = block_size
+        self.dtype = str(matrix.dtype)
+        if self.dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"unsupported embedding dtype: {self.dtype}")
+        if self.dtype == "int8" and scales is None:
+            raise ValueError("int8 embeddings need per-dimension scales")
+
+    @classmethod
+    def from_float32(cls, embeddings: np.ndarray, dtype: str = "float32") -> "DenseStore":
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dtype == "float32":
+            return cls(embeddings)
+        if dtype == "float16":
+            return cls(embeddings.astype(np.float16))
+        if dtype == "int8":
+            return cls(embeddings).to_int8()
+        raise ValueError(f"unsupported embedding dtype: {dtype} (expected one of {EMBEDDING_DTYPES})")
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    def _dequantize(self, rows: np.ndarray) -> np.ndarray:
+        rows = rows.astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales
+        return rows
+
+    def vectors(self, ids: np.ndarray) -> np.ndarray:
+        """Float32 (dequantized) rows for ``ids``."""
+        return self._dequantize(self.matrix[ids])
+
+    def blocks(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """(start row, float32 rows) for consecutive ``block_size`` slices."""
+        for start in range(0, len(self), self.block_size):
+            yield start, self._dequantize(self.matrix[start : start + self.block_size])
+
+    def to_int8(self) -> "DenseStore":
+        """Per-dimension scaled int8 copy, built block by block (``self`` when already int8)."""
+        if self.dtype == "int8":
+            return self
+        # Symmetric scalar quantization: column d is stored as round(x / scale_d).
+        max_abs = np.zeros(self.shape[1], dtype=np.float32)
+        for _, block in self.blocks():
+            np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+        scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        codes = np.empty(self.shape, dtype=np.int8)
+        for start, block in self.blocks():
+            codes[start : start + block.shape[0]] = np.clip(np.rint(block / scales), -127, 127)
+        return DenseStore(codes, scales, self.block_size)
+
+    def scores(self, query_vecs: np.ndarray) -> np.ndarray:
+        """Inner products of each query with every stored vector: (num_queries, num_chunks)."""
+        if self.dtype == "float32":
+            return np.dot(query_vecs, self.matrix.T)
+        query_vecs = np.asarray(query_vecs, dtype=np.float32)
+        if self.scales is not None:
+            # (q * s) . c == q . (s * c): fold the scales into the query once.
+            query_vecs = query_vecs * self.scales
+        out = np.empty((query_vecs.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), self.block_size):
+            block = self.matrix[start : start + self.block_size].astype(np.float32)
+            out[:, start : start + block.shape[0]] = np.dot(query_vecs, block.T)
+        return out
+
+    def save(self, path: str) -> None:
+        np.save(os.path.join(path, VECTORS_FILE), np.asarray(self.matrix))
+        scales_path = os.path.join(path, SCALES_FILE)
+        if self.scales is not None:
+            np.save(scales_path, self.scales)
+        elif os.path.exists(scales_path):
+            os.remove(scales_path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "DenseStore":
+        matrix = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r" if mmap else None)
+        scales = None
+        if matrix.dtype == np.int8:
+            scales = np.load(os.path.join(path, SCALES_FILE))
+        return cls(matrix, scales)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Keys and vectors share one file so that a shard is replaced atomically; two files
+# replaced one after the other can pair one writer's keys with another's rows.
+SHARD_FILE = "shard.npz"
+MODEL_FILE = "model.txt"
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def model_fingerprint(model_name: str) -> str:
+    """Identify a model; local checkpoints also hash their file sizes and mtimes."""
+    if not os.path.isdir(model_name):
+        return model_name
+    parts = [os.path.abspath(model_name)]
+    for root, _, files in sorted(os.walk(model_name)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            parts.append(f"{os.path.relpath(path, model_name)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+class EmbeddingCache:
+    """Content-addressed chunk embeddings keyed by text hash, one shard per model."""
+
+    def __init__(self, cache_dir: str, model_key: str) -> None:
+        self.model_key = model_key
+        shard = hashlib.sha1(model_key.encode("utf-8")).hexdigest()[:16]
+        self.shard_dir = os.path.join(cache_dir, shard)
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Tuple[List[str], Optional[np.ndarray]]:
+        path = os.path.join(self.shard_dir, SHARD_FILE)
+        if not os.path.exists(path):
+            return [], None
+        try:
+            with np.load(path) as data:
+                keys = data["keys"].tolist()
+                vectors = data["vectors"]
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning("embedding cache shard unreadable, ignoring: %s (%s)", path, exc)
+            return [], None
+        if vectors.shape[0] != len(keys):
+            logger.warning("embedding cache shard inconsistent, ignoring: %s", path)
+            return [], None
+        return keys, vectors
+
+    def _write(self, keys: List[str], vectors: np.ndarray) -> None:
+        """Replace the shard with ``keys``/``vectors``.
+
+        Concurrent writers that read the same shard each replace it whole; the last
+        one wins and the other's additions are re-encoded by a later run.
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        path = os.path.join(self.shard_dir, SHARD_FILE)
+        tmp_path = f"{path}.tmp{os.getpid()}.npz"
+        np.savez(tmp_path, keys=np.array(keys), vectors=vectors)
+        os.replace(tmp_path, path)
+        with open(os.path.join(self.shard_dir, MODEL_FILE), "w", encoding="utf-8") as f:
+            f.write(self.model_key + "\n")
+
+    def encode(self, model, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Return normalized float32 embeddings, encoding only texts missing from the cache."""
+        keys, vectors = self._load()
+        row_by_key: Dict[str, int] = {k: i for i, k in enumerate(keys)}
+        text_keys = [text_key(t) for t in texts]
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(text_keys, texts):
+            if key not in row_by_key and key not in missing:
+                missing[key] = text
+        self.hits = sum(1 for k in text_keys if k in row_by_key)
+        self.misses = len(texts) - self.hits
+
+        if missing:
+            new_keys = list(missing.keys())
+            new_vectors = model.encode(
+                list(missing.values()),
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                batch_size=batch_size,
+                show_progress_bar=False,
+            ).astype("float32")
+            # Rows are looked up in what this call wrote, not in a re-read shard
+            # that a concurrent writer may already have replaced.
+            offset = len(keys)
+            keys = keys + new_keys
+            vectors = new_vectors if vectors is None else np.concatenate([vectors, new_vectors])
+            row_by_key.update({k: offset + i for i, k in enumerate(new_keys)})
+            try:
+                self._write(keys, vectors)
+            except OSError as exc:
+                logger.warning("embedding cache write failed (%s), using in-memory vectors", exc)
+
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+        rows = np.fromiter((row_by_key[k] for k in text_keys), dtype=np.int64, count=len(texts))
+        return np.asarray(vectors[rows], dtype="float32")
@@ -35,6 +35,20 @@ def match_chunk(
     return False, "none", None
 
 
+def retrieve_many(
+    retriever,
+    queries: List[str],
+    top_k: int,
+    alpha: float = 0.5,
+    mode: str = "hybrid",
+) -> List[List[Dict[str, Any]]]:
+    """Use the batched retrieve API when the retriever has one."""
+    retrieve_batch = getattr(retriever, "retrieve_batch", None)
+    if retrieve_batch is not None:
+        return retrieve_batch(queries, top_k=top_k, alpha=alpha, mode=mode)
+    return [retriever.retrieve(q, top_k=top_k, alpha=alpha, mode=mode) for q in queries]
+
+
 def compute_retrieval_metrics(
     eval_records: Iterable[Dict[str, Any]],
     retriever,
@@ -50,13 +64,13 @@ def compute_retrieval_metrics(
     mrr_scores = {k: [] for k in k_values}
     fallback_queries = 0
 
-    for rec in eval_records:
+    records = [rec for rec in eval_records if rec.get("evidences", [])]
+    queries = [rec.get("query", "") for rec in records]
+    batch_results = retrieve_many(retriever, queries, top_k=k_max, alpha=alpha, mode=mode)
+
+    for rec, results in zip(records, batch_results):
         qid = rec.get("qid")
         gold_evidences = rec.get("evidences", [])
-        if not gold_evidences:
-            continue
-
-        results = retriever.retrieve(rec.get("query", ""), top_k=k_max, alpha=alpha, mode=mode)
         hits = []
         matched_ids_by_rank: List[Optional[int]] = []
         used_fallback = False
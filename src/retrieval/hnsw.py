@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+GRAPH_FILE = "hnsw_graph.json"
+VECTORS_FILE = "hnsw_vectors.npy"
+
+
+class NumpyHNSW:
+    """Hierarchical navigable small-world graph for inner-product search.
+
+    A dependency-free stand-in for ``faiss.IndexHNSWFlat`` on normalized
+    embeddings: vectors can be added incrementally, ``ef_search`` trades recall
+    for latency, and the graph round-trips through ``save``/``load``.
+    Vectors live in a buffer that grows geometrically; the first batch added to
+    an empty index (or the array given to ``load``) is used without copying.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        m: int = 16,
+        ef_construction: int = 80,
+        ef_search: int = 64,
+        seed: int = 42,
+    ) -> None:
+        self.dim = dim
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1.0 / math.log(max(m, 2))
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self._data = np.zeros((0, dim), dtype=np.float32)
+        self._count = 0
+        self.levels: List[int] = []
+        # links[level][node] -> neighbour ids
+        self.links: List[Dict[int, List[int]]] = []
+        self.entry_point: Optional[int] = None
+        self.max_level = -1
+
+    @property
+    def ntotal(self) -> int:
+        return len(self.levels)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._data[: self._count]
+
+    def _similarity(self, query: np.ndarray, ids: List[int]) -> np.ndarray:
+        return np.dot(self._data[ids], query)
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_ids: List[int],
+        ef: int,
+        level: int,
+    ) -> List[Tuple[float, int]]:
+        """Best-first search on one layer; returns up to ef (similarity, id) pairs, best first."""
+        visited = set(entry_ids)
+        sims = self._similarity(query, entry_ids)
+        candidates = [(-float(s), i) for s, i in zip(sims, entry_ids)]
+        heapq.heapify(candidates)
+        best = [(float(s), i) for s, i in zip(sims, entry_ids)]
+        heapq.heapify(best)
+        while len(best) > ef:
+            heapq.heappop(best)
+        layer = self.links[level]
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if len(best) >= ef and -neg_sim < best[0][0]:
+                break
+            fresh = [n for n in layer.get(node, []) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for sim, neighbour in zip(self._similarity(query, fresh), fresh):
+                sim = float(sim)
+                if len(best) < ef or sim > best[0][0]:
+                    heapq.heappush(candidates, (-sim, neighbour))
+                    heapq.heappush(best, (sim, neighbour))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return sorted(best, key=lambda x: (-x[0], x[1]))
+
+    def _select_neighbours(self, candidates: List[Tuple[float, int]], limit: int) -> List[int]:
+        """Diversity heuristic: keep a candidate only if it is closer to the base than to kept ones."""
+        selected: List[int] = []
+        for sim, node in candidates:
+            if len(selected) >= limit:
+                break
+            if selected:
+                to_selected = self._similarity(self._data[node], selected)
+                if float(to_selected.max()) > sim:
+                    continue
+            selected.append(node)
+        if len(selected) < limit:
+            chosen = set(selected)
+            for _, node in candidates:
+                if len(selected) >= limit:
+                    break
+                if node not in chosen:
+                    selected.append(node)
+                    chosen.add(node)
+        return selected
+
+    def _connect(self, node: int, neighbours: List[int], level: int) -> None:
+        layer = self.links[level]
+        layer[node] = list(neighbours)
+        limit = self.m0 if level == 0 else self.m
+        for other in neighbours:
+            links = layer.setdefault(other, [])
+            links.append(node)
+            if len(links) > limit:
+                sims = self._similarity(self._data[other], links)
+                ranked = sorted(zip(sims.tolist(), links), key=lambda x: (-x[0], x[1]))
+                layer[other] = self._select_neighbours(ranked, limit)
+
+    def reserve(self, capacity: int) -> None:
+        """Allocate room for ``capacity`` vectors in total (callers adding in blocks avoid regrowth)."""
+        capacity = max(capacity, self._count)
+        if capacity > len(self._data) or not self._data.flags.writeable:
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[: self._count] = self._data[: self._count]
+            self._data = grown
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        start = self._count
+        end = start + vectors.shape[0]
+        if start == 0 and len(self._data) == 0:
+            self._data = vectors
+        else:
+            if end > len(self._data) or not self._data.flags.writeable:
+                self.reserve(max(end, 2 * len(self._data)))
+            self._data[start:end] = vectors
+        self._count = end
+        for node in range(start, end):
+            self._insert(node)
+
+    def _insert(self, node: int) -> None:
+        level = int(-math.log(1.0 - self.rng.random()) * self.level_mult)
+        self.levels.append(level)
+        while len(self.links) <= level:
+            self.links.append({})
+        if self.entry_point is None:
+            for lvl in range(level + 1):
+                self.links[lvl][node] = []
+            self.entry_point = node
+            self.max_level = level
+            return
+
+        query = self._data[node]
+        entry = [self.entry_point]
+        for lvl in range(self.max_level, level, -1):
+            entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+        for lvl in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, entry, self.ef_construction, lvl)
+            limit = self.m0 if lvl == 0 else self.m
+            self._connect(node, self._select_neighbours(found, limit), lvl)
+            entry = [i for _, i in found]
+        for lvl in range(self.max_level + 1, level + 1):
+            self.links[lvl][node] = []
+        if level > self.max_level:
+            self.max_level = level
+            self.entry_point = node
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        ef_search: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """FAISS-style search: (scores, ids) of shape (num_queries, k), ids padded with -1."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        ef = max(int(ef_search or self.ef_search), k)
+        scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        ids = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        if self.entry_point is None:
+            return scores, ids
+        for row, query in enumerate(queries):
+            entry = [self.entry_point]
+            for lvl in range(self.max_level, 0, -1):
+                entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+            found = self._search_layer(query, entry, ef, 0)[:k]
+            for col, (sim, node) in enumerate(found):
+                scores[row, col] = sim
+                ids[row, col] = node
+        return scores, ids
+
+    def save(self, path: str, with_vectors: bool = True) -> None:
+        """Write the graph; ``with_vectors=False`` when the caller keeps the vectors (see ``load``)."""
+        os.makedirs(path, exist_ok=True)
+        if with_vectors:
+            np.save(os.path.join(path, VECTORS_FILE), self.vectors)
+        graph = {
+            "dim": self.dim,
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "entry_point": self.entry_point,
+            "max_level": self.max_level,
+            "levels": self.levels,
+            "seed": self.seed,
+            "rng_state": self.rng.bit_generator.state,
+            "links": [{str(k): v for k, v in layer.items()} for layer in self.links],
+        }
+        with open(os.path.join(path, GRAPH_FILE), "w", encoding="utf-8") as f:
+            json.dump(graph, f)
+
+    @classmethod
+    def load(cls, path: str, vectors: Optional[np.ndarray] = None) -> "NumpyHNSW":
+        """Open a saved graph over ``vectors`` (the ones it was built from) or its memory-mapped copy."""
+        with open(os.path.join(path, GRAPH_FILE), "r", encoding="utf-8") as f:
+            graph = json.load(f)
+        index = cls(
+            dim=int(graph["dim"]),
+            m=int(graph["m"]),
+            ef_construction=int(graph["ef_construction"]),
+            ef_search=int(graph["ef_search"]),
+            seed=int(graph.get("seed", 42)),
+        )
+        if graph.get("rng_state") is not None:
+            index.rng.bit_generator.state = graph["rng_state"]
+        if vectors is None:
+            vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, index.dim)
+        if len(vectors) != len(graph["levels"]):
+            raise ValueError(f"numpy_hnsw graph has {len(graph['levels'])} nodes, got {len(vectors)} vectors")
+        index._data = vectors
+        index._count = len(vectors)
+        index.entry_point = graph["entry_point"]
+        index.max_level = int(graph["max_level"])
+        index.levels = [int(x) for x in graph["levels"]]
+        index.links = [{int(k): v for k, v in layer.items()} for layer in graph["links"]]
+        return index
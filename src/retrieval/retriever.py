@@ -1,12 +1,45 @@
 from __future__ import annotations
 
+import json
 import logging
+import os
+import threading
+import time
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
-from rank_bm25 import BM25Okapi
 from sentence_transformers import SentenceTransformer
 
+from retrieval.ann import (
+    IndexConfig,
+    apply_search_params,
+    index_build_params,
+    index_config_from_dict,
+    load_or_build_faiss_index,
+    load_or_build_numpy_hnsw,
+    recall_at_k,
+)
+from retrieval.artifact import (
+    ARTIFACT_VERSION,
+    BM25_DIR,
+    FAISS_FILE,
+    HNSW_DIR,
+    ChunkStore,
+    artifact_matches,
+    corpus_source,
+    read_manifest,
+    write_chunks,
+    write_manifest,
+)
+from retrieval.bm25 import SparseBM25
+from retrieval.coarse import CoarseIndex
+from retrieval.dense_store import DenseStore
+from retrieval.embedding_cache import EmbeddingCache, model_fingerprint
+from retrieval.hnsw import NumpyHNSW
+from retrieval.query_cache import LRUCache, normalize_query
+from retrieval.score_cache import ScoreCache, build_entry, corpus_fingerprint, index_key
+from retrieval.topk import top_k_indices
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,16 +47,40 @@ def tokenize(text: str) -> List[str]:
     return text.lower().split()
 
 
-def min_max_normalize(scores: np.ndarray) -> np.ndarray:
+def min_max_normalize(
+    scores: np.ndarray,
+    value_range: Optional[Tuple[float, float]] = None,
+) -> np.ndarray:
+    """Scale to [0, 1]; ``value_range`` overrides the array's own (min, max)."""
     if scores.size == 0:
         return scores
-    min_val = float(scores.min())
-    max_val = float(scores.max())
+    if value_range is None:
+        min_val = float(scores.min())
+        max_val = float(scores.max())
+    else:
+        min_val, max_val = (float(v) for v in value_range)
     if max_val == min_val:
         return np.zeros_like(scores, dtype=np.float32)
     return (scores - min_val) / (max_val - min_val)
 
 
+def fuse_scores(
+    bm25_scores: np.ndarray,
+    dense_scores: np.ndarray,
+    alpha: float,
+    mode: str,
+    bm25_range: Optional[Tuple[float, float]] = None,
+    dense_range: Optional[Tuple[float, float]] = None,
+) -> np.ndarray:
+    if mode == "bm25":
+        return min_max_normalize(bm25_scores, bm25_range)
+    if mode == "dense":
+        return min_max_normalize(dense_scores, dense_range)
+    bm25_norm = min_max_normalize(bm25_scores, bm25_range)
+    dense_norm = min_max_normalize(dense_scores, dense_range)
+    return alpha * bm25_norm + (1.0 - alpha) * dense_norm
+
+
 def cosine_sim(query_vec: np.ndarray, matrix: np.ndarray) -> np.ndarray:
     return np.dot(matrix, query_vec)
 
@@ -47,14 +104,66 @@ def build_retriever_from_config(config: Dict[str, object]) -> "HybridRetriever":
     use_faiss = bool(index_cfg.get("use_faiss", retr_cfg.get("use_faiss", True)))
     device = retr_cfg.get("device")
     batch_size = int(retr_cfg.get("batch_size", 32))
+    embedding_cache_dir = index_cfg.get("embedding_cache_dir") or retr_cfg.get("embedding_cache_dir")
+    candidate_k = int(index_cfg.get("candidate_k") or 0)
+    embedding_dtype = str(index_cfg.get("embedding_dtype") or "float32")
+    query_cache_size = int(retr_cfg.get("query_cache_size", 1024))
+    bm25_cache_size = int(retr_cfg.get("bm25_cache_size", 16))
+    score_cache_dir = index_cfg.get("score_cache_dir")
+    score_cache_depth = int(index_cfg.get("score_cache_depth") or 100)
+    index_config = index_config_from_dict(index_cfg)
     return HybridRetriever(
         model_name=model_name,
         use_faiss=use_faiss,
         device=device,
         batch_size=batch_size,
+        embedding_cache_dir=embedding_cache_dir,
+        candidate_k=candidate_k,
+        index_config=index_config,
+        embedding_dtype=embedding_dtype,
+        query_cache_size=query_cache_size,
+        bm25_cache_size=bm25_cache_size,
+        score_cache_dir=score_cache_dir,
+        score_cache_depth=score_cache_depth,
     )
 
 
+def load_or_build_retriever(config: Dict[str, object], corpus_path: str) -> "HybridRetriever":
+    """Open ``retriever.index.artifact_dir`` when it matches the model and corpus, else build.
+
+    A freshly built index is written back to ``artifact_dir`` so later runs can reuse it.
+    """
+    retriever = build_retriever_from_config(config)
+    retr_cfg = config.get("retriever", {}) if isinstance(config, dict) else {}
+    index_cfg = retr_cfg.get("index", {}) if isinstance(retr_cfg, dict) else {}
+    artifact_dir = index_cfg.get("artifact_dir")
+    if artifact_dir and artifact_matches(
+        artifact_dir, str(retriever.model_name), corpus_path, retriever.embedding_dtype
+    ):
+        return HybridRetriever.load(
+            artifact_dir,
+            use_faiss=retriever.use_faiss,
+            device=retriever.device,
+            batch_size=retriever.batch_size,
+            candidate_k=retriever.candidate_k,
+            index_config=retriever.index_config,
+            query_cache_size=retriever.query_vectors.maxsize,
+            bm25_cache_size=retriever.bm25_vectors.maxsize,
+            score_cache_dir=retriever.score_cache_dir,
+            score_cache_depth=retriever.score_cache_depth,
+        )
+    chunks = []
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                chunks.append(json.loads(line))
+    retriever.build_index(chunks)
+    if artifact_dir:
+        retriever.save(artifact_dir, corpus_path)
+    return retriever
+
+
 class HybridRetriever:
     def __init__(
         self,
@@ -62,26 +171,56 @@ class HybridRetriever:
         use_faiss: bool = True,
         device: Optional[str] = None,
         batch_size: int = 32,
+        embedding_cache_dir: Optional[str] = None,
+        candidate_k: int = 0,
+        index_config: Optional[IndexConfig] = None,
+        embedding_dtype: str = "float32",
+        query_cache_size: int = 1024,
+        bm25_cache_size: int = 16,
+        score_cache_dir: Optional[str] = None,
+        score_cache_depth: int = 100,
     ) -> None:
         self.model_name = model_name
         self.use_faiss = use_faiss
         self.device = device
         self.batch_size = batch_size
+        self.embedding_cache_dir = embedding_cache_dir
+        self.candidate_k = candidate_k
+        self.index_config = index_config or IndexConfig()
+        self.embedding_dtype = embedding_dtype
+        # Query vectors and BM25 tokens keyed by (model, whitespace-normalized query).
+        self.query_vectors = LRUCache(query_cache_size)
+        self.query_tokens = LRUCache(query_cache_size)
+        # Full BM25 score vectors keyed by token tuple; refined queries extend a cached prefix.
+        self.bm25_vectors = LRUCache(bm25_cache_size)
+        self.bm25_incremental = 0
+        # Speculative retrieval calls in from worker threads.
+        self._lock = threading.Lock()
+        self.score_cache_dir = score_cache_dir
+        self.score_cache_depth = score_cache_depth
+        self.score_cache: Optional[ScoreCache] = None
 
         self.texts: List[str] = []
         self.metas: List[Dict[str, str]] = []
-        self.bm25: Optional[BM25Okapi] = None
+        self.chunk_rows: Optional[Dict[str, int]] = None
+        self.bm25: Optional[SparseBM25] = None
         self.model: Optional[SentenceTransformer] = None
         self.loaded_model_name: Optional[str] = None
-        self.embeddings: Optional[np.ndarray] = None
+        self.dense_store: Optional[DenseStore] = None
         self.faiss_index = None
+        self.hnsw_index = None
+        self.coarse_index: Optional[CoarseIndex] = None
 
     def build_index(self, corpus_chunks: List[Dict[str, object]]) -> None:
+        # The model instance may have changed (e.g. between training epochs).
+        self.query_vectors.clear()
+        self.bm25_vectors.clear()
         self.texts = [c["text"] for c in corpus_chunks]
         self.metas = [c["meta"] for c in corpus_chunks]
+        self.chunk_rows = None
 
         tokenized = [tokenize(t) for t in self.texts]
-        self.bm25 = BM25Okapi(tokenized)
+        self.bm25 = SparseBM25(tokenized)
 
         if isinstance(self.model_name, SentenceTransformer):
             self.model = self.model_name
@@ -89,37 +228,318 @@ class HybridRetriever:
         else:
             self.model = SentenceTransformer(self.model_name, device=self.device)
             self.loaded_model_name = str(self.model_name)
-        embeddings = self.model.encode(
-            self.texts,
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-            batch_size=self.batch_size,
-            show_progress_bar=False,
+        # In-memory model instances may be mid-training, so only named models are cached.
+        if self.embedding_cache_dir and not isinstance(self.model_name, SentenceTransformer):
+            cache = EmbeddingCache(self.embedding_cache_dir, model_fingerprint(self.loaded_model_name))
+            embeddings = cache.encode(self.model, self.texts, batch_size=self.batch_size)
+            logger.info(
+                "embedding_cache dir=%s hits=%d misses=%d",
+                cache.shard_dir,
+                cache.hits,
+                cache.misses,
+            )
+        else:
+            embeddings = self.model.encode(
+                self.texts,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            ).astype("float32")
+        self.dense_store = DenseStore.from_float32(embeddings, self.embedding_dtype)
+
+        self._build_dense_index()
+        if self.score_cache_dir:
+            self._open_score_cache(corpus_fingerprint(self.texts))
+
+    def _open_score_cache(self, corpus_hash: str) -> None:
+        self.score_cache = None
+        if not self.score_cache_dir:
+            return
+        if isinstance(self.model_name, SentenceTransformer):
+            # Scores of an in-memory (possibly training) model are not reproducible across runs.
+            return
+        key = index_key(
+            {
+                "model": model_fingerprint(str(self.loaded_model_name)),
+                "corpus": corpus_hash,
+                "embedding_dtype": self.dense_store.dtype,
+                "bm25": [self.bm25.k1, self.bm25.b, self.bm25.epsilon],
+            }
         )
-        self.embeddings = embeddings.astype("float32")
+        self.score_cache = ScoreCache(self.score_cache_dir, key)
+        logger.info("score_cache dir=%s", self.score_cache.shard_dir)
+
+    def save(self, path: str, corpus_path: Optional[str] = None) -> None:
+        """Write a versioned artifact that ``HybridRetriever.load`` can reopen without re-encoding.
+
+        ``corpus_path`` is the chunks.jsonl the index was built from; recording it lets
+        ``artifact_matches`` accept that file as is.
+        """
+        if self.bm25 is None or self.dense_store is None:
+            raise RuntimeError("Index not built")
+        os.makedirs(path, exist_ok=True)
+        corpus_hash = write_chunks(path, self.texts, self.metas)
+        self.dense_store.save(path)
+        self.bm25.save(os.path.join(path, BM25_DIR))
+        dense_index = None
+        if self.faiss_index is not None:
+            try_import_faiss().write_index(self.faiss_index, os.path.join(path, FAISS_FILE))
+            dense_index = "faiss"
+        elif self.hnsw_index is not None:
+            # A float32 store holds exactly the graph's vectors; quantized stores need the copy.
+            self.hnsw_index.save(os.path.join(path, HNSW_DIR), with_vectors=self.dense_store.dtype != "float32")
+            dense_index = "numpy_hnsw"
+        manifest = {
+            "version": ARTIFACT_VERSION,
+            "model_name": str(self.loaded_model_name),
+            "model_fingerprint": model_fingerprint(str(self.loaded_model_name)),
+            "corpus_hash": corpus_hash,
+            # Score-cache key of these texts, so a loaded artifact reads what the build run cached.
+            "texts_fingerprint": corpus_fingerprint(self.texts),
+            "num_chunks": len(self.texts),
+            "embedding_dim": int(self.dense_store.shape[1]),
+            "embedding_dtype": self.dense_store.dtype,
+            "dense_index": dense_index,
+            "index": index_build_params(self.index_config),
+        }
+        if corpus_path:
+            manifest["corpus_source"] = corpus_source(corpus_path)
+        write_manifest(path, manifest)
+        logger.info("retriever_artifact saved path=%s chunks=%d", path, len(self.texts))
+
+    @classmethod
+    def load(cls, path: str, **settings) -> "HybridRetriever":
+        """Open a saved artifact: arrays are mmap'd, chunks and the model load on first use.
+
+        ``settings`` are constructor arguments (the model name and embedding dtype
+        come from the manifest). The saved dense index is reused when it was built
+        with the same ``index_config``; otherwise it is rebuilt from the stored embeddings.
+        """
+        manifest = read_manifest(path)
+        if manifest is None:
+            raise FileNotFoundError(f"no retriever artifact at {path}")
+        if manifest.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"unsupported retriever artifact version: {manifest.get('version')}")
+        settings = {k: v for k, v in settings.items() if k not in {"model_name", "embedding_dtype"}}
+        retriever = cls(model_name=manifest["model_name"], **settings)
+        retriever.loaded_model_name = manifest["model_name"]
+        store = ChunkStore(path)
+        retriever.texts = store.column("text")
+        retriever.metas = store.column("meta")
+        retriever.bm25 = SparseBM25.load(os.path.join(path, BM25_DIR))
+        retriever.dense_store = DenseStore.load(path)
+        retriever.embedding_dtype = retriever.dense_store.dtype
+
+        cfg = retriever.index_config
+        # Without candidate mode no dense index is searched, so a saved one is not opened either.
+        same_build = retriever.candidate_k > 0 and manifest.get("index") == index_build_params(cfg)
+        faiss_mod = try_import_faiss() if retriever.use_faiss else None
+        retriever._check_candidate_mode(faiss_mod)
+        if same_build and faiss_mod is not None and manifest.get("dense_index") == "faiss":
+            retriever.faiss_index = faiss_mod.read_index(os.path.join(path, FAISS_FILE))
+            apply_search_params(retriever.faiss_index, cfg)
+        elif (
+            same_build
+            and faiss_mod is None
+            and not cfg.brute_force_fallback
+            and manifest.get("dense_index") == "numpy_hnsw"
+        ):
+            dense = retriever.dense_store
+            retriever.hnsw_index = NumpyHNSW.load(
+                os.path.join(path, HNSW_DIR),
+                vectors=dense.matrix if dense.dtype == "float32" else None,
+            )
+            retriever.hnsw_index.ef_search = int(cfg.ef_search)
+        else:
+            retriever._build_dense_index()
+        if retriever.score_cache_dir:
+            retriever._open_score_cache(manifest.get("texts_fingerprint") or corpus_fingerprint(retriever.texts))
+        logger.info("retriever_artifact loaded path=%s chunks=%d", path, len(retriever.texts))
+        return retriever
 
+    def _build_dense_index(self) -> None:
         faiss_mod = try_import_faiss() if self.use_faiss else None
+        self._check_candidate_mode(faiss_mod)
+        cfg = self.index_config
+        self.faiss_index = None
+        self.hnsw_index = None
+        self.coarse_index = None
+        if self.candidate_k <= 0:
+            # Full-corpus scoring reads the dense store; an exact index would only be a second copy.
+            return
+        if faiss_mod is not None:
+            self.faiss_index = load_or_build_faiss_index(faiss_mod, self.dense_store, cfg)
+        elif not cfg.brute_force_fallback:
+            self.hnsw_index = load_or_build_numpy_hnsw(self.dense_store, cfg)
+            logger.info("FAISS not available, using NumPy HNSW (ef_search=%d)", self.hnsw_index.ef_search)
+        elif self.use_faiss:
+            logger.warning("FAISS not available, falling back to brute-force")
+        self._build_coarse_index()
+
+    def _check_candidate_mode(self, faiss_mod) -> None:
+        """Approximate dense indexes only serve candidate search; full-corpus scoring never reads them."""
+        cfg = self.index_config
         if faiss_mod is not None:
-            index = faiss_mod.IndexFlatIP(self.embeddings.shape[1])
-            index.add(self.embeddings)
-            self.faiss_index = index
+            approximate = cfg.faiss_type if cfg.faiss_type != "flatip" else None
+        elif not cfg.brute_force_fallback:
+            approximate = "numpy_hnsw"
         else:
-            self.faiss_index = None
-            if self.use_faiss:
-                logger.warning("FAISS not available, falling back to brute-force")
+            approximate = f"dense_coarse={cfg.dense_coarse}" if cfg.dense_coarse != "none" else None
+        if approximate and self.candidate_k <= 0:
+            raise ValueError(
+                f"{approximate} is only searched in candidate mode; set retriever.index.candidate_k > 0"
+            )
 
-    def _dense_scores(self, query: str) -> np.ndarray:
-        if self.model is None or self.embeddings is None:
+    def _build_coarse_index(self) -> None:
+        kind = self.index_config.dense_coarse
+        if kind == "none":
+            return
+        if self.faiss_index is not None or self.hnsw_index is not None:
+            logger.warning("dense_coarse=%s ignored: an ANN index is already in use", kind)
+            return
+        self.coarse_index = CoarseIndex(self.dense_store, kind)
+        logger.info(
+            "dense_coarse=%s rescore_oversample=%d", kind, self.index_config.rescore_oversample
+        )
+
+    def dense_index_type(self) -> str:
+        """Name of the structure answering dense candidate searches."""
+        if self.faiss_index is not None:
+            return self.index_config.faiss_type
+        if self.hnsw_index is not None:
+            return "numpy_hnsw"
+        if self.coarse_index is not None:
+            return f"{self.coarse_index.kind}_rescore"
+        return "none"
+
+    def load_model(self) -> None:
+        """Load the query encoder; loaded artifacts defer it until the first query."""
+        with self._lock:
+            if self.model is None:
+                self.model = SentenceTransformer(self.model_name, device=self.device)
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        if self.dense_store is None:
             raise RuntimeError("Dense model not initialized")
+        keys = [(self.loaded_model_name, normalize_query(q)) for q in queries]
+        vectors: Dict[Tuple[Optional[str], str], np.ndarray] = {}
+        missing: Dict[Tuple[Optional[str], str], None] = {}
+        for key in keys:
+            if key in vectors or key in missing:
+                continue
+            cached = self.query_vectors.get(key)
+            if cached is None:
+                missing[key] = None
+            else:
+                vectors[key] = cached
+        if missing:
+            self.load_model()
+            encoded = self.model.encode(
+                [key[1] for key in missing],
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            ).astype("float32")
+            for key, vec in zip(missing, encoded):
+                vectors[key] = vec
+                self.query_vectors.put(key, vec)
+        if not keys:
+            return np.zeros((0, self.dense_store.shape[1]), dtype="float32")
+        return np.vstack([vectors[key] for key in keys])
+
+    def _query_tokens(self, query: str) -> List[str]:
+        key = normalize_query(query)
+        tokens = self.query_tokens.get(key)
+        if tokens is None:
+            tokens = tokenize(key)
+            self.query_tokens.put(key, tokens)
+        return tokens
+
+    def _bm25_scores(self, query: str) -> np.ndarray:
+        """BM25 scores for ``query``; a cached prefix (e.g. the pre-refinement query) is extended.
+
+        The returned array is shared with the cache and must not be modified.
+        """
+        tokens = self._query_tokens(query)
+        key = tuple(tokens)
+        scores = self.bm25_vectors.get(key)
+        if scores is not None:
+            return scores
+        for cut in range(len(tokens) - 1, 0, -1):
+            base = self.bm25_vectors.peek(key[:cut])
+            if base is not None:
+                scores = self.bm25.add_scores(base.copy(), tokens[cut:])
+                with self._lock:
+                    self.bm25_incremental += 1
+                break
+        if scores is None:
+            scores = self.bm25.get_scores(tokens)
+        scores.setflags(write=False)
+        self.bm25_vectors.put(key, scores)
+        return scores
+
+    def query_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        bm25_stats = dict(self.bm25_vectors.stats(), incremental=self.bm25_incremental)
+        return {
+            "vectors": self.query_vectors.stats(),
+            "tokens": self.query_tokens.stats(),
+            "bm25": bm25_stats,
+        }
 
-        query_vec = self.model.encode(
-            [query], convert_to_numpy=True, normalize_embeddings=True
-        ).astype("float32")[0]
+    def _dense_scores_batch(self, query_vecs: np.ndarray) -> np.ndarray:
+        """Score every chunk for each query vector; returns a (num_queries, num_chunks) matrix."""
+        return self.dense_store.scores(query_vecs)
 
+    def _dense_scores(self, query: str) -> np.ndarray:
+        return self._dense_scores_batch(self._encode_queries([query]))[0]
+
+    def _dense_candidates(self, query_vecs: np.ndarray, n: int) -> np.ndarray:
+        """Top-n chunk ids per query from the dense index (-1 pads short ANN results)."""
+        n = min(n, len(self.texts))
         if self.faiss_index is not None:
-            scores, _ = self.faiss_index.search(query_vec.reshape(1, -1), len(self.texts))
-            return scores.flatten()
-        return cosine_sim(query_vec, self.embeddings)
+            _, ids = self.faiss_index.search(query_vecs, n)
+            return ids
+        if self.hnsw_index is not None:
+            _, ids = self.hnsw_index.search(query_vecs, n)
+            return ids
+        if self.coarse_index is not None:
+            return self._rescore_candidates(query_vecs, n)
+        return top_k_indices(self._dense_scores_batch(query_vecs), n)
+
+    def _rescore_candidates(self, query_vecs: np.ndarray, n: int) -> np.ndarray:
+        """Coarse top ``n * rescore_oversample`` ids, reranked by full-precision inner product."""
+        m = max(n, n * int(self.index_config.rescore_oversample))
+        coarse_ids = self.coarse_index.search(query_vecs, m)
+        rows = []
+        for query_vec, ids in zip(query_vecs, coarse_ids):
+            # Sorted ids make exact-score ties break by chunk id, as in brute-force search.
+            ids = np.sort(ids)
+            exact = np.dot(self.dense_store.vectors(ids), query_vec)
+            rows.append(ids[top_k_indices(exact, n)])
+        return np.vstack(rows)
+
+    def _build_results(
+        self,
+        doc_idx: np.ndarray,
+        combined: np.ndarray,
+        bm25_scores: np.ndarray,
+        dense_scores: np.ndarray,
+    ) -> List[Dict[str, object]]:
+        """Build result dicts; the score arrays are aligned with ``doc_idx``."""
+        results = []
+        for pos, idx in enumerate(doc_idx):
+            results.append(
+                {
+                    "text": self.texts[idx],
+                    "score": float(combined[pos]),
+                    "bm25": float(bm25_scores[pos]),
+                    "dense": float(dense_scores[pos]),
+                    "meta": self.metas[idx],
+                }
+            )
+        return results
 
     def retrieve(
         self,
@@ -128,31 +548,185 @@ class HybridRetriever:
         alpha: float = 0.5,
         mode: str = "hybrid",
     ) -> List[Dict[str, object]]:
+        return self.retrieve_batch([query], top_k=top_k, alpha=alpha, mode=mode)[0]
+
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        alpha: float = 0.5,
+        mode: str = "hybrid",
+    ) -> List[List[Dict[str, object]]]:
+        """Retrieve for many queries with one encoder call and one dense matmul per batch.
+
+        With ``candidate_k > 0`` dense and BM25 each contribute their top
+        ``candidate_k`` chunks and fusion runs over the union of those candidates.
+        """
         if self.bm25 is None:
             raise RuntimeError("BM25 not initialized")
 
-        bm25_scores = np.array(self.bm25.get_scores(tokenize(query)), dtype=np.float32)
-        dense_scores = self._dense_scores(query)
+        all_results: List[Optional[List[Dict[str, object]]]] = [None] * len(queries)
+        use_score_cache = self.score_cache is not None and self.candidate_k <= 0
+        pending = []
+        for pos, query in enumerate(queries):
+            if use_score_cache:
+                all_results[pos] = self._results_from_score_cache(query, top_k, alpha, mode)
+            if all_results[pos] is None:
+                pending.append(pos)
 
-        if mode == "bm25":
-            combined = min_max_normalize(bm25_scores)
-        elif mode == "dense":
-            combined = min_max_normalize(dense_scores)
-        else:
-            bm25_norm = min_max_normalize(bm25_scores)
-            dense_norm = min_max_normalize(dense_scores)
-            combined = alpha * bm25_norm + (1.0 - alpha) * dense_norm
+        step = max(1, self.batch_size)
+        for start in range(0, len(pending), step):
+            positions = pending[start : start + step]
+            batch = [queries[pos] for pos in positions]
+            query_vecs = self._encode_queries(batch)
+            bm25_matrix = np.vstack(
+                [np.array(self._bm25_scores(q), dtype=np.float32) for q in batch]
+            )
+            if self.candidate_k > 0:
+                batch_results = self._retrieve_candidates(query_vecs, bm25_matrix, top_k, alpha, mode)
+                for pos, results in zip(positions, batch_results):
+                    all_results[pos] = results
+                continue
+
+            dense_matrix = self._dense_scores_batch(query_vecs)
+            combined_matrix = np.vstack(
+                [
+                    fuse_scores(bm25_scores, dense_scores, alpha, mode)
+                    for bm25_scores, dense_scores in zip(bm25_matrix, dense_matrix)
+                ]
+            )
+            top_matrix = top_k_indices(combined_matrix, top_k)
+            for row, top_idx in enumerate(top_matrix):
+                all_results[positions[row]] = self._build_results(
+                    top_idx,
+                    combined_matrix[row][top_idx],
+                    bm25_matrix[row][top_idx],
+                    dense_matrix[row][top_idx],
+                )
+                if use_score_cache and len(self.texts):
+                    depth = max(self.score_cache_depth, top_k)
+                    self.score_cache.put(batch[row], build_entry(bm25_matrix[row], dense_matrix[row], depth))
+        return all_results
 
-        top_idx = np.argsort(combined)[::-1][:top_k]
+    def _results_from_score_cache(
+        self,
+        query: str,
+        top_k: int,
+        alpha: float,
+        mode: str,
+    ) -> Optional[List[Dict[str, object]]]:
+        """Fuse cached raw scores; None unless the cached candidates provably hold the exact top_k."""
+        entry = self.score_cache.get(query)
+        if entry is None or int(entry["num_docs"]) != len(self.texts):
+            self.score_cache.record(hit=False)
+            return None
+        ids = entry["ids"]
+        bm25_range = tuple(entry["bm25_range"])
+        dense_range = tuple(entry["dense_range"])
+        combined = fuse_scores(entry["bm25"], entry["dense"], alpha, mode, bm25_range, dense_range)
+        order = top_k_indices(combined, top_k)
+        if len(ids) < len(self.texts):
+            # A chunk outside the candidates is at or below both floors, so its fused
+            # score is at most ``bound``; the cached top_k is exact only if it beats that.
+            bound = fuse_scores(
+                entry["bm25_floor"], entry["dense_floor"], alpha, mode, bm25_range, dense_range
+            )[0]
+            if len(order) < min(top_k, len(self.texts)) or (len(order) and not combined[order[-1]] > bound):
+                self.score_cache.record(hit=False)
+                return None
+        self.score_cache.record(hit=True)
+        return self._build_results(ids[order], combined[order], entry["bm25"][order], entry["dense"][order])
+
+    def _retrieve_candidates(
+        self,
+        query_vecs: np.ndarray,
+        bm25_matrix: np.ndarray,
+        top_k: int,
+        alpha: float,
+        mode: str,
+    ) -> List[List[Dict[str, object]]]:
+        dense_ids = self._dense_candidates(query_vecs, self.candidate_k)
+        bm25_ids = top_k_indices(bm25_matrix, self.candidate_k)
         results = []
-        for idx in top_idx:
+        for row, query_vec in enumerate(query_vecs):
+            dense_row = dense_ids[row]
+            ids = np.union1d(dense_row[dense_row >= 0], bm25_ids[row])
+            bm25_scores = bm25_matrix[row][ids]
+            dense_scores = np.dot(self.dense_store.vectors(ids), query_vec)
+            combined = fuse_scores(bm25_scores, dense_scores, alpha, mode)
+            order = top_k_indices(combined, top_k)
             results.append(
-                {
-                    "text": self.texts[idx],
-                    "score": float(combined[idx]),
-                    "bm25": float(bm25_scores[idx]),
-                    "dense": float(dense_scores[idx]),
-                    "meta": self.metas[idx],
-                }
+                self._build_results(ids[order], combined[order], bm25_scores[order], dense_scores[order])
             )
         return results
+
+    def _chunk_row_ids(self, chunk_ids: List[str]) -> np.ndarray:
+        """Sorted row ids of the given chunk ids; unknown ids are skipped."""
+        if self.chunk_rows is None:
+            self.chunk_rows = {meta.get("chunk_id"): idx for idx, meta in enumerate(self.metas)}
+        rows = {self.chunk_rows[cid] for cid in chunk_ids if cid in self.chunk_rows}
+        return np.array(sorted(rows), dtype=np.int64)
+
+    def rescore_batch(
+        self,
+        queries: List[str],
+        pools: List[List[str]],
+        top_k: int = 5,
+        alpha: float = 0.5,
+        mode: str = "hybrid",
+    ) -> List[List[Dict[str, object]]]:
+        """Rank only the chunks in ``pools[i]`` (chunk ids) for ``queries[i]``.
+
+        As in candidate mode, fusion normalizes over the pool rather than the
+        corpus. BM25 reuses cached prefix scores, and dense scoring touches only
+        the pool's vectors.
+        """
+        if self.bm25 is None:
+            raise RuntimeError("BM25 not initialized")
+        results: List[List[Dict[str, object]]] = []
+        step = max(1, self.batch_size)
+        for start in range(0, len(queries), step):
+            batch = queries[start : start + step]
+            query_vecs = self._encode_queries(batch)
+            for query, query_vec, pool in zip(batch, query_vecs, pools[start : start + step]):
+                ids = self._chunk_row_ids(pool)
+                bm25_scores = np.asarray(self._bm25_scores(query), dtype=np.float32)[ids]
+                dense_scores = np.dot(self.dense_store.vectors(ids), query_vec)
+                combined = fuse_scores(bm25_scores, dense_scores, alpha, mode)
+                order = top_k_indices(combined, top_k)
+                results.append(
+                    self._build_results(ids[order], combined[order], bm25_scores[order], dense_scores[order])
+                )
+        return results
+
+    def ann_recall(self, queries: List[str], k_values: List[int]) -> Dict[str, object]:
+        """Recall@k of the dense index against exact brute-force search, plus latency per query."""
+        k_values = [int(k) for k in k_values]
+        k_max = max(k_values)
+        approx_rows = []
+        exact_rows = []
+        index_secs = 0.0
+        exact_secs = 0.0
+        step = max(1, self.batch_size)
+        for start in range(0, len(queries), step):
+            query_vecs = self._encode_queries(queries[start : start + step])
+            t0 = time.perf_counter()
+            approx_rows.append(self._dense_candidates(query_vecs, k_max))
+            t1 = time.perf_counter()
+            exact_rows.append(top_k_indices(self._dense_scores_batch(query_vecs), k_max))
+            exact_secs += time.perf_counter() - t1
+            index_secs += t1 - t0
+        metrics: Dict[str, object] = {
+            "faiss_type": self.dense_index_type(),
+            "num_queries": len(queries),
+        }
+        if not queries:
+            return metrics
+        approx = np.vstack(approx_rows)
+        exact = np.vstack(exact_rows)
+        for k in k_values:
+            metrics[f"recall@{k}"] = recall_at_k(approx, exact, k)
+            metrics[f"recall_loss@{k}"] = 1.0 - metrics[f"recall@{k}"]
+        metrics["index_ms_per_query"] = 1000.0 * index_secs / len(queries)
+        metrics["exact_ms_per_query"] = 1000.0 * exact_secs / len(queries)
+        return metrics
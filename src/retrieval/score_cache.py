@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from retrieval.query_cache import normalize_query
+from retrieval.topk import top_k_indices
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FIELDS = (
+    "ids",
+    "bm25",
+    "dense",
+    "bm25_range",
+    "dense_range",
+    "bm25_floor",
+    "dense_floor",
+    "num_docs",
+)
+
+
+def corpus_fingerprint(texts: Iterable[str]) -> str:
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def index_key(parts: Dict[str, object]) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """Raw per-query BM25/dense scores of the top candidates, one ``.npz`` per query.
+
+    Entries live under a shard named after the index key, so a new corpus,
+    model or BM25 setting never reads stale scores.
+    """
+
+    def __init__(self, cache_dir: str, key: str) -> None:
+        self.key = key
+        self.shard_dir = os.path.join(cache_dir, key[:16])
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, query: str) -> str:
+        name = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return os.path.join(self.shard_dir, f"{name}.npz")
+
+    def get(self, query: str) -> Optional[Dict[str, np.ndarray]]:
+        path = self._path(query)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return {name: data[name] for name in ENTRY_FIELDS}
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning("score cache entry unreadable, ignoring: %s (%s)", path, exc)
+            return None
+
+    def put(self, query: str, entry: Dict[str, np.ndarray]) -> None:
+        path = self._path(query)
+        tmp_path = f"{path}.tmp{os.getpid()}.npz"
+        try:
+            os.makedirs(self.shard_dir, exist_ok=True)
+            np.savez(tmp_path, **entry)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("score cache write failed: %s (%s)", path, exc)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def build_entry(bm25_row: np.ndarray, dense_row: np.ndarray, depth: int) -> Dict[str, np.ndarray]:
+    """Keep the union of each side's top-``depth`` chunks plus full-corpus score ranges.
+
+    ``*_floor`` is the lowest kept score of each side: any chunk outside the union
+    scores at most that on both sides, which bounds its fused score.
+    """
+    depth = min(depth, bm25_row.shape[0])
+    bm25_top = top_k_indices(bm25_row, depth)
+    dense_top = top_k_indices(dense_row, depth)
+    ids = np.union1d(bm25_top, dense_top)
+    return {
+        "ids": ids.astype(np.int64),
+        "bm25": bm25_row[ids],
+        "dense": dense_row[ids],
+        "bm25_range": np.array([float(bm25_row.min()), float(bm25_row.max())]),
+        "dense_range": np.array([float(dense_row.min()), float(dense_row.max())]),
+        "bm25_floor": bm25_row[bm25_top[-1:]],
+        "dense_floor": dense_row[dense_top[-1:]],
+        "num_docs": np.array(bm25_row.shape[0]),
+    }
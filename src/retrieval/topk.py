@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort.
+
+    Accepts a 1-D score vector or a (num_queries, num_items) matrix. Ties are
+    broken deterministically in favour of the lower index, including ties that
+    straddle the k-th position.
+    """
+    scores = np.asarray(scores)
+    squeeze = scores.ndim == 1
+    matrix = scores.reshape(1, -1) if squeeze else scores
+    num_rows, num_items = matrix.shape
+    k = max(0, min(int(k), num_items))
+    if k == 0:
+        result = np.zeros((num_rows, 0), dtype=np.int64)
+        return result[0] if squeeze else result
+
+    if k < num_items:
+        kth = np.partition(matrix, num_items - k, axis=1)[:, num_items - k : num_items - k + 1]
+        above = matrix > kth
+        ties = matrix == kth
+        need = k - above.sum(axis=1, keepdims=True)
+        keep = above | (ties & (np.cumsum(ties, axis=1) <= need))
+        cols = np.nonzero(keep)[1].reshape(num_rows, k)
+    else:
+        cols = np.broadcast_to(np.arange(num_items), matrix.shape)
+    values = np.take_along_axis(matrix, cols, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    result = np.take_along_axis(cols, order, axis=1)
+    return result[0] if squeeze else result
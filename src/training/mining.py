@@ -2,26 +2,26 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Tuple
 
-import numpy as np
-from rank_bm25 import BM25Okapi
+from retrieval.bm25 import SparseBM25
+from retrieval.topk import top_k_indices
 
 
 def tokenize(text: str) -> List[str]:
     return text.lower().split()
 
 
-def build_bm25(corpus_chunks: List[Dict[str, Any]]) -> BM25Okapi:
-    return BM25Okapi([tokenize(c["text"]) for c in corpus_chunks])
+def build_bm25(corpus_chunks: List[Dict[str, Any]]) -> SparseBM25:
+    return SparseBM25([tokenize(c["text"]) for c in corpus_chunks])
 
 
 def mine_bm25(
     query: str,
-    bm25: BM25Okapi,
+    bm25: SparseBM25,
     corpus_chunks: List[Dict[str, Any]],
     top_n: int,
 ) -> List[Tuple[int, float]]:
     scores = bm25.get_scores(tokenize(query))
-    idx_sorted = np.argsort(scores)[::-1][:top_n]
+    idx_sorted = top_k_indices(scores, top_n)
     return [(int(idx), float(scores[idx])) for idx in idx_sorted]
 
 
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from retrieval.ann import build_faiss_index, index_config_from_dict, recall_at_k
+from retrieval.dense_store import DenseStore
+
+
+def test_index_config_from_dict_reads_index_section():
+    cfg = index_config_from_dict({"faiss_type": "HNSW", "ef_search": 128, "nprobe": None})
+    assert cfg.faiss_type == "hnsw"
+    assert cfg.ef_search == 128
+    assert cfg.nprobe == 16
+    with pytest.raises(ValueError):
+        index_config_from_dict({"faiss_type": "lsh"})
+
+
+def test_recall_at_k_against_exact_ids():
+    exact = np.array([[0, 1, 2, 3], [4, 5, 6, 7]])
+    approx = np.array([[0, 2, 9, 1], [7, 8, 9, 10]])
+    assert recall_at_k(approx, exact, 2) == pytest.approx((0.5 + 0.0) / 2)
+    assert recall_at_k(approx, exact, 4) == pytest.approx((0.75 + 0.25) / 2)
+
+
+def _store(num, dim=16, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((num, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return DenseStore.from_float32(vectors)
+
+
+def test_faiss_ivfpq_clamps_pq_nbits_to_small_corpus(caplog):
+    faiss = pytest.importorskip("faiss")
+    cfg = index_config_from_dict({"faiss_type": "ivfpq", "nlist": 4, "pq_m": 4, "pq_nbits": 8})
+    store = _store(40)
+    index = build_faiss_index(faiss, store, cfg)
+    assert isinstance(index, faiss.IndexIVFPQ)
+    assert index.pq.nbits == 5 and index.ntotal == 40
+    assert "using pq_nbits=5" in caplog.text
+    index.nprobe = 4
+    _, ids = index.search(store.matrix[:3], 1)
+    assert ids[:, 0].tolist() == [0, 1, 2]
+
+
+def test_faiss_ivfpq_falls_back_to_ivfflat_without_training_data(caplog):
+    faiss = pytest.importorskip("faiss")
+    cfg = index_config_from_dict({"faiss_type": "ivfpq", "nlist": 4, "pq_m": 4})
+    index = build_faiss_index(faiss, _store(1), cfg)
+    assert isinstance(index, faiss.IndexIVFFlat) and index.ntotal == 1
+    assert "using ivfflat" in caplog.text
@@ -0,0 +1,116 @@
+import json
+
+from calculator.compute import compute_for_query
+from calculator.extract import Fact
+from calculator.gate import (
+    CANDIDATES_FILE,
+    apply_gate,
+    candidate_row,
+    candidates_fingerprint,
+    gate_reason,
+    load_candidates,
+    replay_gate,
+    replay_mismatch,
+    write_candidates_manifest,
+)
+from config.schema import resolve_config
+
+GATE = {
+    "enabled": True,
+    "min_conf": 0.4,
+    "require_unit_consistency": True,
+    "require_year_match": True,
+    "allow_inferred": False,
+    "allow_task_types": ["yoy", "diff"],
+}
+
+
+def make_fact(year, value, confidence=0.8, inferred=False, unit="USD"):
+    return Fact(
+        qid="q1",
+        chunk_id=f"c{year}",
+        metric="revenue",
+        entity=None,
+        year=year,
+        period=None,
+        value=value,
+        unit=unit,
+        raw_span=str(value),
+        confidence=confidence,
+        inferred_year=inferred,
+    )
+
+
+def make_candidate(query, facts):
+    result, trace = compute_for_query(query, facts)
+    return candidate_row("q1", result.__dict__, trace.__dict__, "fallback text", ["c0"])
+
+
+def test_gate_reason_order():
+    ok = make_candidate("revenue growth 2019 2020", [make_fact(2019, 100.0), make_fact(2020, 110.0)])
+    assert ok["R"]["status"] == "ok"
+    assert gate_reason(ok["R"], GATE) is None
+    assert gate_reason(ok["R"], dict(GATE, allow_task_types=["diff"])) == "gate_task"
+    assert gate_reason(ok["R"], dict(GATE, min_conf=1.1)) == "gate_conf"
+    assert gate_reason(ok["R"], dict(GATE, enabled=False, min_conf=1.1)) is None
+
+    inferred = make_candidate(
+        "revenue growth 2019 2020",
+        [make_fact(2019, 100.0, inferred=True), make_fact(2020, 110.0)],
+    )
+    assert gate_reason(inferred["R"], GATE) == "gate_inferred"
+    assert gate_reason(inferred["R"], dict(GATE, allow_inferred=True)) is None
+
+    empty = make_candidate("revenue growth 2019 2020", [])
+    assert gate_reason(empty["R"], GATE) == f"status_{empty['R']['status']}"
+
+
+def test_replay_matches_pipeline_predictions(tmp_path):
+    candidates = [
+        make_candidate("revenue growth 2019 2020", [make_fact(2019, 100.0), make_fact(2020, 110.0)]),
+        make_candidate("difference in revenue", [make_fact(2019, 5.0, 0.3), make_fact(2020, 9.0, 0.3)]),
+        make_candidate("what is revenue", [make_fact(2020, 1.0)]),
+    ]
+    path = tmp_path / "calc_candidates.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for cand in candidates:
+            f.write(json.dumps(cand) + "\n")
+    loaded = load_candidates(str(path))
+
+    for min_conf in [0.0, 0.4, 0.9]:
+        gate = dict(GATE, min_conf=min_conf)
+        preds, fallback_counts = replay_gate(loaded, gate)
+        expected = [json.loads(json.dumps(apply_gate(cand, gate))) for cand in candidates]
+        assert preds == expected
+        assert sum(fallback_counts.values()) == sum(p["fallback_reason"] is not None for p in preds)
+
+    preds, _ = replay_gate(loaded, dict(GATE, min_conf=0.0))
+    assert preds[0]["fallback_reason"] is None
+    assert preds[0]["pred_answer"].startswith("Result: ")
+    assert sorted(preds[0]["used_chunks"]) == ["c2019", "c2020"]
+    assert preds[2]["fallback_reason"] == "gate_task"
+    assert preds[2]["pred_answer"] == "fallback text"
+    assert preds[2]["used_chunks"] == ["c0"]
+
+
+def test_replay_checks_candidates_provenance(tmp_path):
+    config = resolve_config({"run_id": "r1", "retriever": {"top_k": 5}})
+    path = tmp_path / CANDIDATES_FILE
+    assert replay_mismatch(str(path), config) is not None
+
+    path.write_text(json.dumps(make_candidate("revenue growth", [])) + "\n", encoding="utf-8")
+    write_candidates_manifest(str(tmp_path), config, 1)
+    regated = resolve_config(
+        {
+            "run_id": "r2",
+            "retriever": {"top_k": 5},
+            "calculator": {"gate": {"min_conf": 0.7}, "replay_from": str(path)},
+        }
+    )
+    assert candidates_fingerprint(regated) == candidates_fingerprint(config)
+    assert replay_mismatch(str(path), regated) is None
+
+    assert "config" in replay_mismatch(str(path), resolve_config({"retriever": {"top_k": 10}}))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert "changed" in replay_mismatch(str(path), config)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from retrieval.ann import recall_at_k
+from retrieval.coarse import CoarseIndex
+from retrieval.dense_store import DenseStore
+from retrieval.topk import top_k_indices
+
+
+def _unit_vectors(num, dim, seed):
+    vecs = np.random.default_rng(seed).normal(size=(num, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def test_binary_scores_are_negative_hamming_distance():
+    data = _unit_vectors(40, 20, 0)
+    queries = _unit_vectors(3, 20, 1)
+    index = CoarseIndex(data, "binary", block_size=16)
+    expected = -((data[None, :, :] > 0) != (queries[:, None, :] > 0)).sum(axis=2)
+    np.testing.assert_array_equal(index.scores(queries), expected)
+
+
+@pytest.mark.parametrize("kind,oversample,min_recall", [("binary", 8, 0.6), ("int8", 2, 0.95)])
+def test_coarse_search_then_rescore_recovers_exact_top_k(kind, oversample, min_recall):
+    data = _unit_vectors(1000, 64, 2)
+    queries = data[:10] + 0.1 * _unit_vectors(10, 64, 3)
+    index = CoarseIndex(data, kind)
+    coarse_ids = index.search(queries, 10 * oversample)
+    rescored = np.vstack(
+        [ids[top_k_indices(data[ids] @ q, 10)] for q, ids in zip(queries, coarse_ids)]
+    )
+    exact = top_k_indices(queries @ data.T, 10)
+    assert recall_at_k(rescored, exact, 1) == 1.0
+    assert recall_at_k(rescored, exact, 10) >= min_recall
+
+
+def test_coarse_index_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        CoarseIndex(np.zeros((2, 8), dtype=np.float32), "none")
+
+
+@pytest.mark.parametrize("kind", ["binary", "int8"])
+def test_coarse_index_from_store_matches_float32_array(kind):
+    data = _unit_vectors(100, 20, 4)
+    store = DenseStore.from_float32(data, "float16")
+    store.block_size = 16
+    queries = _unit_vectors(3, 20, 5)
+    expected = CoarseIndex(store.vectors(np.arange(100)), kind).scores(queries)
+    np.testing.assert_array_equal(CoarseIndex(store, kind).scores(queries), expected)
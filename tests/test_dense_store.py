@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from retrieval.dense_store import DenseStore
+
+
+def _unit_vectors(num, dim, seed):
+    vecs = np.random.default_rng(seed).normal(size=(num, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype,atol", [("float32", 1e-6), ("float16", 2e-3), ("int8", 2e-2)])
+def test_dense_store_scores_close_to_float32(dtype, atol):
+    data = _unit_vectors(500, 32, 0)
+    queries = _unit_vectors(4, 32, 1)
+    store = DenseStore.from_float32(data, dtype)
+    store.block_size = 64
+    exact = queries @ data.T
+    np.testing.assert_allclose(store.scores(queries), exact, atol=atol)
+    ids = np.array([3, 17, 499])
+    np.testing.assert_allclose(store.vectors(ids) @ queries[0], exact[0, ids], atol=atol)
+
+
+def test_dense_store_save_load_mmap(tmp_path):
+    data = _unit_vectors(50, 8, 2)
+    store = DenseStore.from_float32(data, "int8")
+    assert store.nbytes() < data.nbytes / 3
+    store.save(str(tmp_path))
+
+    loaded = DenseStore.load(str(tmp_path))
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.dtype == "int8"
+    queries = _unit_vectors(2, 8, 3)
+    np.testing.assert_array_equal(loaded.scores(queries), store.scores(queries))
+
+    with pytest.raises(ValueError):
+        DenseStore.from_float32(data, "bfloat16")
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_dense_store_blocks_and_blockwise_int8(dtype):
+    data = _unit_vectors(130, 8, 4)
+    store = DenseStore.from_float32(data, dtype)
+    store.block_size = 32
+    blocks = list(store.blocks())
+    assert [start for start, _ in blocks] == [0, 32, 64, 96, 128]
+    np.testing.assert_array_equal(np.vstack([b for _, b in blocks]), store.vectors(np.arange(130)))
+    # Quantizing block by block gives the codes of quantizing the whole float32 array.
+    whole = DenseStore.from_float32(store.vectors(np.arange(130)), "int8")
+    blockwise = store.to_int8()
+    np.testing.assert_array_equal(blockwise.matrix, whole.matrix)
+    np.testing.assert_array_equal(blockwise.scales, whole.scales)
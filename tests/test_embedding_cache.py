@@ -0,0 +1,48 @@
+import numpy as np
+
+from retrieval.embedding_cache import EmbeddingCache
+
+
+class CountingModel:
+    def __init__(self) -> None:
+        self.encoded = []
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype="float32")
+
+
+def test_embedding_cache_encodes_only_new_texts(tmp_path):
+    model = CountingModel()
+    first = EmbeddingCache(str(tmp_path), "model-a").encode(model, ["alpha", "beta", "alpha"])
+    assert model.encoded == ["alpha", "beta"]
+
+    cache = EmbeddingCache(str(tmp_path), "model-a")
+    second = cache.encode(model, ["beta", "gamma", "alpha"])
+    assert model.encoded == ["alpha", "beta", "gamma"]
+    assert cache.hits == 2 and cache.misses == 1
+    assert np.array_equal(second[0], first[1])
+    assert np.array_equal(second[2], first[0])
+
+    EmbeddingCache(str(tmp_path), "model-b").encode(model, ["alpha"])
+    assert model.encoded[-1] == "alpha"
+
+
+def test_embedding_cache_concurrent_writers_keep_keys_and_rows_paired(tmp_path):
+    model = CountingModel()
+    other = EmbeddingCache(str(tmp_path), "model-a")
+
+    class InterleavingModel(CountingModel):
+        def encode(self, texts, **kwargs):
+            # Another writer replaces the shard between this writer's read and write.
+            other.encode(model, ["beta"])
+            return super().encode(texts, **kwargs)
+
+    first = EmbeddingCache(str(tmp_path), "model-a").encode(InterleavingModel(), ["alpha"])
+    assert np.array_equal(first, model.encode(["alpha"]))
+
+    check = CountingModel()
+    vectors = EmbeddingCache(str(tmp_path), "model-a").encode(check, ["alpha", "beta"])
+    assert np.array_equal(vectors, model.encode(["alpha", "beta"]))
+    # The last writer wins; the other writer's text is encoded again, never mismatched.
+    assert check.encoded == ["beta"]
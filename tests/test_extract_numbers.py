@@ -1,4 +1,4 @@
-﻿from calculator.extract import extract_facts_from_text
+﻿from calculator.extract import detect_unit, detect_unit_lower, extract_facts_from_text
 
 
 def test_extract_numbers() -> None:
@@ -11,3 +11,20 @@ def test_extract_numbers() -> None:
     assert percent_facts
     assert abs(percent_facts[0].value - 12.0) < 1e-6
     assert any(abs(v - 1.2e9) < 1e-3 for v in values)
+
+
+def test_detect_unit_lower_matches_detect_unit() -> None:
+    # Cut words ("million" -> "m"), overlapping codes and mixed case must behave as on the slice.
+    text = "FY201920 Net Income 1,234 MILLION, eurmb 5 US$ 7 Percentage 3% Kb mb 2020B"
+    lower = text.lower()
+    for start in range(len(text) + 1):
+        for end in range(start, len(text) + 1):
+            window = text[start:end]
+            assert detect_unit_lower(lower, start, end, start, end) == detect_unit(window, window)
+
+
+def test_extract_non_ascii_chunk() -> None:
+    # \u017f matches "s" under IGNORECASE but not after lower(); such chunks keep detect_unit.
+    text = "Net income 5 u\u017fd \u2014 Revenue 7 mill\u0130on"
+    facts = extract_facts_from_text("q1", "c1", text, "")
+    assert [(f.value, f.unit, f.metric) for f in facts] == [(5.0, "USD", "revenue"), (7.0, None, "revenue")]
@@ -0,0 +1,68 @@
+import json
+import os
+
+from calculator.extract import extract_facts_from_text
+from calculator.fact_index import FactIndex, fact_index_matches, load_or_build_fact_index
+
+CHUNKS = [
+    {"text": "Revenue was $1,234.5 million in 2019. Margin was 12%.", "meta": {"chunk_id": "c1"}},
+    {"text": "Net income 3.2 billion, up from 2.9 billion.", "meta": {"chunk_id": "c2"}},
+]
+
+
+def write_corpus(path, chunks):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk) + "\n")
+
+
+def test_fact_index_binds_same_facts_as_extraction(tmp_path):
+    corpus = tmp_path / "chunks.jsonl"
+    write_corpus(corpus, CHUNKS)
+    built = load_or_build_fact_index(str(tmp_path / "facts"), str(corpus))
+    index = FactIndex.load(str(tmp_path / "facts"))
+    assert len(index) == len(built) == 2
+
+    for query in ["AAPL revenue 2020", "net income change"]:
+        for chunk in CHUNKS:
+            chunk_id, text = chunk["meta"]["chunk_id"], chunk["text"]
+            expected = extract_facts_from_text("q1", chunk_id, text, query)
+            assert index.facts_for("q1", chunk_id, text, query) == expected
+    assert index.stats() == {"chunks": 2, "hits": 4, "misses": 0}
+
+
+def test_fact_index_extracts_changed_or_unknown_chunks(tmp_path):
+    index = FactIndex.build(CHUNKS)
+    text = "Revenue was $9 million in 2021."
+    assert index.facts_for("q1", "c1", text, "revenue") == extract_facts_from_text("q1", "c1", text, "revenue")
+    assert index.facts_for("q1", None, text, "revenue") == extract_facts_from_text("q1", None, text, "revenue")
+    assert index.misses == 2
+
+
+def test_fact_index_rebuilds_when_corpus_changes(tmp_path):
+    corpus = tmp_path / "chunks.jsonl"
+    write_corpus(corpus, CHUNKS[:1])
+    assert len(load_or_build_fact_index(str(tmp_path / "facts"), str(corpus))) == 1
+    write_corpus(corpus, CHUNKS)
+    assert len(load_or_build_fact_index(str(tmp_path / "facts"), str(corpus))) == 2
+    assert len(load_or_build_fact_index(str(tmp_path / "facts"))) == 2
+
+
+def test_fact_index_accepts_unchanged_corpus_without_hashing(tmp_path, monkeypatch):
+    corpus = tmp_path / "chunks.jsonl"
+    write_corpus(corpus, CHUNKS)
+    load_or_build_fact_index(str(tmp_path / "facts"), str(corpus))
+
+    def no_hashing(path):
+        raise AssertionError("unchanged corpus should not be hashed")
+
+    monkeypatch.setattr("retrieval.artifact.file_sha1", no_hashing)
+    assert fact_index_matches(str(tmp_path / "facts"), str(corpus))
+    monkeypatch.undo()
+
+    # Touched but identical: the recorded sha1 decides.
+    stat = corpus.stat()
+    os.utime(corpus, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert fact_index_matches(str(tmp_path / "facts"), str(corpus))
+    write_corpus(corpus, list(reversed(CHUNKS)))
+    assert not fact_index_matches(str(tmp_path / "facts"), str(corpus))
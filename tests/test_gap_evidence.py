@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from multistep.gap import EvidenceState, detect_gap
+
+
+CHUNKS = [
+    {"text": "Revenue was $5.0 million in 2019."},
+    {"text": "Apple reported higher margins."},
+    {"text": "In 2020 revenue grew; MSFT also expanded."},
+]
+
+
+def test_incremental_matches_full_scan() -> None:
+    cases = [
+        ("revenue in 2019 vs 2020 vs 2021", "COMPARE"),
+        ("Compare Apple vs Oracle revenue", "COMPARE"),
+        ('"Apple" than "MSFT"', "COMPARE"),
+        ("revenue 2019 2020", "FACT"),
+    ]
+    for query, query_type in cases:
+        for cut in range(len(CHUNKS) + 1):
+            state = EvidenceState(query, query_type)
+            state.add(CHUNKS[:cut])
+            gap = state.add(CHUNKS[cut:]).gap()
+            assert gap == detect_gap(query, CHUNKS, query_type)
+
+
+def test_gap_updates_as_evidence_arrives() -> None:
+    state = EvidenceState("Compare Apple vs Oracle revenue", "COMPARE")
+    assert state.gap().gap_type == "NO_GAP"
+    gap = state.add(CHUNKS[1:2]).gap()
+    assert gap.gap_type == "MISSING_ENTITY"
+    assert gap.missing_entity == "Oracle revenue"
+    assert state.add([{"text": "oracle revenue rose"}]).gap().gap_type == "NO_GAP"
+
+    state = EvidenceState("revenue 2019 and 2020", "FACT")
+    gap = state.add(CHUNKS[:1]).gap()
+    assert gap.gap_type == "MISSING_YEAR"
+    assert gap.missing_years == ["2020"]
+    assert state.add(CHUNKS[2:]).gap().gap_type == "NO_GAP"
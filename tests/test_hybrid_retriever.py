@@ -0,0 +1,188 @@
+import hashlib
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from retrieval import retriever as retriever_mod  # noqa: E402
+from retrieval.ann import index_config_from_dict  # noqa: E402
+from retrieval.retriever import HybridRetriever, load_or_build_retriever  # noqa: E402
+
+DIM = 16
+WORDS = ["revenue", "net", "income", "margin", "assets", "growth", "apple", "oracle", "cash", "debt"]
+CHUNKS = [
+    {
+        "text": " ".join(WORDS[(i * j + i) % len(WORDS)] for j in range(3 + i % 5)) + f" {2015 + i % 8}",
+        "meta": {"chunk_id": f"c{i}"},
+    }
+    for i in range(40)
+]
+QUERIES = ["revenue growth 2019", "net income apple", "cash debt", "oracle margin 2021", "assets"]
+
+
+class StubEncoder:
+    """Token-hashing stand-in for SentenceTransformer: deterministic, no weights."""
+
+    def __init__(self, name="stub", device=None):
+        self.name_or_path = str(name)
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True, batch_size=32, show_progress_bar=False):
+        out = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                h = int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16)
+                out[row, h % DIM] += 1.0
+                out[row, (h >> 8) % DIM] -= 0.5
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.where(norms == 0, 1.0, norms)
+        return out
+
+
+@pytest.fixture(autouse=True)
+def stub_encoder(monkeypatch):
+    monkeypatch.setattr(retriever_mod, "SentenceTransformer", StubEncoder)
+
+
+def _write_corpus(path, chunks):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk) + "\n")
+
+
+def test_artifact_roundtrip_and_rebuild_on_model_or_corpus_change(tmp_path):
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "weights.bin").write_bytes(b"v1")
+    corpus_path = tmp_path / "chunks.jsonl"
+    _write_corpus(corpus_path, CHUNKS)
+    config = {
+        "retriever": {
+            "model_name": str(model_dir),
+            "use_faiss": False,
+            "index": {"artifact_dir": str(tmp_path / "artifact")},
+        }
+    }
+
+    built = load_or_build_retriever(config, str(corpus_path))
+    assert built.model is not None
+    loaded = load_or_build_retriever(config, str(corpus_path))
+    # Opened from the artifact: the encoder is deferred until the first query.
+    assert loaded.model is None
+    for query in QUERIES:
+        assert loaded.retrieve(query, top_k=5) == built.retrieve(query, top_k=5)
+
+    # A checkpoint retrained in place keeps its path but not its fingerprint.
+    (model_dir / "weights.bin").write_bytes(b"v2, retrained")
+    assert load_or_build_retriever(config, str(corpus_path)).model is not None
+    assert load_or_build_retriever(config, str(corpus_path)).model is None
+
+    _write_corpus(corpus_path, CHUNKS + [{"text": "new chunk revenue", "meta": {"chunk_id": "c40"}}])
+    rebuilt = load_or_build_retriever(config, str(corpus_path))
+    assert rebuilt.model is not None and len(rebuilt.texts) == len(CHUNKS) + 1
+
+
+def test_save_load_keeps_quantized_store(tmp_path):
+    built = HybridRetriever(model_name="stub", use_faiss=False, embedding_dtype="int8")
+    built.build_index(CHUNKS)
+    built.save(str(tmp_path))
+    loaded = HybridRetriever.load(str(tmp_path), use_faiss=False)
+    assert loaded.dense_store.dtype == "int8"
+    assert loaded.retrieve_batch(QUERIES, top_k=5) == built.retrieve_batch(QUERIES, top_k=5)
+
+
+def _built(**kwargs):
+    retriever = HybridRetriever(model_name="stub", use_faiss=False, **kwargs)
+    retriever.build_index(CHUNKS)
+    return retriever
+
+
+def _assert_same_results(actual, expected):
+    assert [r["meta"]["chunk_id"] for r in actual] == [r["meta"]["chunk_id"] for r in expected]
+    for got, want in zip(actual, expected):
+        for field in ("score", "bm25", "dense"):
+            assert got[field] == pytest.approx(want[field], rel=1e-5, abs=1e-6)
+
+
+def test_retrieve_batch_matches_per_query_retrieve():
+    retriever = _built(batch_size=2)
+    for mode in ("hybrid", "bm25", "dense"):
+        batched = retriever.retrieve_batch(QUERIES, top_k=6, alpha=0.3, mode=mode)
+        # Same ranking; dense scores may differ in the last bit between matmul shapes.
+        for query, actual in zip(QUERIES, batched):
+            _assert_same_results(actual, retriever.retrieve(query, top_k=6, alpha=0.3, mode=mode))
+
+
+def test_candidate_mode_covering_corpus_matches_full_scoring():
+    full = _built()
+    candidates = _built(candidate_k=len(CHUNKS))
+    for mode in ("hybrid", "bm25", "dense"):
+        for actual, expected in zip(
+            candidates.retrieve_batch(QUERIES, top_k=8, mode=mode),
+            full.retrieve_batch(QUERIES, top_k=8, mode=mode),
+        ):
+            _assert_same_results(actual, expected)
+
+
+def test_query_cache_skips_encoder_for_repeated_queries(monkeypatch):
+    retriever = _built()
+    calls = []
+    encode = retriever.model.encode
+
+    def counting_encode(texts, **kwargs):
+        calls.append(list(texts))
+        return encode(texts, **kwargs)
+
+    monkeypatch.setattr(retriever.model, "encode", counting_encode)
+    first = retriever.retrieve_batch(QUERIES, top_k=5)
+    # Whitespace variants share the cached vector; nothing is encoded twice.
+    again = retriever.retrieve_batch(["  revenue   growth 2019 "] + QUERIES, top_k=5)
+    assert again[1:] == first and again[0] == first[0]
+    assert calls == [QUERIES]
+    assert retriever.query_cache_stats()["vectors"]["hits"] == len(QUERIES)
+
+
+def test_score_cache_hits_match_fresh_scoring(tmp_path):
+    reference = _built()
+    # A shallow depth makes some entries unable to prove their top_k, forcing a rescore.
+    writer = _built(score_cache_dir=str(tmp_path), score_cache_depth=3)
+    writer.retrieve_batch(QUERIES, top_k=3)
+    reader = _built(score_cache_dir=str(tmp_path), score_cache_depth=3)
+    settings = [(0.5, "hybrid", 3), (0.2, "hybrid", 2), (0.9, "hybrid", 5), (0.5, "bm25", 3), (0.5, "dense", 4)]
+    for alpha, mode, top_k in settings:
+        for actual, expected in zip(
+            reader.retrieve_batch(QUERIES, top_k=top_k, alpha=alpha, mode=mode),
+            reference.retrieve_batch(QUERIES, top_k=top_k, alpha=alpha, mode=mode),
+        ):
+            _assert_same_results(actual, expected)
+    assert reader.score_cache.hits > 0 and reader.score_cache.misses > 0
+
+
+def test_bm25_prefix_extension_matches_fresh_scores():
+    retriever = _built()
+    retriever.retrieve("revenue growth", top_k=3)
+    extended = retriever._bm25_scores("revenue growth 2019 apple")
+    assert retriever.bm25_incremental == 1
+    fresh = retriever.bm25.get_scores(["revenue", "growth", "2019", "apple"])
+    assert np.array_equal(extended, fresh)
+    assert retriever.retrieve("revenue growth 2019 apple", top_k=5) == _built().retrieve(
+        "revenue growth 2019 apple", top_k=5
+    )
+
+
+def test_dense_index_only_built_for_candidate_mode(tmp_path):
+    assert _built().dense_index_type() == "none"
+    index_config = index_config_from_dict({"brute_force_fallback": False})
+    hnsw = _built(candidate_k=len(CHUNKS), index_config=index_config, embedding_dtype="float16")
+    assert hnsw.dense_index_type() == "numpy_hnsw"
+    hnsw.save(str(tmp_path))
+    # Full-corpus scoring never reads a dense index, so none is opened or built.
+    full = HybridRetriever.load(str(tmp_path), use_faiss=False)
+    assert full.dense_index_type() == "none"
+    reopened = HybridRetriever.load(
+        str(tmp_path), use_faiss=False, candidate_k=len(CHUNKS), index_config=index_config
+    )
+    assert reopened.dense_index_type() == "numpy_hnsw"
+    assert reopened.retrieve_batch(QUERIES, top_k=5) == hnsw.retrieve_batch(QUERIES, top_k=5)
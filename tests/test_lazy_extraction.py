@@ -0,0 +1,56 @@
+from calculator.compute import compute_for_query
+from calculator.extract import extract_facts_from_text
+from calculator.lazy import compute_lazily
+
+CHUNKS = [
+    {"chunk_id": "c1", "text": "Revenue was $100 million in 2019."},
+    {"chunk_id": "c2", "text": "Revenue was $110 million in 2020."},
+    {"chunk_id": "c3", "text": ""},
+    {"chunk_id": "c4", "text": "Revenue was $120 million in 2021 and $90 million in 2018."},
+]
+QUERY = "What was the revenue growth from 2019 to 2020?"
+
+
+def recording_extractor(calls):
+    def facts_for(qid, chunk_id, text, query, year_candidates=None):
+        calls.append(chunk_id)
+        return extract_facts_from_text(qid, chunk_id, text, query, year_candidates)
+
+    return facts_for
+
+
+def full_extraction(query):
+    facts = []
+    for ch in CHUNKS:
+        if ch["text"]:
+            facts.extend(extract_facts_from_text("q1", ch["chunk_id"], ch["text"], query))
+    return facts
+
+
+def test_lazy_stops_once_task_is_answered():
+    calls = []
+    facts, result, trace, stats = compute_lazily("q1", QUERY, CHUNKS, recording_extractor(calls), min_conf=0.4)
+    assert calls == ["c1", "c2"]
+    assert result.status == "ok" and result.confidence >= 0.4
+    assert stats.chunks_total == 4 and stats.chunks_scanned == 2
+    assert stats.facts_scanned == len(facts)
+    assert all(f.chunk_id in {"c1", "c2"} for f in facts)
+    assert stats.early_exit
+    assert (result, trace) == compute_for_query(QUERY, facts)
+
+
+def test_lazy_without_early_exit_matches_full_extraction():
+    for query in [QUERY, "difference in revenue", "share of revenue"]:
+        facts, result, trace, stats = compute_lazily("q1", query, CHUNKS, min_conf=1.1)
+        expected_facts = full_extraction(query)
+        assert facts == expected_facts
+        assert (result, trace) == compute_for_query(query, expected_facts)
+        assert stats.chunks_scanned == len(CHUNKS) and not stats.early_exit
+
+
+def test_lazy_skips_queries_without_task():
+    calls = []
+    facts, result, trace, stats = compute_lazily("q1", "What is revenue?", CHUNKS, recording_extractor(calls))
+    assert calls == [] and facts == []
+    assert result.status == "no_match" and trace.reason == "no_task"
+    assert stats.chunks_scanned == 0
@@ -1,4 +1,4 @@
-from finder_rag.metrics import exact_match, mrr, recall_at_k, reciprocal_rank
+from finder_rag.metrics import exact_match, mrr, percentile, recall_at_k, reciprocal_rank
 
 
 def test_exact_match_case_insensitive():
@@ -19,3 +19,10 @@ def test_reciprocal_rank():
 def test_mrr():
     scores = [[False, True], [True, False], [False, False]]
     assert mrr(scores) == (0.5 + 1.0 + 0.0) / 3.0
+
+
+def test_percentile_interpolates():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3, 1, 2], 0.5) == 2.0
+    assert percentile([0, 10], 0.25) == 2.5
+    assert percentile([0, 10], 1.0) == 10.0
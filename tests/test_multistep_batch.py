@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from typing import List
+
+from multistep.engine import MultiStepConfig, MultiStepRetriever
+
+
+class HashRetriever:
+    """Deterministic results that change with the query text, so refinements matter."""
+
+    def __init__(self) -> None:
+        self.batch_calls = 0
+
+    def retrieve(self, query: str, top_k: int, alpha: float, mode: str) -> List[dict]:
+        seed = zlib.crc32(query.encode("utf-8"))
+        ids = [(seed + 7 * i) % 23 for i in range(top_k)]
+        return [
+            {
+                "meta": {"chunk_id": f"c{cid}", "year": 2018 + cid % 4},
+                "score": 1.0 / (i + 1),
+                "text": f"revenue {2018 + cid % 4} chunk {cid}",
+            }
+            for i, cid in enumerate(ids)
+        ]
+
+
+class BatchHashRetriever(HashRetriever):
+    def retrieve_batch(self, queries: List[str], top_k: int, alpha: float, mode: str) -> List[List[dict]]:
+        self.batch_calls += 1
+        return [self.retrieve(q, top_k, alpha, mode) for q in queries]
+
+
+QUERIES = [
+    "What was revenue in 2019 and 2020?",
+    "Compare Apple and Microsoft operating income",
+    "net income",
+    "",
+    "What was the change in revenue from 2018 to 2021?",
+]
+
+
+def _config() -> MultiStepConfig:
+    return MultiStepConfig(
+        max_steps=3,
+        top_k_each_step=4,
+        final_top_k=8,
+        alpha=0.5,
+        mode="hybrid",
+        novelty_threshold=0.3,
+        stop_no_new_steps=2,
+        gate_enabled=False,
+    )
+
+
+def test_run_batch_matches_run() -> None:
+    engine = MultiStepRetriever(BatchHashRetriever(), _config())
+    expected = [engine.run(q) for q in QUERIES]
+    assert engine.run_batch(QUERIES) == expected
+
+
+# (query, stop_reason, used_query per step, final chunk ids) from the pre-batching
+# sequential engine, i.e. one retrieve per step per query, on HashRetriever and _config().
+SEQUENTIAL_BASELINE = [
+    (
+        "What was revenue in 2019 and 2020?",
+        "NO_GAP",
+        ["What was revenue in 2019 and 2020?"],
+        ["c19", "c3", "c10", "c17", "c1", "c8", "c15", "c22"],
+    ),
+    (
+        "Compare Apple and Microsoft operating income",
+        "NO_GAP",
+        ["Compare Apple and Microsoft operating income"],
+        ["c7", "c14", "c21", "c5", "c12", "c19", "c3", "c10"],
+    ),
+    (
+        "net income",
+        "NO_GAP",
+        ["net income"],
+        ["c9", "c16", "c0", "c7", "c14", "c21", "c5", "c12"],
+    ),
+    (
+        "",
+        "NO_GAP",
+        [""],
+        ["c0", "c7", "c14", "c21", "c5", "c12", "c19", "c3"],
+    ),
+    (
+        "What was the change in revenue from 2018 to 2021?",
+        "MAX_STEPS",
+        [
+            "What was the change in revenue from 2018 to 2021?",
+            "What was the change in revenue from 2018 to 2021? 2021",
+            "What was the change in revenue from 2018 to 2021? 2021",
+        ],
+        ["c6", "c13", "c20", "c4", "c11"],
+    ),
+    (
+        "Compare 'Apple' vs 'Oracle' 2018 2019",
+        "MAX_STEPS",
+        [
+            "Compare 'Apple' vs 'Oracle' 2018 2019",
+            "Compare 'Apple' vs 'Oracle' 2018 2019 2018",
+            "Compare 'Apple' vs 'Oracle' 2018 2019 2018",
+        ],
+        ["c11", "c18", "c2", "c9"],
+    ),
+]
+
+
+def test_run_batch_matches_sequential_baseline() -> None:
+    engine = MultiStepRetriever(BatchHashRetriever(), _config())
+    outputs = engine.run_batch([row[0] for row in SEQUENTIAL_BASELINE])
+    for (final, trace, stop_reason, _), (_, expected_reason, used_queries, final_ids) in zip(
+        outputs, SEQUENTIAL_BASELINE
+    ):
+        assert stop_reason == expected_reason
+        assert [step["used_query"] for step in trace] == used_queries
+        assert [c["chunk_id"] for c in final] == final_ids
+
+
+def test_run_batch_one_retrieve_call_per_step_and_no_fallback_call() -> None:
+    retriever = BatchHashRetriever()
+    engine = MultiStepRetriever(retriever, _config())
+    outputs = engine.run_batch(QUERIES)
+    assert any(trace[-1]["final_fallback_added"] for _, trace, _, _ in outputs)
+    # The fallback top-up reuses the step-0 results instead of retrieving again.
+    assert retriever.batch_calls == max(len(trace) for _, trace, _, _ in outputs)
+
+
+def test_run_batch_without_retrieve_batch() -> None:
+    engine = MultiStepRetriever(HashRetriever(), _config())
+    batched = MultiStepRetriever(BatchHashRetriever(), _config())
+    assert engine.run_batch(QUERIES) == batched.run_batch(QUERIES)
+
+
+class PoolRetriever(BatchHashRetriever):
+    """Rescoring keeps the pool's order but drops chunks already ranked above top_k."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.depths: List[int] = []
+        self.rescored: List[List[str]] = []
+
+    def retrieve_batch(self, queries: List[str], top_k: int, alpha: float, mode: str) -> List[List[dict]]:
+        self.depths.append(top_k)
+        return super().retrieve_batch(queries, top_k, alpha, mode)
+
+    def rescore_batch(
+        self, queries: List[str], pools: List[List[str]], top_k: int, alpha: float, mode: str
+    ) -> List[List[dict]]:
+        self.rescored.append(list(queries))
+        out = []
+        for pool in pools:
+            ids = [int(cid[1:]) for cid in pool][top_k : 2 * top_k]
+            out.append(
+                [
+                    {"meta": {"chunk_id": f"c{cid}"}, "score": 0.5, "text": f"revenue {2018 + cid % 4} chunk {cid}"}
+                    for cid in ids
+                ]
+            )
+        return out
+
+
+def _pool_config(escalate: str) -> MultiStepConfig:
+    config = _config()
+    config.pool_depth = 12
+    config.pool_escalate = escalate
+    return config
+
+
+def test_pool_mode_rescores_after_one_deep_retrieve() -> None:
+    retriever = PoolRetriever()
+    engine = MultiStepRetriever(retriever, _pool_config("never"))
+    outputs = engine.run_batch(QUERIES)
+    assert retriever.depths[0] == 12
+    assert engine.stats["escalations"] == 0
+    for _, trace, _, _ in outputs:
+        assert trace[0]["retrieval"] == "full"
+        assert all(step["retrieval"] == "pool" for step in trace[1:])
+    assert engine.stats["pool_rescores"] == sum(len(trace) - 1 for _, trace, _, _ in outputs)
+
+
+def test_pool_mode_escalates_while_gap_persists() -> None:
+    retriever = PoolRetriever()
+    engine = MultiStepRetriever(retriever, _pool_config("gap"))
+    outputs = engine.run_batch(QUERIES)
+    escalated = [step for _, trace, _, _ in outputs for step in trace if step["retrieval"] == "pool+full"]
+    assert escalated and len(escalated) == engine.stats["escalations"]
+    assert all(len(step["topk_chunks"]) == 4 for step in escalated)
+
+
+def test_pool_mode_without_rescore_falls_back_to_full_retrieve() -> None:
+    engine = MultiStepRetriever(BatchHashRetriever(), _pool_config("never"))
+    engine.run_batch(QUERIES)
+    assert engine.stats["pool_rescores"] == 0
+
+
+def test_default_traces_have_no_retrieval_key() -> None:
+    engine = MultiStepRetriever(PoolRetriever(), _config())
+    for _, trace, _, _ in engine.run_batch(QUERIES):
+        assert all("retrieval" not in step for step in trace)
+
+
+def test_speculation_prefetches_refined_queries() -> None:
+    queries = ["revenue in 2019 and 2020 and 2021", "Compare 'Apple' vs 'Oracle' 2018 2019"]
+    retriever = BatchHashRetriever()
+    expected = MultiStepRetriever(retriever, _config()).run_batch(queries)
+
+    config = _config()
+    config.speculate_max = 4
+    engine = MultiStepRetriever(BatchHashRetriever(), config)
+    try:
+        assert engine.run_batch(queries) == expected
+    finally:
+        engine.close()
+    refined_steps = sum(len(trace) - 1 for _, trace, _, _ in expected)
+    assert refined_steps > 0
+    assert engine.stats["speculation_hits"] == refined_steps
+    assert engine.stats["full_retrieves"] == len(queries)
+
+
+class LazyModelRetriever(BatchHashRetriever):
+    def __init__(self) -> None:
+        super().__init__()
+        self.loaded_on: List[str] = []
+
+    def load_model(self) -> None:
+        self.loaded_on.append(threading.current_thread().name)
+
+    def retrieve_batch(self, queries: List[str], top_k: int, alpha: float, mode: str) -> List[List[dict]]:
+        assert self.loaded_on, "retrieve before load_model"
+        return super().retrieve_batch(queries, top_k, alpha, mode)
+
+
+def test_speculation_loads_model_before_submitting() -> None:
+    config = _config()
+    config.speculate_max = 4
+    retriever = LazyModelRetriever()
+    engine = MultiStepRetriever(retriever, config)
+    try:
+        engine.run_batch(["revenue in 2019 and 2020 and 2021"])
+    finally:
+        engine.close()
+    assert retriever.loaded_on == [threading.current_thread().name]
+
+
+def test_call_budget_stops_queries() -> None:
+    config = _config()
+    config.max_steps = 5
+    config.stop_no_new_steps = 5
+    config.budget_calls = 2
+    engine = MultiStepRetriever(BatchHashRetriever(), config)
+    outputs = engine.run_batch(QUERIES)
+    assert len(engine.last_latencies_ms) == len(QUERIES)
+    for _, trace, stop_reason, _ in outputs:
+        assert len(trace) <= 2
+        if stop_reason == "BUDGET_EXHAUSTED":
+            assert trace[-1]["stop_reason"] == "BUDGET_EXHAUSTED"
+            assert "marginal_gain" in trace[-1]
+    assert any(stop_reason == "BUDGET_EXHAUSTED" for _, _, stop_reason, _ in outputs)
+
+
+def test_ms_budget_runs_queries_one_at_a_time() -> None:
+    config = _config()
+    config.budget_ms = 1e9
+    retriever = BatchHashRetriever()
+    engine = MultiStepRetriever(retriever, config)
+    outputs = engine.run_batch(QUERIES)
+    # Each query pays only for its own retrieves, so batch-mates cannot spend its budget.
+    assert retriever.batch_calls == sum(len(trace) for _, trace, _, _ in outputs)
+    assert len(engine.last_latencies_ms) == len(QUERIES)
+    unbudgeted = MultiStepRetriever(BatchHashRetriever(), _config()).run_batch(QUERIES)
+    for (_, trace, stop_reason, final), (_, expected_trace, expected_reason, expected_final) in zip(
+        outputs, unbudgeted
+    ):
+        assert stop_reason == expected_reason and final == expected_final
+        assert [{k: v for k, v in step.items() if k != "marginal_gain"} for step in trace] == expected_trace
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import random
+
+from multistep.novelty import NoveltyIndex, lsh_bands
+from multistep.stop import StopCriteria, jaccard
+
+
+def _pairwise_filter(new_chunks, existing_chunks, threshold):
+    if threshold <= 0:
+        return new_chunks
+    return [
+        ch
+        for ch in new_chunks
+        if not ch.get("text")
+        or all(jaccard(ch["text"], ex.get("text", "")) < threshold for ex in existing_chunks)
+    ]
+
+
+def _random_chunks(rng: random.Random, count: int) -> list:
+    vocab = [f"w{i}" for i in range(30)] + ["The", "the"]
+    return [{"text": " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 10)))} for _ in range(count)]
+
+
+def test_exact_mode_matches_pairwise_jaccard() -> None:
+    rng = random.Random(0)
+    for _ in range(300):
+        threshold = rng.choice([0.0, 0.2, 0.3, 0.6, 1.0])
+        existing = _random_chunks(rng, rng.randint(0, 12))
+        new = _random_chunks(rng, rng.randint(0, 6))
+        stop = StopCriteria(max_steps=3, no_new_steps_limit=2, novelty_threshold=threshold)
+        assert stop.novelty_filter(new, existing) == _pairwise_filter(new, existing, threshold)
+
+
+def test_index_grows_across_steps() -> None:
+    index = NoveltyIndex(0.5)
+    index.add([{"text": "revenue grew in 2020"}])
+    kept = index.filter([{"text": "Revenue grew in 2020"}, {"text": "operating costs fell"}])
+    assert [c["text"] for c in kept] == ["operating costs fell"]
+    index.add(kept)
+    assert index.filter([{"text": "operating costs fell sharply"}]) == []
+
+
+def test_minhash_finds_near_duplicates_without_false_drops() -> None:
+    rng = random.Random(1)
+    vocab = [f"t{i}" for i in range(2000)]
+    pool = [" ".join(rng.choice(vocab) for _ in range(80)) for _ in range(200)]
+    index = NoveltyIndex(0.3, mode="minhash")
+    index.add({"text": text} for text in pool)
+
+    near = [{"text": " ".join(w if rng.random() > 0.1 else "zz" for w in text.split())} for text in pool[:50]]
+    fresh = [{"text": " ".join(rng.choice(vocab) + "x" for _ in range(80))} for _ in range(50)]
+    kept = index.filter(near + fresh)
+    assert all(ch in kept for ch in fresh)
+    assert sum(ch in kept for ch in near) <= 2
+
+
+def test_lsh_bands_track_threshold() -> None:
+    for threshold in (0.3, 0.5, 0.8):
+        bands, rows = lsh_bands(64, threshold)
+        assert bands * rows <= 64
+        assert abs((1.0 / bands) ** (1.0 / rows) - threshold) < 0.1
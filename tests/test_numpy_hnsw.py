@@ -0,0 +1,95 @@
+import numpy as np
+
+from retrieval.ann import IndexConfig, load_or_build_numpy_hnsw, recall_at_k
+from retrieval.dense_store import DenseStore
+from retrieval.hnsw import NumpyHNSW
+from retrieval.topk import top_k_indices
+
+
+def _unit_vectors(num, dim, seed):
+    vecs = np.random.default_rng(seed).normal(size=(num, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def test_numpy_hnsw_recall_against_exact_search():
+    data = _unit_vectors(600, 16, 0)
+    queries = _unit_vectors(20, 16, 1)
+    index = NumpyHNSW(dim=16, m=8, ef_construction=64, ef_search=64)
+    # Inserts can be split across add() calls.
+    index.add(data[:300])
+    index.add(data[300:])
+    assert index.ntotal == 600
+
+    scores, ids = index.search(queries, 10)
+    exact = top_k_indices(queries @ data.T, 10)
+    assert recall_at_k(ids, exact, 10) >= 0.9
+    np.testing.assert_allclose(scores[:, 0], np.sum(queries * data[ids[:, 0]], axis=1), rtol=1e-5)
+
+
+def test_numpy_hnsw_save_load_roundtrip(tmp_path):
+    data = _unit_vectors(200, 8, 2)
+    index = NumpyHNSW(dim=8, m=4, ef_construction=32)
+    index.add(data)
+    index.save(str(tmp_path))
+
+    loaded = NumpyHNSW.load(str(tmp_path))
+    queries = _unit_vectors(5, 8, 3)
+    expected = index.search(queries, 5, ef_search=16)
+    actual = loaded.search(queries, 5, ef_search=16)
+    np.testing.assert_array_equal(expected[1], actual[1])
+    np.testing.assert_array_equal(expected[0], actual[0])
+
+
+def test_numpy_hnsw_add_after_load_continues_the_build(tmp_path):
+    data = _unit_vectors(240, 8, 5)
+    built = NumpyHNSW(dim=8, m=4, ef_construction=32, seed=7)
+    built.add(data[:120])
+    built.save(str(tmp_path), with_vectors=False)
+    loaded = NumpyHNSW.load(str(tmp_path), vectors=data[:120])
+    assert np.shares_memory(loaded.vectors, data)
+
+    # Same rng state, so the remaining inserts draw the same levels and links.
+    for index in (built, loaded):
+        for start in range(120, 240, 30):
+            index.add(data[start : start + 30])
+    assert loaded.levels == built.levels
+    assert loaded.links == built.links
+    np.testing.assert_array_equal(loaded.vectors, data)
+
+
+def test_numpy_hnsw_load_maps_saved_vectors(tmp_path):
+    index = NumpyHNSW(dim=4, m=4)
+    index.add(_unit_vectors(20, 4, 6))
+    index.save(str(tmp_path))
+    loaded = NumpyHNSW.load(str(tmp_path))
+    # Memory-mapped read-only; the first add() moves the vectors into a growable buffer.
+    assert not loaded.vectors.flags.writeable
+    loaded.add(_unit_vectors(3, 4, 7))
+    assert loaded.ntotal == 23
+
+
+def test_numpy_hnsw_pads_when_index_is_small():
+    index = NumpyHNSW(dim=4)
+    _, ids = index.search(np.ones((1, 4), dtype=np.float32), 3)
+    assert ids.tolist() == [[-1, -1, -1]]
+    index.add(_unit_vectors(2, 4, 4))
+    _, ids = index.search(np.ones((1, 4), dtype=np.float32), 3)
+    assert sorted(ids[0][:2].tolist()) == [0, 1]
+    assert ids[0][2] == -1
+
+
+def test_numpy_hnsw_from_quantized_store_in_blocks(tmp_path):
+    store = DenseStore.from_float32(_unit_vectors(150, 8, 8), "float16")
+    store.block_size = 40
+    cfg = IndexConfig(hnsw_m=4, ef_construction=32, index_path=str(tmp_path / "idx"))
+    built = load_or_build_numpy_hnsw(store, cfg)
+    reference = NumpyHNSW(dim=8, m=4, ef_construction=32, ef_search=cfg.ef_search, seed=cfg.seed)
+    reference.add(store.vectors(np.arange(150)))
+    assert built.links == reference.links
+    assert len(built._data) == 150
+
+    # A quantized store's graph keeps its own float32 copy and reopens memory-mapped.
+    loaded = load_or_build_numpy_hnsw(store, cfg)
+    assert not loaded.vectors.flags.writeable
+    queries = _unit_vectors(4, 8, 9)
+    np.testing.assert_array_equal(loaded.search(queries, 5)[1], built.search(queries, 5)[1])
@@ -0,0 +1,84 @@
+import json
+import os
+
+from retrieval.artifact import (
+    ARTIFACT_VERSION,
+    ChunkStore,
+    artifact_matches,
+    corpus_source,
+    file_sha1,
+    write_chunks,
+    write_manifest,
+)
+
+
+def test_chunk_store_reads_rows_lazily(tmp_path):
+    texts = ["Revenue was $5 million.", "Net income — 2019", ""]
+    metas = [{"chunk_id": "a"}, {"chunk_id": "b", "year": 2019}, {"chunk_id": "c"}]
+    write_chunks(str(tmp_path), texts, metas)
+
+    store = ChunkStore(str(tmp_path))
+    assert len(store) == 3
+    texts_view = store.column("text")
+    metas_view = store.column("meta")
+    assert texts_view[1] == texts[1]
+    assert metas_view[-1] == metas[2]
+    assert list(texts_view) == texts
+    assert metas_view[0:2] == metas[:2]
+
+
+def test_artifact_matches_corpus_written_by_build_corpus(tmp_path):
+    chunks = [{"text": f"chunk {i}", "meta": {"chunk_id": str(i)}} for i in range(4)]
+    corpus_path = tmp_path / "chunks.jsonl"
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(json.dumps({"text": chunk["text"], "meta": chunk["meta"]}) + "\n")
+
+    artifact = tmp_path / "artifact"
+    artifact.mkdir()
+    corpus_hash = write_chunks(str(artifact), [c["text"] for c in chunks], [c["meta"] for c in chunks])
+    assert corpus_hash == file_sha1(str(corpus_path))
+
+    assert not artifact_matches(str(artifact), "model-a", str(corpus_path))
+    write_manifest(
+        str(artifact),
+        {"version": ARTIFACT_VERSION, "model_name": "model-a", "corpus_hash": corpus_hash},
+    )
+    assert artifact_matches(str(artifact), "model-a", str(corpus_path))
+    assert not artifact_matches(str(artifact), "model-b", str(corpus_path))
+    with open(corpus_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"text": "new", "meta": {}}) + "\n")
+    assert not artifact_matches(str(artifact), "model-a", str(corpus_path))
+
+
+def test_artifact_matches_recorded_corpus_source(tmp_path, monkeypatch):
+    corpus_path = tmp_path / "chunks.jsonl"
+    # Not the {"text","meta"} serialization of write_chunks: the source file itself is recorded.
+    corpus_path.write_text('{"meta": {"chunk_id": "0"}, "text": "chunk 0"}\n', encoding="utf-8")
+    artifact = tmp_path / "artifact"
+    artifact.mkdir()
+    corpus_hash = write_chunks(str(artifact), ["chunk 0"], [{"chunk_id": "0"}])
+    write_manifest(
+        str(artifact),
+        {
+            "version": ARTIFACT_VERSION,
+            "model_name": "model-a",
+            "corpus_hash": corpus_hash,
+            "corpus_source": corpus_source(str(corpus_path)),
+        },
+    )
+    assert corpus_hash != file_sha1(str(corpus_path))
+
+    def no_hashing(path):
+        raise AssertionError("unchanged corpus should not be hashed")
+
+    monkeypatch.setattr("retrieval.artifact.file_sha1", no_hashing)
+    assert artifact_matches(str(artifact), "model-a", str(corpus_path))
+    monkeypatch.undo()
+
+    # Touched but identical: the hash decides.
+    stat = corpus_path.stat()
+    os.utime(corpus_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert artifact_matches(str(artifact), "model-a", str(corpus_path))
+    corpus_path.write_text('{"meta": {"chunk_id": "0"}, "text": "chunk 1"}\n', encoding="utf-8")
+    assert not artifact_matches(str(artifact), "model-a", str(corpus_path))
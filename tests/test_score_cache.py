@@ -0,0 +1,28 @@
+import numpy as np
+
+from retrieval.score_cache import ScoreCache, build_entry, corpus_fingerprint
+
+
+def test_build_entry_keeps_union_and_floors():
+    bm25 = np.array([0.0, 3.0, 1.0, 2.0, 0.0], dtype=np.float32)
+    dense = np.array([0.9, 0.1, 0.2, 0.3, 0.8], dtype=np.float32)
+    entry = build_entry(bm25, dense, depth=2)
+    assert entry["ids"].tolist() == [0, 1, 3, 4]
+    assert entry["bm25"].tolist() == [0.0, 3.0, 2.0, 0.0]
+    assert entry["bm25_floor"].tolist() == [2.0]
+    assert entry["dense_floor"].tolist() == [np.float32(0.8)]
+    assert entry["bm25_range"].tolist() == [0.0, 3.0]
+    assert int(entry["num_docs"]) == 5
+
+
+def test_score_cache_roundtrip_by_normalized_query(tmp_path):
+    cache = ScoreCache(str(tmp_path), corpus_fingerprint(["a", "b"]))
+    assert cache.get("apple revenue") is None
+    entry = build_entry(np.arange(4, dtype=np.float32), np.ones(4, dtype=np.float32), depth=2)
+    cache.put("apple revenue", entry)
+
+    loaded = cache.get("  apple   revenue ")
+    for name, value in entry.items():
+        np.testing.assert_array_equal(loaded[name], value)
+        assert loaded[name].dtype == value.dtype
+    assert ScoreCache(str(tmp_path), corpus_fingerprint(["a", "c"])).get("apple revenue") is None
@@ -0,0 +1,41 @@
+import random
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from retrieval.bm25 import SparseBM25
+
+
+def _corpus(seed: int = 7):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(30)] + ["the", "revenue", "2020"]
+    docs = []
+    for _ in range(60):
+        docs.append([rng.choice(vocab) for _ in range(rng.randint(1, 25))])
+    docs.append(["the"] * 10)
+    return docs
+
+
+def test_sparse_bm25_matches_bm25okapi():
+    docs = _corpus()
+    reference = BM25Okapi(docs)
+    engine = SparseBM25(docs)
+    for query in (["revenue", "2020"], ["the", "the", "w3"], ["missing"], [], ["w1", "w29", "w7"]):
+        assert np.array_equal(engine.get_scores(query), reference.get_scores(query))
+
+
+def test_sparse_bm25_save_load_roundtrip(tmp_path):
+    docs = _corpus(seed=3)
+    engine = SparseBM25(docs)
+    engine.save(str(tmp_path))
+    loaded = SparseBM25.load(str(tmp_path))
+    query = ["w2", "revenue", "w2"]
+    assert np.array_equal(loaded.get_scores(query), engine.get_scores(query))
+
+
+def test_sparse_bm25_add_scores_extends_prefix_exactly():
+    engine = SparseBM25(_corpus(seed=5))
+    base = ["revenue", "w4", "the"]
+    refined = base + ["2020", "w4"]
+    extended = engine.add_scores(engine.get_scores(base).copy(), refined[len(base) :])
+    assert np.array_equal(extended, engine.get_scores(refined))
@@ -25,3 +25,42 @@ def test_stop_no_gap():
     result = stop.check(step_idx=0, new_chunk_ids=["c1"], gap_type="NO_GAP", empty_results=False, state=state)
     assert result.should_stop is True
     assert result.reason == "NO_GAP"
+
+
+def test_stop_budget_calls():
+    stop = StopCriteria(max_steps=5, no_new_steps_limit=3, novelty_threshold=0.3, budget_calls=2)
+    state = StopState(retrieve_calls=1)
+    result = stop.check(step_idx=0, new_chunk_ids=["c1"], gap_type="MISSING_YEAR", empty_results=False, state=state)
+    assert result.should_stop is False
+    state.retrieve_calls = 2
+    result = stop.check(step_idx=1, new_chunk_ids=["c2"], gap_type="MISSING_YEAR", empty_results=False, state=state)
+    assert result.reason == "BUDGET_EXHAUSTED"
+
+
+def test_stop_budget_ms_projects_next_step():
+    stop = StopCriteria(max_steps=5, no_new_steps_limit=3, novelty_threshold=0.3, budget_ms=100.0)
+    kwargs = dict(new_chunk_ids=["c1"], gap_type="MISSING_YEAR", empty_results=False)
+    # 45 ms for one step: a second would end near 90 ms, inside the budget.
+    assert stop.check(step_idx=0, state=StopState(), elapsed_ms=45.0, **kwargs).should_stop is False
+    # 60 ms for one step: a second would overrun.
+    assert stop.check(step_idx=0, state=StopState(), elapsed_ms=60.0, **kwargs).reason == "BUDGET_EXHAUSTED"
+
+
+def test_stop_low_marginal_gain():
+    stop = StopCriteria(max_steps=5, no_new_steps_limit=3, novelty_threshold=0.3, min_marginal_gain=0.2)
+    state = StopState()
+    kwargs = dict(new_chunk_ids=["c1"], gap_type="MISSING_YEAR", empty_results=False, state=state)
+    assert stop.check(step_idx=0, gap_conf=1.0, **kwargs).should_stop is False
+    assert stop.check(step_idx=1, gap_conf=0.5, **kwargs).should_stop is False
+    result = stop.check(step_idx=2, gap_conf=0.5, **kwargs)
+    assert result.reason == "LOW_GAIN"
+    assert state.gains == [0.5, 0.0]
+
+
+def test_low_marginal_gain_ignores_missing_entity():
+    stop = StopCriteria(max_steps=5, no_new_steps_limit=3, novelty_threshold=0.3, min_marginal_gain=0.2)
+    state = StopState()
+    kwargs = dict(new_chunk_ids=["c1"], gap_type="MISSING_ENTITY", empty_results=False, state=state, gap_conf=1.0)
+    for step_idx in range(3):
+        assert stop.check(step_idx=step_idx, **kwargs).should_stop is False
+    assert state.gains == [0.0, 0.0]
@@ -0,0 +1,23 @@
+import numpy as np
+
+from retrieval.topk import top_k_indices
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.random(500).astype("float32")
+    expected = np.argsort(-scores, kind="stable")[:10]
+    assert top_k_indices(scores, 10).tolist() == expected.tolist()
+    assert top_k_indices(scores, 1000).tolist() == np.argsort(-scores, kind="stable").tolist()
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_top_k_ties_prefer_lower_index():
+    scores = np.array([0.1, 0.5, 0.5, 0.9, 0.5, 0.5])
+    assert top_k_indices(scores, 3).tolist() == [3, 1, 2]
+    assert top_k_indices(np.zeros(6), 2).tolist() == [0, 1]
+
+
+def test_top_k_batched_rows():
+    matrix = np.array([[0.2, 0.8, 0.8, 0.1], [0.0, 0.0, 0.3, 0.3]])
+    assert top_k_indices(matrix, 2).tolist() == [[1, 2], [2, 3]]